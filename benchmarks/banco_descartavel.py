@@ -0,0 +1,60 @@
+"""
+Banco MySQL descartável para os benchmarks.
+
+Cria no servidor do .env um banco com nome próprio, copia a estrutura das tabelas da
+sincronização do banco DB_NAME (CREATE TABLE ... LIKE, sem dados) e o apaga ao sair.
+O banco do .env precisa já ter o esquema atual (python create_jira_sql.py), e o usuário
+precisa de permissão para CREATE DATABASE e DROP DATABASE.
+"""
+import os
+
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TABELAS_SINCRONIZACAO = ("coordenadores", "cursos", "db_dpc_jira", "db_dpc_jira_disciplinas", "resumo_producao")
+
+
+def conectar(database=None):
+    return pymysql.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=database,
+        port=int(os.getenv("DB_PORT", "3306")),
+    )
+
+
+class BancoDescartavel:
+    def __init__(self, nome=None, origem=None):
+        self.nome = nome or f"bench_jira_{os.getpid()}"
+        self.origem = origem or os.getenv("DB_NAME")
+
+    @property
+    def ambiente(self):
+        """Variáveis de ambiente que apontam a sincronização para este banco."""
+        return {"DB_NAME": self.nome}
+
+    def __enter__(self):
+        conexao = conectar()
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute(f"CREATE DATABASE `{self.nome}`")
+                for tabela in TABELAS_SINCRONIZACAO:
+                    cursor.execute(f"CREATE TABLE `{self.nome}`.`{tabela}` LIKE `{self.origem}`.`{tabela}`")
+        except Exception:
+            with conexao.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS `{self.nome}`")
+            raise
+        finally:
+            conexao.close()
+        return self
+
+    def __exit__(self, *exc):
+        conexao = conectar()
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS `{self.nome}`")
+        finally:
+            conexao.close()
@@ -0,0 +1,59 @@
+"""
+Compara a carga completa em uma única consulta com a carga em partições (por entidade e
+por janela de criação) contra o servidor Jira falso.
+
+O servidor simula o custo das buscas profundas: cada página demora --latencia segundos
+mais --custo-deslocamento segundos por 1000 tarefas de startAt. Para cada modo, informa
+o tempo até a última página, as tarefas recebidas e as chaves repetidas no fluxo
+combinado, e confere que os três modos produzem as mesmas linhas de db_dpc_jira.
+Nada é gravado no banco.
+
+Uso: python -m benchmarks.bench_backfill --issues 50000 --latencia 0.2 --custo-deslocamento 0.1
+"""
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.fake_jira import ServidorJiraFalso
+
+
+def medir_modo(sync, modo):
+    inicio = time.perf_counter()
+    if modo == "unica":
+        _, paginas = sync.paginar_jira(*sync.consulta_dados_jira(completa=True, ordem="key ASC"))
+    else:
+        _, paginas = sync.paginar_backfill("dados", sync.consulta_dados_jira, modo)
+    chaves = Counter()
+    linhas = []
+    for pagina in paginas:
+        issues = pagina.get("issues", [])
+        chaves.update(issue["key"] for issue in issues)
+        linhas.extend(sync.transformar_pagina_dados(issues))
+    duracao = time.perf_counter() - inicio
+    repetidas = sum(quantidade - 1 for quantidade in chaves.values())
+    return duracao, sum(chaves.values()), repetidas, sorted(linhas, key=lambda linha: linha[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--latencia", type=float, default=0.2, help="latência fixa por página, em segundos")
+    parser.add_argument("--custo-deslocamento", type=float, default=0.1, help="segundos a mais por 1000 tarefas de startAt")
+    args = parser.parse_args()
+
+    with ServidorJiraFalso(
+        total_issues=args.issues, latencia=args.latencia, custo_deslocamento=args.custo_deslocamento,
+    ) as servidor:
+        import update_jira_sql as sync
+
+        sync.JIRA_BASE_URL = servidor.url
+        resultados = {modo: medir_modo(sync, modo) for modo in ("unica", "entidade", "criacao")}
+
+    referencia = resultados["unica"][3]
+    print(f"\n{'modo':<10}{'tempo (s)':>11}{'tarefas':>9}{'repetidas':>11}{'linhas':>8}{'iguais':>8}")
+    for modo, (duracao, tarefas, repetidas, linhas) in resultados.items():
+        print(f"{modo:<10}{duracao:>11.2f}{tarefas:>9}{repetidas:>11}{len(linhas):>8}{'sim' if linhas == referencia else 'NÃO':>8}")
+
+
+if __name__ == "__main__":
+    main()
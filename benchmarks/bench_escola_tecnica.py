@@ -0,0 +1,122 @@
+"""
+Mede a exportação da escola técnica: uma carga completa seguida de uma incremental.
+
+Para cada escala, o servidor Jira falso gera as subtarefas e a exportação completa grava o
+CSV e a planilha em uma pasta temporária. A consulta traz as subtarefas de conteúdo e de
+vídeo, e só as de vídeo (com "VÍDEO - GRAVAR" no resumo) podem entrar no CSV; o
+benchmark confere as chaves do CSV depois de cada exportação. Depois, --alteradas
+subtarefas de vídeo e --alteradas de conteúdo passam a ter uma data de atualização
+posterior à marca d'água, e a exportação incremental só busca essas. Para cada exportação,
+informa o tempo, as requisições, os vídeos recebidos, as linhas do CSV e o pico de memória
+alocada (tracemalloc) pela exportação, que não deve crescer com a escala; o servidor roda em
+outro processo para não entrar na medida. A regeração da planilha, que lê o CSV inteiro, é
+cronometrada à parte.
+
+Uso: python -m benchmarks.bench_escola_tecnica --escalas 2000,20000 --alteradas 100
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fake_jira import ServidorJiraFalso
+
+# Datas posteriores a todas as datas sintéticas do servidor falso
+MARCA_DAGUA = "2030-01-01"
+ALTERACAO = "2030-01-02"
+
+
+def servir(total_issues, conexao):
+    """Roda o servidor falso e atende aos pedidos do benchmark: url, zerar, requisicoes, atualizar e parar."""
+    with ServidorJiraFalso(total_issues=total_issues) as servidor:
+        while True:
+            pedido, *argumentos = conexao.recv()
+            if pedido == "parar":
+                return
+            if pedido == "url":
+                conexao.send(servidor.url)
+            elif pedido == "zerar":
+                conexao.send(servidor.zerar_contadores())
+            elif pedido == "requisicoes":
+                conexao.send(servidor.requisicoes)
+            elif pedido == "atualizar":
+                conexao.send(servidor.atualizar(*argumentos, subtarefas=True))
+
+
+def pedir(conexao, *pedido):
+    conexao.send(pedido)
+    return conexao.recv()
+
+
+def conferir_csv(sync, escala):
+    """As linhas do CSV são exatamente as subtarefas de vídeo, que têm índice ímpar."""
+    with open(sync.SYNC_ESCOLA_TECNICA_CSV, newline="", encoding="utf-8-sig") as arquivo:
+        leitor = csv.reader(arquivo)
+        next(leitor)
+        chaves = sorted(linha[0] for linha in leitor)
+    esperadas = sorted(f"PROCONTEUD-{escala + indice + 1}" for indice in range(1, 2 * escala, 2))
+    if chaves != esperadas:
+        raise SystemExit(f"o CSV tem {len(chaves)} linhas, e não só as {len(esperadas)} subtarefas de vídeo")
+
+
+def exportar(sync, conexao, completa):
+    pedir(conexao, "zerar")
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    novas, alteradas, mantidas = sync.exportar_escola_tecnica(completa=completa, caminho_xlsx="")
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    sync.gerar_planilha_escola_tecnica(sync.SYNC_ESCOLA_TECNICA_CSV, "escola_tecnica.xlsx")
+    planilha = time.perf_counter() - inicio
+    return duracao, pedir(conexao, "requisicoes"), novas + alteradas, novas + alteradas + mantidas, pico / 2**20, planilha
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", default="2000,20000", help="tarefas pai do servidor falso (duas subtarefas cada)")
+    parser.add_argument("--alteradas", type=int, default=100, help="subtarefas de vídeo (e outras tantas de conteúdo) alteradas antes da exportação incremental")
+    args = parser.parse_args()
+
+    import update_jira_sql as sync
+
+    sync.update_time = MARCA_DAGUA
+    pasta_original = os.getcwd()
+    linhas = []
+    for escala in (int(valor) for valor in args.escalas.split(",")):
+        conexao, conexao_servidor = multiprocessing.Pipe()
+        servidor = multiprocessing.Process(target=servir, args=(escala, conexao_servidor), daemon=True)
+        servidor.start()
+        with tempfile.TemporaryDirectory() as pasta:
+            os.chdir(pasta)
+            try:
+                sync.JIRA_BASE_URL = pedir(conexao, "url")
+                linhas.append((escala, "completa", *exportar(sync, conexao, completa=True)))
+                conferir_csv(sync, escala)
+                # As subtarefas de vídeo têm índice ímpar; as de conteúdo alteradas vêm na busca e ficam fora do CSV
+                pedir(conexao, "atualizar", range(2 * args.alteradas), ALTERACAO)
+                linhas.append((escala, "incremental", *exportar(sync, conexao, completa=False)))
+                conferir_csv(sync, escala)
+            finally:
+                os.chdir(pasta_original)
+                conexao.send(("parar",))
+                servidor.join()
+
+    print(
+        f"\n{'escala':>8}{'exportação':>12}{'tempo (s)':>11}{'requisições':>13}{'recebidas':>11}"
+        f"{'no CSV':>8}{'pico (MB)':>11}{'planilha (s)':>14}"
+    )
+    for escala, modo, duracao, requisicoes, recebidas, no_csv, pico, planilha in linhas:
+        print(
+            f"{escala:>8}{modo:>12}{duracao:>11.2f}{requisicoes:>13}{recebidas:>11}"
+            f"{no_csv:>8}{pico:>11.1f}{planilha:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
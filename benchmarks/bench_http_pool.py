@@ -0,0 +1,53 @@
+"""
+Compara conexões abertas e reaproveitadas por sincronização.
+
+Executa a paginação contra o servidor Jira falso duas vezes: uma chamando
+requests.get a cada página (comportamento anterior) e outra com a sessão
+compartilhada de jira_client.
+
+Uso: python -m benchmarks.bench_http_pool --issues 20000 --page-size 500 --workers 4
+"""
+import argparse
+import time
+
+import requests
+
+from benchmarks.fake_jira import ServidorJiraFalso
+from jira_client import criar_sessao, paginar_jira
+
+
+def executar(servidor, sessao, page_size, workers):
+    servidor.zerar_contadores()
+    inicio = time.perf_counter()
+    _, paginas = paginar_jira(
+        f"{servidor.url}/rest/api/2/search?jql=project%20%3D%20PROCONTEUD",
+        {"maxResults": page_size},
+        max_workers=workers,
+        sessao=sessao,
+    )
+    total = sum(len(pagina["issues"]) for pagina in paginas)
+    duracao = time.perf_counter() - inicio
+    return total, servidor.requisicoes, servidor.conexoes, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.0, help="latência artificial por página, em segundos")
+    args = parser.parse_args()
+
+    with ServidorJiraFalso(total_issues=args.issues, latencia=args.latencia) as servidor:
+        cenarios = [
+            ("requests.get por página", requests),
+            ("sessão com pool", criar_sessao(max_conexoes=args.workers)),
+        ]
+        print(f"{'cenário':<26}{'tarefas':>9}{'requisições':>13}{'conexões':>10}{'reusadas':>10}{'tempo (s)':>11}")
+        for nome, sessao in cenarios:
+            total, requisicoes, conexoes, duracao = executar(servidor, sessao, args.page_size, args.workers)
+            print(f"{nome:<26}{total:>9}{requisicoes:>13}{conexoes:>10}{requisicoes - conexoes:>10}{duracao:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Mede a inicialização a frio dos módulos da sincronização e da linha de comando.
+
+Cada caso roda várias vezes em um processo Python novo, com o tempo total do processo
+(interpretador + imports) e o tempo só dos imports. Também informa se o caso importou o
+pandas ou abriu conexão com o banco, o que nenhum deles deveria fazer.
+
+Uso: python -m benchmarks.bench_inicializacao --repeticoes 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+# Código de cada caso; o último print é lido pelo processo que mede
+CASOS = {
+    "import update_jira_sql": "import update_jira_sql as modulo",
+    "import create_jira_sql": "import create_jira_sql as modulo",
+    "jira_sql --help": (
+        "import jira_sql as modulo\n"
+        "try:\n"
+        "    modulo.main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass"
+    ),
+}
+
+MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+{codigo}
+imports = time.perf_counter() - inicio
+conexao = getattr(modulo, "sql_client", None)
+print(json.dumps({{"imports": imports, "pandas": "pandas" in sys.modules, "conexao": bool(conexao is not None and conexao.aberta)}}))
+"""
+
+
+def medir_caso(codigo, repeticoes):
+    totais, imports = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run(
+            [sys.executable, "-c", MEDICAO.format(codigo=codigo)],
+            cwd=RAIZ_PROJETO, stdout=subprocess.PIPE, text=True, check=True,
+        )
+        totais.append(time.perf_counter() - inicio)
+        resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+        imports.append(resultado["imports"])
+    return {
+        "total_ms": statistics.median(totais) * 1000,
+        "imports_ms": statistics.median(imports) * 1000,
+        "pandas": resultado["pandas"],
+        "conexao": resultado["conexao"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="imprime os resultados em JSON")
+    args = parser.parse_args()
+
+    resultados = {nome: medir_caso(codigo, args.repeticoes) for nome, codigo in CASOS.items()}
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    print(f"\n{'caso':<26}{'processo (ms)':>15}{'imports (ms)':>14}{'pandas':>8}{'conexão':>9}")
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<26}{r['total_ms']:>15.0f}{r['imports_ms']:>14.0f}"
+            f"{'sim' if r['pandas'] else 'não':>8}{'sim' if r['conexao'] else 'não':>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Mede o tamanho das páginas de busca no fio e o tempo para decodificá-las.
+
+Para cada página gravada (ou gerada com as tarefas sintéticas do servidor falso),
+compara o corpo sem compressão com gzip e deflate, o tempo de descompactar e o
+tempo de decodificar com json, orjson e msgspec (os que estiverem instalados). Por
+fim baixa as mesmas páginas do servidor falso com e sem Accept-Encoding para
+conferir os bytes realmente enviados.
+
+Uso: python -m benchmarks.bench_json --issues 5000
+     python -m benchmarks.bench_json --paginas paginas/
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+
+from benchmarks.fake_jira import ServidorJiraFalso, gerar_issue
+
+
+def gerar_paginas(issues, tamanho_pagina):
+    return [
+        json.dumps({
+            "startAt": inicio,
+            "maxResults": tamanho_pagina,
+            "total": issues,
+            "issues": [gerar_issue(i) for i in range(inicio, min(inicio + tamanho_pagina, issues))],
+        }).encode("utf-8")
+        for inicio in range(0, issues, tamanho_pagina)
+    ]
+
+
+def decodificadores():
+    disponiveis = {"json": json.loads}
+    try:
+        import orjson
+        disponiveis["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        disponiveis["msgspec"] = msgspec.json.decode
+    except ImportError:
+        pass
+    return disponiveis
+
+
+def melhor_tempo(funcao, corpos, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for corpo in corpos:
+            funcao(corpo)
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+
+def bytes_no_fio(issues, tamanho_pagina, aceitar):
+    with ServidorJiraFalso(total_issues=issues) as servidor:
+        os.environ["JIRA_BASE_URL"] = servidor.url
+        from jira_client import criar_sessao, paginar_jira
+
+        sessao = criar_sessao()
+        if not aceitar:
+            sessao.headers["Accept-Encoding"] = "identity"
+        inicio = time.perf_counter()
+        _, paginas = paginar_jira(f"{servidor.url}/rest/api/2/search", {"startAt": 0, "maxResults": tamanho_pagina}, sessao=sessao)
+        total = sum(len(pagina["issues"]) for pagina in paginas)
+        duracao = time.perf_counter() - inicio
+        sessao.close()
+        return servidor.bytes_enviados, total, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=5000)
+    parser.add_argument("--tamanho-pagina", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--paginas", type=Path, help="pasta com páginas gravadas (pagina_*.json)")
+    args = parser.parse_args()
+
+    if args.paginas:
+        corpos = [arquivo.read_bytes() for arquivo in sorted(args.paginas.glob("pagina_*.json"))]
+    else:
+        corpos = gerar_paginas(args.issues, args.tamanho_pagina)
+    quantidade = len(corpos)
+    original = sum(len(corpo) for corpo in corpos)
+
+    compactados = {
+        "gzip": [gzip.compress(corpo, compresslevel=6) for corpo in corpos],
+        "deflate": [zlib.compress(corpo, 6) for corpo in corpos],
+    }
+    descompactar = {"gzip": gzip.decompress, "deflate": zlib.decompress}
+
+    print(f"\n{quantidade} páginas, {original / quantidade / 1024:.0f} KiB por página sem compressão")
+    print(f"{'codificação':<12}{'KiB/página':>12}{'proporção':>11}{'descompactar (ms/página)':>27}")
+    print(f"{'identity':<12}{original / quantidade / 1024:>12.0f}{1:>11.2f}{0:>27.2f}")
+    for nome, lista in compactados.items():
+        tamanho = sum(len(corpo) for corpo in lista)
+        tempo = melhor_tempo(descompactar[nome], lista, args.repeticoes)
+        print(f"{nome:<12}{tamanho / quantidade / 1024:>12.0f}{tamanho / original:>11.2f}{tempo / quantidade * 1000:>27.2f}")
+
+    referencia = [json.loads(corpo) for corpo in corpos]
+    print(f"\n{'decodificador':<14}{'ms/página':>11}{'MiB/s':>9}")
+    for nome, decodificar in decodificadores().items():
+        if [decodificar(corpo) for corpo in corpos] != referencia:
+            raise SystemExit(f"{nome} decodificou as páginas de forma diferente do json")
+        tempo = melhor_tempo(decodificar, corpos, args.repeticoes)
+        print(f"{nome:<14}{tempo / quantidade * 1000:>11.2f}{original / tempo / 2**20:>9.0f}")
+
+    if not args.paginas:
+        print(f"\n{'servidor falso':<16}{'bytes enviados':>16}{'tarefas/s':>12}")
+        for nome, aceitar in (("sem compressão", False), ("gzip", True)):
+            enviados, total, duracao = bytes_no_fio(args.issues, args.tamanho_pagina, aceitar)
+            print(f"{nome:<16}{enviados:>16}{total / duracao:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Confere o planejamento de páginas de jira_client contra servidores que limitam o maxResults.
+
+Para cada limite do servidor falso, pagina uma consulta pedindo --max-results tarefas por
+página e confere que todas as tarefas chegam uma única vez e na ordem. Confere também que
+o número de requisições é o mínimo para o limite aplicado (nenhuma requisição vazia
+ao fim, nenhum intervalo pulado). Com --encurtar, parte das páginas volta mais curta que
+o limite, e as requisições complementares são contadas à parte.
+
+Uso: python -m benchmarks.bench_paginacao --issues 5003 --limites 0,50,100,250,1000 --encurtar 0.2
+"""
+import argparse
+import math
+
+from benchmarks.fake_jira import ServidorJiraFalso
+
+
+def paginar(jira_client, servidor, max_results):
+    params = {"fields": "summary", "startAt": 0, "maxResults": max_results}
+    servidor.zerar_contadores()
+    complementares = jira_client.metricas.valor("paginas_complementares_total", consulta="consulta")
+    total, paginas = jira_client.paginar_jira(f"{servidor.url}/rest/api/2/search?jql=bench", params)
+    chaves = [issue["key"] for pagina in paginas for issue in pagina.get("issues", [])]
+    complementares = jira_client.metricas.valor("paginas_complementares_total", consulta="consulta") - complementares
+    return total, chaves, servidor.requisicoes, complementares
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=5003)
+    parser.add_argument("--max-results", type=int, default=1000, help="maxResults pedido pelo cliente")
+    parser.add_argument("--limites", default="0,50,100,250,1000", help="limites de maxResults do servidor (0: sem limite)")
+    parser.add_argument("--encurtar", type=float, default=0.0, help="fração das páginas devolvidas pela metade")
+    args = parser.parse_args()
+
+    import jira_client
+
+    falhas = 0
+    print(f"\n{'limite':>7}{'tarefas':>9}{'únicas':>8}{'ordem':>7}{'requisições':>13}{'mínimo':>8}{'complementares':>16}")
+    for limite in (int(valor) for valor in args.limites.split(",")):
+        with ServidorJiraFalso(
+            total_issues=args.issues, limite_max_results=limite or None, encurtar=args.encurtar,
+        ) as servidor:
+            total, chaves, requisicoes, complementares = paginar(jira_client, servidor, args.max_results)
+
+        esperadas = [f"PROCONTEUD-{indice + 1}" for indice in range(total)]
+        minimo = math.ceil(total / min(args.max_results, limite or args.max_results))
+        em_ordem = chaves == esperadas
+        exato = requisicoes - complementares == minimo
+        falhas += not (em_ordem and exato)
+        print(
+            f"{limite or '-':>7}{len(chaves):>9}{len(set(chaves)):>8}{'sim' if em_ordem else 'NÃO':>7}"
+            f"{requisicoes:>13}{minimo:>8}{complementares:>16}"
+        )
+    if falhas:
+        raise SystemExit(f"{falhas} limites com tarefas faltando, repetidas ou requisições a mais")
+
+
+if __name__ == "__main__":
+    main()
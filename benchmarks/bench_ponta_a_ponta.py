@@ -0,0 +1,116 @@
+"""
+Mede a sincronização de ponta a ponta contra o servidor Jira falso e um banco descartável.
+
+Para cada escala (por padrão 1k, 10k e 100k tarefas, com duas subtarefas por tarefa)
+sobe um servidor falso e cria um banco descartável (banco_descartavel.py), e roda as
+etapas em um processo separado: obter_dados_jira, salvar_dados_mysql,
+atualizar_resumo_producao, obter_disciplinas_jira e salvar_disciplinas_mysql. Cada
+etapa informa itens/s e o pico de RSS do processo até o fim da etapa.
+
+O processo das etapas roda em uma pasta temporária com marcas d'água antigas, para que
+a sincronização não encerre com "Já foi atualizado hoje" nem altere os arquivos do projeto.
+
+Uso: python -m benchmarks.bench_ponta_a_ponta
+     python -m benchmarks.bench_ponta_a_ponta --escalas 1000,10000 --tamanho-pagina 500 --latencia 0.05
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.banco_descartavel import BancoDescartavel
+from benchmarks.fake_jira import ServidorJiraFalso
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+
+def executar_etapas(tamanho_pagina):
+    import update_jira_sql as sync
+
+    resultados = []
+
+    def medir(etapa, funcao, itens):
+        inicio = time.perf_counter()
+        retorno = funcao()
+        duracao = time.perf_counter() - inicio
+        resultados.append({
+            "etapa": etapa,
+            "itens": itens(retorno),
+            "segundos": duracao,
+            "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        })
+        return retorno
+
+    def paginacao(consulta):
+        base_url, params = consulta
+        return sync.paginar_jira(base_url, dict(params, maxResults=tamanho_pagina))
+
+    # Nas etapas de busca os itens são as tarefas recebidas do Jira; nas de gravação, as linhas
+    paginacao_dados = paginacao(sync.consulta_dados_jira())
+    dados = medir("obter_dados_jira", lambda: sync.obter_dados_jira(paginacao_dados), lambda _: paginacao_dados[0])
+    medir("salvar_dados_mysql", lambda: sync.salvar_dados_mysql(dados), lambda _: len(dados))
+    medir("atualizar_resumo_producao", sync.atualizar_resumo_producao, lambda _: len(dados))
+    quantidade_dados = len(dados)
+    del dados
+
+    paginacao_disciplinas = paginacao(sync.consulta_disciplinas_jira())
+    disciplinas = medir(
+        "obter_disciplinas_jira", lambda: sync.obter_disciplinas_jira(paginacao_disciplinas),
+        lambda _: paginacao_disciplinas[0],
+    )
+    medir("salvar_disciplinas_mysql", lambda: sync.salvar_disciplinas_mysql(disciplinas), lambda _: len(disciplinas))
+
+    sync.sql_client.close()
+    print(json.dumps({"linhas_dados": quantidade_dados, "etapas": resultados}))
+
+
+def medir_escala(issues, tamanho_pagina, latencia):
+    with ServidorJiraFalso(total_issues=issues, latencia=latencia) as servidor, \
+            BancoDescartavel(f"bench_jira_{os.getpid()}_{issues}") as banco, \
+            tempfile.TemporaryDirectory() as pasta:
+        for arquivo in ("last_updated.txt", "last_updated_disciplinas.txt"):
+            Path(pasta, arquivo).write_text("2000-01-01")
+        caminho = os.pathsep.join(filter(None, [str(RAIZ_PROJETO), os.environ.get("PYTHONPATH")]))
+        ambiente = dict(
+            os.environ, **banco.ambiente,
+            JIRA_BASE_URL=servidor.url, PYTHONPATH=caminho, SYNC_CACHE_FILE="", SYNC_REPLAY="0",
+        )
+        processo = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_ponta_a_ponta", "--etapas", "--tamanho-pagina", str(tamanho_pagina)],
+            cwd=pasta, env=ambiente, stdout=subprocess.PIPE, text=True, check=True,
+        )
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", default="1000,10000,100000", help="quantidades de tarefas, separadas por vírgula")
+    parser.add_argument("--tamanho-pagina", type=int, default=1000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="latência artificial por página, em segundos")
+    parser.add_argument("--etapas", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.etapas:
+        executar_etapas(args.tamanho_pagina)
+        return
+
+    escalas = [int(escala) for escala in args.escalas.split(",")]
+    resultados = [(issues, medir_escala(issues, args.tamanho_pagina, args.latencia)) for issues in escalas]
+
+    print(f"\n{'tarefas':>8}  {'etapa':<26}{'itens':>9}{'tempo (s)':>11}{'itens/s':>10}{'pico RSS (MB)':>15}")
+    for issues, resultado in resultados:
+        for etapa in resultado["etapas"]:
+            taxa = etapa["itens"] / etapa["segundos"] if etapa["segundos"] else 0
+            print(
+                f"{issues:>8}  {etapa['etapa']:<26}{etapa['itens']:>9}{etapa['segundos']:>11.2f}"
+                f"{taxa:>10.0f}{etapa['pico_rss_mb']:>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Mede a memória e o custo por linha dos registros da sincronização de tarefas.
+
+As tarefas sintéticas do servidor Jira falso são gravadas em páginas JSON, decodificadas e
+transformadas uma a uma, e as linhas ficam todas em memória, como na sincronização em lote.
+Para comparação, as mesmas linhas também são guardadas no formato anterior: um dicionário
+por tarefa, sem textos internados, que precisava virar tupla antes do executemany. Para
+cada formato, informa os bytes retidos por linha, o preparo das linhas para o executemany
+e o pico de RSS; cada formato roda em um processo próprio.
+
+Uso: python -m benchmarks.bench_registros --issues 100000
+"""
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fake_jira import gerar_issue
+
+FORMATOS = ("registros", "dicionarios")
+
+
+def medir_formato(issues, formato, tamanho_pagina=1000):
+    import update_jira_sql as sync
+
+    if formato == "dicionarios":
+        sync.REGISTRO_DADOS.internadas = ()
+    paginas = [
+        json.dumps({"issues": [gerar_issue(indice) for indice in range(inicio, min(issues, inicio + tamanho_pagina))]})
+        for inicio in range(0, issues, tamanho_pagina)
+    ]
+    gc.collect()
+    tracemalloc.start()
+    linhas = []
+    for texto in paginas:
+        registros = sync.transformar_pagina_dados(json.loads(texto)["issues"])
+        if formato == "dicionarios":
+            registros = [dict(zip(sync.COLUNAS_DADOS, registro)) for registro in registros]
+        linhas.extend(registros)
+    gc.collect()
+    retidos, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    if formato == "dicionarios":
+        lote = [tuple(linha[coluna] for coluna in sync.COLUNAS_DADOS) for linha in linhas]
+    else:
+        lote = linhas
+    preparo = time.perf_counter() - inicio
+    return {
+        "linhas": len(lote),
+        "bytes_por_linha": retidos / len(linhas),
+        "preparo_us": preparo / len(linhas) * 1e6,
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=100000)
+    parser.add_argument("--formato", choices=FORMATOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.formato:
+        print(json.dumps(medir_formato(args.issues, args.formato)))
+        return
+
+    print(f"\n{'formato':<13}{'linhas':>8}{'bytes/linha':>13}{'preparo (µs/linha)':>20}{'pico RSS (MB)':>15}")
+    for formato in FORMATOS:
+        processo = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_registros", "--issues", str(args.issues), "--formato", formato],
+            stdout=subprocess.PIPE, text=True, check=True,
+        )
+        r = json.loads(processo.stdout.strip().splitlines()[-1])
+        print(
+            f"{formato:<13}{r['linhas']:>8}{r['bytes_por_linha']:>13.0f}"
+            f"{r['preparo_us']:>20.2f}{r['pico_rss_mb']:>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Mede o snapshot analítico em Parquet: exportação completa, atualização incremental e uma
+agregação lida do snapshot em vez do MySQL.
+
+As tarefas e disciplinas do servidor Jira falso são gravadas em um banco descartável
+(banco_descartavel.py) e exportadas para uma pasta temporária. Depois, --alteradas tarefas
+passam a ter uma data de atualização posterior, a sincronização incremental grava só
+essas, e o snapshot é atualizado a partir das chaves gravadas. Para cada modo, informa o
+tempo, as linhas lidas do banco e as partições gravadas; confere que o snapshot
+atualizado é igual a uma exportação completa nova. Por fim compara a contagem de tarefas
+por entidade e situação no MySQL e no snapshot.
+
+Uso: python -m benchmarks.bench_snapshot --issues 20000 --alteradas 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.banco_descartavel import BancoDescartavel
+from benchmarks.fake_jira import ServidorJiraFalso
+
+# Datas posteriores a todas as datas sintéticas do servidor falso
+MARCA_DAGUA = "2030-01-01"
+ALTERACAO = "2030-01-02"
+
+
+def ler_snapshot(pasta, tabela):
+    import pyarrow.dataset as ds
+
+    dados = ds.dataset(os.path.join(pasta, tabela), format="parquet", partitioning="hive").to_table()
+    return dados.select(sorted(dados.column_names)).sort_by("chave") if dados.num_rows else dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--alteradas", type=int, default=200, help="tarefas alteradas antes da atualização incremental")
+    args = parser.parse_args()
+
+    with ServidorJiraFalso(total_issues=args.issues) as servidor, \
+            BancoDescartavel(f"bench_snapshot_{os.getpid()}") as banco, \
+            tempfile.TemporaryDirectory() as pasta:
+        os.environ.update(banco.ambiente, JIRA_BASE_URL=servidor.url)
+        import update_jira_sql as sync
+        from snapshot_analitico import TABELAS_POR_CHAVE, exportar_tabela, pa
+
+        if pa is None:
+            raise SystemExit("o snapshot analítico precisa do pyarrow")
+
+        snapshot = os.path.join(pasta, "snapshot")
+        sync.SYNC_SNAPSHOT_DIR = snapshot
+        sync.update_time = MARCA_DAGUA
+        sync.last_updated = sync.last_updated_disciplinas = "2000-01-01"
+        sync.salvar_dados_mysql(sync.obter_dados_jira())
+        sync.salvar_disciplinas_mysql(sync.obter_disciplinas_jira())
+        sync.chaves_gravadas["dados"].clear()
+        sync.chaves_gravadas["disciplinas"].clear()
+
+        def medir():
+            inicio = time.perf_counter()
+            resumo = sync.atualizar_snapshot_analitico()
+            return time.perf_counter() - inicio, resumo
+
+        resultados = {"completa": medir()}
+        servidor.atualizar(range(args.alteradas), ALTERACAO)
+        sync.last_updated = MARCA_DAGUA
+        sync.salvar_dados_mysql(sync.obter_dados_jira())
+        resultados["incremental"] = medir()
+
+        # Uma exportação completa nova, para conferir a atualização incremental
+        referencia = os.path.join(pasta, "referencia")
+        os.makedirs(referencia)
+        cursor = sync.sql_client.cursor()
+        try:
+            for tabela in TABELAS_POR_CHAVE:
+                exportar_tabela(cursor, referencia, tabela, "entidade")
+            iguais = all(
+                ler_snapshot(snapshot, tabela).equals(ler_snapshot(referencia, tabela)) for tabela in TABELAS_POR_CHAVE
+            )
+
+            inicio = time.perf_counter()
+            cursor.execute("SELECT entidade, situacao, COUNT(*) FROM db_dpc_jira GROUP BY entidade, situacao")
+            contagem_mysql = sorted(cursor.fetchall())
+            tempo_mysql = time.perf_counter() - inicio
+        finally:
+            cursor.close()
+        inicio = time.perf_counter()
+        agregado = ler_snapshot(snapshot, "db_dpc_jira").group_by(["entidade", "situacao"]).aggregate([("chave", "count")])
+        contagem_snapshot = sorted(zip(*(agregado[coluna].to_pylist() for coluna in ("entidade", "situacao", "chave_count"))))
+        tempo_snapshot = time.perf_counter() - inicio
+        sync.sql_client.close()
+
+    print(f"\n{'modo':<13}{'tempo (s)':>11}{'linhas lidas':>14}{'partições':>11}")
+    for modo, (duracao, resumo) in resultados.items():
+        linhas = sum(linhas for linhas, _ in resumo.values())
+        particoes = sum(particoes for _, particoes in resumo.values())
+        print(f"{modo:<13}{duracao:>11.2f}{linhas:>14}{particoes:>11}")
+    print(f"\nsnapshot atualizado igual à exportação completa: {'sim' if iguais else 'NÃO'}")
+    print(
+        f"contagem por entidade e situação: MySQL {tempo_mysql:.3f} s, snapshot {tempo_snapshot:.3f} s, "
+        f"{'iguais' if contagem_mysql == contagem_snapshot else 'DIFERENTES'}"
+    )
+    if not iguais:
+        raise SystemExit("o snapshot atualizado difere da exportação completa")
+
+
+if __name__ == "__main__":
+    main()
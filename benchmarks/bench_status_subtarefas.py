@@ -0,0 +1,136 @@
+"""
+Compara a consolidação de status das subtarefas antiga (listas por categoria varridas
+várias vezes) com o ConsolidadorStatus guiado por tabelas.
+
+As subtarefas são sintéticas e incluem os casos difíceis: várias subtarefas da mesma
+categoria, resumos com dois marcadores, letras minúsculas, status fora da tabela e
+tarefas de reuso. Os dois caminhos precisam dar o mesmo resultado antes da medição.
+
+Uso: python -m benchmarks.bench_status_subtarefas --tarefas 200000
+"""
+import argparse
+import random
+import time
+
+RESUMOS = [
+    "CONTRATO - ELABORAR: Disciplina",
+    "CONTEÚDO - ENTREGAR: Disciplina",
+    "VÍDEO - GRAVAR: Disciplina",
+    "vídeo - gravar: disciplina",
+    "CONTRATO - ELABORAR / VÍDEO - GRAVAR",
+    "REVISÃO - TEXTO",
+    "Material complementar",
+]
+SITUACOES = ["Aberto", "Resolvido", "Fechado/Aprovado", "Em Resolução", "Reopen", "Pendente", "Cancelado"]
+TIPOS = ["SR-Completa", "SR-Reuso", "SR-Modificada"]
+
+
+# Implementação anterior, mantida aqui como referência de resultado e de tempo
+def processar_status_legado(tipo_de_item, subtasks):
+    status_contrato = []
+    status_conteudos = []
+    status_videos = []
+    tem_video = False
+
+    final_status_contrato = None
+    final_status_conteudos = None
+    final_status_videos = None
+
+    for subtask in subtasks:
+        fields = subtask['fields']
+        summary = fields['summary'].upper()
+        status = fields['status']['name']
+
+        if "VÍDEO - GRAVAR" in summary:
+            tem_video = True
+
+        if tipo_de_item == "SR-Reuso":
+            final_status_conteudos = "REUSO"
+            final_status_videos = "REUSO"
+            final_status_contrato = "REUSO"
+            break
+        else:
+            if "CONTRATO - ELABORAR" in summary:
+                status_contrato.append(status)
+            elif "CONTEÚDO - ENTREGAR" in summary:
+                status_conteudos.append(status)
+            elif "VÍDEO - GRAVAR" in summary:
+                status_videos.append(status)
+                tem_video = True
+
+    if tipo_de_item != "SR-Reuso":
+        if "Aberto" in status_contrato:
+            final_status_contrato = "Aberto"
+        elif any(s in ["Resolvido", "Fechado/Aprovado"] for s in status_contrato):
+            final_status_contrato = "Fechado"
+        elif "Em Resolução" in status_contrato:
+            final_status_contrato = "Em Resolução"
+        elif any(s in ["Reopen", "Pendente"] for s in status_contrato):
+            final_status_contrato = "Pendente"
+
+        if "Aberto" in status_conteudos:
+            final_status_conteudos = "Aberto"
+        elif any(s in ["Resolvido", "Fechado/Aprovado"] for s in status_conteudos):
+            final_status_conteudos = "Fechado"
+        elif "Em Resolução" in status_conteudos:
+            final_status_conteudos = "Em Resolução"
+        elif any(s in ["Reopen", "Pendente"] for s in status_conteudos):
+            final_status_conteudos = "Pendente"
+
+        if "Aberto" in status_videos:
+            final_status_videos = "Aberto"
+        elif any(s in ["Resolvido", "Fechado/Aprovado"] for s in status_videos):
+            final_status_videos = "Fechado"
+        elif "Em Resolução" in status_videos:
+            final_status_videos = "Em Resolução"
+        elif any(s in ["Reopen", "Pendente"] for s in status_videos):
+            final_status_videos = "Pendente"
+
+    return final_status_contrato, final_status_conteudos, final_status_videos, tem_video
+
+
+def gerar_tarefas(quantidade, seed):
+    rnd = random.Random(seed)
+    return [
+        (
+            rnd.choice(TIPOS),
+            [
+                {"fields": {"summary": rnd.choice(RESUMOS), "status": {"name": rnd.choice(SITUACOES)}}}
+                for _ in range(rnd.randrange(9))
+            ],
+        )
+        for _ in range(quantidade)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tarefas", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from update_jira_sql import processar_status_lote
+
+    tarefas = gerar_tarefas(args.tarefas, args.seed)
+
+    inicio = time.perf_counter()
+    esperado = [processar_status_legado(tipo, subtasks) for tipo, subtasks in tarefas]
+    tempo_legado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = processar_status_lote(tarefas)
+    tempo_tabela = time.perf_counter() - inicio
+
+    diferentes = sum(a != b for a, b in zip(esperado, obtido))
+    if diferentes:
+        raise SystemExit(f"{diferentes} tarefas consolidadas de forma diferente")
+
+    subtarefas = sum(len(subtasks) for _, subtasks in tarefas)
+    print(f"\n{len(tarefas)} tarefas, {subtarefas} subtarefas, resultados idênticos")
+    print(f"{'consolidação':<14}{'tempo (s)':>11}{'tarefas/s':>12}")
+    for nome, tempo in (("legado", tempo_legado), ("tabelas", tempo_tabela)):
+        print(f"{nome:<14}{tempo:>11.3f}{len(tarefas) / tempo:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Mede memória de pico e vazão da sincronização de tarefas em lote e em fluxo contínuo.
+
+Cada modo roda em um processo separado, para que o pico de RSS de um não
+contamine o outro. As tarefas vêm do servidor Jira falso e são gravadas em
+um banco descartável (banco_descartavel.py), novo para cada modo; o banco do .env não
+é alterado.
+
+Uso: python -m benchmarks.bench_streaming --issues 100000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.banco_descartavel import BancoDescartavel
+from benchmarks.fake_jira import ServidorJiraFalso
+
+
+def executar_modo(modo):
+    import update_jira_sql as sync
+
+    inicio = time.perf_counter()
+    if modo == "streaming":
+        linhas = sync.sincronizar_dados_jira()
+    else:
+        dados = sync.obter_dados_jira()
+        sync.salvar_dados_mysql(dados)
+        linhas = len(dados)
+    duracao = time.perf_counter() - inicio
+
+    pico_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    sync.sql_client.close()
+    print(json.dumps({"modo": modo, "linhas": linhas, "segundos": duracao, "pico_rss_mb": pico_rss_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=100000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="latência artificial por página, em segundos")
+    parser.add_argument("--modo", choices=["lote", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        executar_modo(args.modo)
+        return
+
+    resultados = []
+    with ServidorJiraFalso(total_issues=args.issues, latencia=args.latencia) as servidor:
+        for modo in ("lote", "streaming"):
+            with BancoDescartavel(f"bench_streaming_{os.getpid()}_{modo}") as banco:
+                ambiente = dict(os.environ, **banco.ambiente, JIRA_BASE_URL=servidor.url)
+                processo = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_streaming", "--modo", modo],
+                    env=ambiente, stdout=subprocess.PIPE, text=True, check=True,
+                )
+            resultados.append(json.loads(processo.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'modo':<11}{'linhas':>9}{'tempo (s)':>11}{'linhas/s':>11}{'pico RSS (MB)':>15}")
+    for r in resultados:
+        print(f"{r['modo']:<11}{r['linhas']:>9}{r['segundos']:>11.2f}{r['linhas'] / r['segundos']:>11.0f}{r['pico_rss_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
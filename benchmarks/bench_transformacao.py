@@ -0,0 +1,68 @@
+"""
+Mede a vazão de transformar_pagina_dados.
+
+As páginas vêm do servidor Jira falso (ou de uma pasta de páginas gravadas com
+--gravar) e são transformadas --repeticoes vezes; vale o melhor tempo.
+
+Uso: python -m benchmarks.bench_transformacao --issues 20000
+     python -m benchmarks.bench_transformacao --issues 20000 --gravar paginas/
+     python -m benchmarks.bench_transformacao --paginas paginas/
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from benchmarks.fake_jira import ServidorJiraFalso
+
+
+def baixar_paginas(issues, tamanho_pagina):
+    with ServidorJiraFalso(total_issues=issues) as servidor:
+        os.environ["JIRA_BASE_URL"] = servidor.url
+        from jira_client import paginar_jira
+
+        base_url = f"{servidor.url}/rest/api/2/search"
+        _, paginas = paginar_jira(base_url, {"startAt": 0, "maxResults": tamanho_pagina})
+        return list(paginas)
+
+
+def medir(transformar, paginas, repeticoes):
+    melhor, linhas = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        linhas = [linha for pagina in paginas for linha in transformar(pagina.get("issues", []))]
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--tamanho-pagina", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--gravar", type=Path, help="pasta onde gravar as páginas baixadas")
+    parser.add_argument("--paginas", type=Path, help="pasta com páginas gravadas; dispensa o servidor falso")
+    args = parser.parse_args()
+
+    if args.paginas:
+        paginas = [json.loads(arquivo.read_text("utf-8")) for arquivo in sorted(args.paginas.glob("pagina_*.json"))]
+    else:
+        paginas = baixar_paginas(args.issues, args.tamanho_pagina)
+    if args.gravar:
+        args.gravar.mkdir(parents=True, exist_ok=True)
+        for numero, pagina in enumerate(paginas):
+            (args.gravar / f"pagina_{numero:05d}.json").write_text(json.dumps(pagina), "utf-8")
+
+    import update_jira_sql as sync
+
+    total_issues = sum(len(pagina.get("issues", [])) for pagina in paginas)
+    tempo, linhas = medir(sync.transformar_pagina_dados, paginas, args.repeticoes)
+
+    print(f"\n{len(paginas)} páginas, {total_issues} tarefas, {len(linhas)} linhas")
+    print(f"{'tempo (s)':>11}{'tarefas/s':>12}")
+    print(f"{tempo:>11.3f}{total_issues / tempo:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compara a gravação linha a linha com a gravação em lotes em salvar_dados_mysql.
+
+As tarefas vêm do servidor Jira falso e são gravadas em um banco descartável
+(banco_descartavel.py), junto com os cursos e coordenadores que a gravação cadastra;
+o banco do .env não é alterado.
+
+Uso: python -m benchmarks.bench_upsert --issues 10000 --lote 500
+"""
+import argparse
+import os
+import time
+
+from benchmarks.banco_descartavel import BancoDescartavel
+from benchmarks.fake_jira import ServidorJiraFalso
+
+
+def medir(sync, dados, tamanho_lote):
+    cursor = sync.sql_client.cursor()
+    cursor.execute("TRUNCATE TABLE db_dpc_jira")
+    cursor.close()
+    tempos = []
+    # A primeira gravação insere as linhas, a segunda encontra todas com o mesmo hash e não
+    # grava nada, e a terceira força a passagem pelo ON DUPLICATE KEY UPDATE
+    for pular_inalterados in (True, True, False):
+        inicio = time.perf_counter()
+        sync.salvar_dados_mysql(dados, tamanho_lote, pular_inalterados)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=10000)
+    parser.add_argument("--lote", type=int, default=500)
+    args = parser.parse_args()
+
+    with ServidorJiraFalso(total_issues=args.issues) as servidor, \
+            BancoDescartavel(f"bench_upsert_{os.getpid()}") as banco:
+        os.environ.update(banco.ambiente, JIRA_BASE_URL=servidor.url)
+        import update_jira_sql as sync
+
+        dados = sync.obter_dados_jira()
+        try:
+            resultados = [(tamanho, medir(sync, dados, tamanho)) for tamanho in (1, args.lote)]
+        finally:
+            sync.sql_client.close()
+
+    print(f"\n{'lote':>6}{'linhas':>9}{'insert (s)':>12}{'inalterado (s)':>16}{'update (s)':>12}{'linhas/s':>11}")
+    for tamanho, (insercao, inalterado, atualizacao) in resultados:
+        print(
+            f"{tamanho:>6}{len(dados):>9}{insercao:>12.2f}{inalterado:>16.2f}{atualizacao:>12.2f}"
+            f"{len(dados) / insercao:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
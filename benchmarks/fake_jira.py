@@ -0,0 +1,310 @@
+"""
+Servidor local que imita o endpoint /rest/api/2/search do Jira para os benchmarks.
+
+Gera tarefas sintéticas do projeto PROCONTEUD e conta quantas conexões TCP
+foram abertas, quantas requisições foram atendidas e quantos bytes de corpo foram
+enviados. Com compressao=True responde em gzip quando o cliente aceita.
+
+Consultas com "Sub-task" no JQL (a busca de disciplinas) recebem subtarefas cujas
+tarefas pai são as tarefas sintéticas; as demais recebem as tarefas. Os filtros das
+partições da carga completa (cascadeOption do "Entidade e Curso", também negado com NOT,
+e created >= / <), o updated >= das consultas incrementais e o component = das
+subtarefas são aplicados; o resto do JQL é ignorado. Com atualizar(), tarefas escolhidas passam a ter outra data de
+atualização, como se tivessem sido editadas no Jira. Com custo_deslocamento, cada página demora
+mais quanto maior o startAt, como as buscas profundas do Jira.
+
+Como o Jira, o servidor limita o maxResults pedido a limite_max_results e informa na
+resposta o valor aplicado. Com encurtar, essa fração das páginas (escolhidas pelo
+startAt, de forma determinística) volta com metade das tarefas.
+"""
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# "Pós-Graduação EAD" não está em ENTIDADES_VALIDAS, mas o transform a aceita pelo prefixo "Pós-Graduação"
+ENTIDADES = ["CETEC", "CEAB", "CECA", "CEDUC", "CEENG", "CEGEP", "CEJUR", "CES", "YMED", "YVET", "Pós-Graduação EAD"]
+SITUACOES = ["Aberto", "Resolvido", "Fechado/Aprovado", "Em Resolução", "Reopen", "Pendente"]
+TIPOS = ["SR-Completa", "SR-Reuso", "SR-Modificada"]
+SUBTAREFAS = ["CONTRATO - ELABORAR", "CONTEÚDO - ENTREGAR", "VÍDEO - GRAVAR"]
+
+PADRAO_ENTIDADE = re.compile(r'cascadeOption\("([^"]+)"\)')
+# Partição restante: NOT ("Entidade e Curso" in cascadeOption(...) OR ...)
+PADRAO_ENTIDADE_EXCLUIDA = re.compile(r'NOT \("Entidade e Curso" in cascadeOption')
+PADRAO_CRIACAO = re.compile(r'created\s*(>=|<)\s*"?(\d{4}-\d{2}-\d{2})"?')
+PADRAO_ATUALIZACAO = re.compile(r'updated\s*>=\s*"?(\d{4}-\d{2}-\d{2})"?')
+PADRAO_COMPONENTE = re.compile(r'component\s*=\s*"([^"]+)"')
+
+
+def _gerar_descricao(rnd, curso):
+    variante = rnd.random()
+    if variante < 0.7:
+        return f"{{panel}}CURSO: {curso}{{panel}} " + "x" * rnd.randrange(200, 2000)
+    if variante < 0.8:
+        return f"{{color}}{curso}{{color}}"
+    if variante < 0.85:
+        return "{panel}Bom dia, segue o material{panel}"
+    if variante < 0.9:
+        return "Descrição sem marcação"
+    return None
+
+
+def _gerar_versoes(rnd, mes, ano):
+    versoes = []
+    for _ in range(rnd.choice([0, 1, 1, 1, 2])):
+        versao = {"name": rnd.choice([f"{mes:02d}{ano}-LANC", f"{mes:02d}{ano}-REOF", "Backlog"])}
+        if rnd.random() < 0.9:
+            versao["releaseDate"] = f"{ano}-{mes:02d}-{rnd.randrange(1, 29):02d}"
+        versoes.append(versao)
+    return versoes
+
+
+def gerar_issue(indice, seed=0):
+    """
+    Gera uma tarefa sintética determinística no formato retornado pela busca do Jira.
+
+    Uma parte das tarefas cai nos casos que o transform descarta ou trata de forma
+    especial: entidade fora da lista, curso só na descrição, descrição sem curso,
+    tarefas sem versão ou com várias versões.
+    """
+    rnd = random.Random(seed * 1_000_003 + indice)
+    entidade = rnd.choice(ENTIDADES) if rnd.random() < 0.95 else "Graduação"
+    curso = f"Curso {rnd.randrange(500)}"
+    mes = rnd.randrange(1, 13)
+    ano = rnd.choice([2023, 2024, 2025, 2026])
+    chave = f"PROCONTEUD-{indice + 1}"
+    tipo_de_item = rnd.choice(TIPOS)
+    return {
+        "key": chave,
+        "fields": {
+            "customfield_10808": {
+                "value": f"Fac. Unyleya | {entidade}",
+                "child": {"value": curso} if rnd.random() < 0.6 else {},
+            } if rnd.random() < 0.98 else None,
+            "labels": rnd.sample(["SV>CV", "prioridade", "reoferta"], rnd.randrange(3)),
+            "description": _gerar_descricao(rnd, curso),
+            "customfield_10803": f"Coordenador {rnd.randrange(80)} / Coordenador {rnd.randrange(80)}",
+            "customfield_10804": rnd.choice(["InsBE", "IBREAD", None]),
+            "created": f"{ano}-{mes:02d}-01T10:00:00.000-0300",
+            "updated": f"{ano}-{mes:02d}-15T10:00:00.000-0300",
+            "fixVersions": _gerar_versoes(rnd, mes, ano),
+            "components": [],
+            "duedate": f"{ano}-{mes:02d}-20" if rnd.random() < 0.9 else None,
+            "summary": f"{curso}: Disciplina {indice}",
+            "issuetype": {"name": tipo_de_item},
+            "status": {"name": rnd.choice(["Done", "In Progress", "To Do"])},
+            "customfield_11303": f"{rnd.randrange(10**11):011d}" if rnd.random() < 0.7 else None,
+            "customfield_10802": f"Conteudista {rnd.randrange(300)}",
+            "subtasks": [
+                {"fields": {"summary": f"{tipo}: Disciplina {indice}", "status": {"name": rnd.choice(SITUACOES)}}}
+                for tipo in rnd.sample(SUBTAREFAS, rnd.randrange(len(SUBTAREFAS) + 1))
+            ],
+        },
+    }
+
+
+def gerar_subtarefa(indice, total_issues, seed=0):
+    """
+    Gera uma subtarefa (disciplina) determinística. Cada tarefa pai recebe duas, uma de
+    conteúdo e uma de vídeo (índice ímpar), e as subtarefas herdam a entidade, o curso e o
+    coordenador do pai. Só as de vídeo têm "VÍDEO - GRAVAR" no resumo; algumas de
+    conteúdo citam o vídeo na descrição, e um text ~ do Jira também as traria.
+    """
+    rnd = random.Random(seed * 1_000_003 + 500_009 + indice)
+    pai = gerar_issue((indice // 2) % max(1, total_issues), seed)
+    campos_pai = pai["fields"]
+    componente = SUBTAREFAS[1 + indice % 2]
+    criacao = campos_pai["created"]
+    return {
+        "key": f"PROCONTEUD-{total_issues + indice + 1}",
+        "fields": {
+            "parent": {"key": pai["key"]},
+            "customfield_10808": campos_pai["customfield_10808"],
+            "labels": campos_pai["labels"],
+            "customfield_10803": campos_pai["customfield_10803"],
+            "customfield_10804": campos_pai["customfield_10804"],
+            "created": criacao,
+            "updated": campos_pai["updated"],
+            "resolutiondate": criacao.replace("-01T", "-10T") if rnd.random() < 0.5 else None,
+            "components": [{"name": componente}],
+            "duedate": campos_pai["duedate"],
+            "summary": f"Disciplina {indice // 2}: {componente}",
+            "issuetype": {"name": "Sub-task"},
+            "status": {"name": rnd.choice(SITUACOES)},
+            "customfield_11303": campos_pai["customfield_11303"],
+            "customfield_10802": campos_pai["customfield_10802"],
+            # Parte das subtarefas de conteúdo cita o vídeo só na descrição
+            "description": (
+                f"Entregar depois da subtarefa {SUBTAREFAS[2]}" if componente != SUBTAREFAS[2] and rnd.random() < 0.3 else None
+            ),
+        },
+    }
+
+
+class _JiraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.registrar_conexao()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/rest/api/2/search":
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        start_at = int(query.get("startAt", ["0"])[0])
+        max_results = int(query.get("maxResults", ["50"])[0])
+        jql = query.get("jql", [""])[0]
+        corpo = self.server.pagina(start_at, max_results, "Sub-task" in jql, jql)
+        aceitas = self.headers.get("Accept-Encoding", "")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if self.server.compressao and "gzip" in aceitas:
+            corpo = gzip.compress(corpo, compresslevel=6)
+            self.send_header("Content-Encoding", "gzip")
+        self.server.registrar_envio(len(corpo))
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class ServidorJiraFalso(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, total_issues=1000, latencia=0.0, seed=0, porta=0, compressao=True, total_subtarefas=None,
+        custo_deslocamento=0.0, limite_max_results=None, encurtar=0.0,
+    ):
+        super().__init__(("127.0.0.1", porta), _JiraHandler)
+        self.total_issues = total_issues
+        self.total_subtarefas = 2 * total_issues if total_subtarefas is None else total_subtarefas
+        self.latencia = latencia
+        # Segundos a mais por 1000 tarefas de startAt
+        self.custo_deslocamento = custo_deslocamento
+        self.limite_max_results = limite_max_results
+        self.encurtar = encurtar
+        self._atributos = None
+        self._indices = {}
+        # Datas de atualização trocadas por atualizar(): (tarefas, subtarefas), índice -> data
+        self._atualizacoes = ({}, {})
+        self.seed = seed
+        self.compressao = compressao
+        self.conexoes = 0
+        self.requisicoes = 0
+        self.bytes_enviados = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def registrar_conexao(self):
+        with self._lock:
+            self.conexoes += 1
+
+    def registrar_envio(self, tamanho):
+        with self._lock:
+            self.bytes_enviados += tamanho
+
+    def filtrar(self, jql, subtarefas=False):
+        """Índices das tarefas (ou subtarefas) que passam nos filtros de partição do JQL; None sem filtros."""
+        entidades = PADRAO_ENTIDADE.findall(jql)
+        excluir_entidades = bool(PADRAO_ENTIDADE_EXCLUIDA.search(jql))
+        criacao = PADRAO_CRIACAO.findall(jql)
+        atualizacao = PADRAO_ATUALIZACAO.findall(jql)
+        componentes = PADRAO_COMPONENTE.findall(jql) if subtarefas else []
+        if not entidades and not criacao and not atualizacao and not componentes:
+            return None
+        with self._lock:
+            if (jql, subtarefas) in self._indices:
+                return self._indices[(jql, subtarefas)]
+            if self._atributos is None:
+                # Entidade e datas de criação e atualização de cada tarefa, calculadas uma vez por servidor
+                self._atributos = []
+                for i in range(self.total_issues):
+                    campos = gerar_issue(i, self.seed)["fields"]
+                    self._atributos.append(
+                        ((campos["customfield_10808"] or {}).get("value"), campos["created"][:10], campos["updated"][:10])
+                    )
+
+            def passa(indice_tarefa, atualizada):
+                entidade, criada, _ = self._atributos[indice_tarefa]
+                if entidades and (entidade in entidades) == excluir_entidades:
+                    return False
+                if any(atualizada < data for data in atualizacao):
+                    return False
+                return all(criada >= data if operador == ">=" else criada < data for operador, data in criacao)
+
+            if subtarefas:
+                indices = []
+                for i in range(self.total_subtarefas):
+                    pai = (i // 2) % max(1, self.total_issues)
+                    if componentes and SUBTAREFAS[1 + i % 2] not in componentes:
+                        continue
+                    if passa(pai, self._atualizacoes[1].get(i, self._atributos[pai][2])):
+                        indices.append(i)
+            else:
+                indices = [i for i in range(self.total_issues) if passa(i, self._atualizacoes[0].get(i, self._atributos[i][2]))]
+            self._indices[(jql, subtarefas)] = indices
+            return indices
+
+    def pagina(self, start_at, max_results, subtarefas=False, jql=""):
+        with self._lock:
+            self.requisicoes += 1
+        if self.latencia or self.custo_deslocamento:
+            time.sleep(self.latencia + self.custo_deslocamento * start_at / 1000)
+        indices = self.filtrar(jql, subtarefas)
+        if indices is None:
+            indices = range(self.total_subtarefas if subtarefas else self.total_issues)
+        total = len(indices)
+        if self.limite_max_results:
+            max_results = min(max_results, self.limite_max_results)
+        quantidade = max_results
+        if self.encurtar and max_results > 1 and random.Random(start_at).random() < self.encurtar:
+            quantidade = max_results // 2
+        gerar = (lambda i: gerar_subtarefa(i, self.total_issues, self.seed)) if subtarefas else (lambda i: gerar_issue(i, self.seed))
+        atualizacoes = self._atualizacoes[subtarefas]
+        issues = []
+        for i in indices[start_at:start_at + quantidade]:
+            issue = gerar(i)
+            if i in atualizacoes:
+                issue["fields"]["updated"] = f"{atualizacoes[i]}T10:00:00.000-0300"
+            issues.append(issue)
+        return json.dumps({
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": total,
+            "issues": issues,
+        }).encode("utf-8")
+
+    def atualizar(self, indices, data, subtarefas=False):
+        """Passa as tarefas (ou subtarefas) dos índices a ter data (AAAA-MM-DD) como data de atualização."""
+        with self._lock:
+            self._atualizacoes[subtarefas].update((indice, data) for indice in indices)
+            self._indices.clear()
+
+    def zerar_contadores(self):
+        with self._lock:
+            self.conexoes = 0
+            self.requisicoes = 0
+            self.bytes_enviados = 0
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
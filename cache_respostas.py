@@ -0,0 +1,104 @@
+"""
+Cache local das respostas de busca do Jira, para reprocessar as tarefas sem consultar o servidor.
+
+Cada tarefa é guardada como JSON comprimido com zlib em um arquivo SQLite, pela consulta
+de origem ("dados", "disciplinas", ...) e pela chave, junto com o campo updated; uma
+tarefa já guardada só é regravada quando o updated muda. No reprocessamento o cache
+entrega páginas no mesmo formato da API de busca.
+"""
+import json
+import sqlite3
+import zlib
+
+SQL_CRIAR_CACHE = """
+    CREATE TABLE IF NOT EXISTS respostas (
+        consulta TEXT NOT NULL,
+        chave TEXT NOT NULL,
+        updated TEXT,
+        corpo BLOB NOT NULL,
+        PRIMARY KEY (consulta, chave)
+    )
+"""
+SQL_GUARDAR_RESPOSTA = """
+    INSERT INTO respostas (consulta, chave, updated, corpo) VALUES (?, ?, ?, ?)
+    ON CONFLICT (consulta, chave) DO UPDATE SET updated = excluded.updated, corpo = excluded.corpo
+    WHERE respostas.updated IS NOT excluded.updated
+"""
+
+# Tarefas guardadas por página do reprocessamento
+TAMANHO_PAGINA_CACHE = 1000
+
+class CacheRespostas:
+    """
+    Arquivo SQLite com as tarefas de cada consulta. A conexão pode ser usada por uma thread
+    diferente da que a abriu (os estágios do pipeline rodam em threads próprias), desde
+    que uma de cada vez.
+    """
+    def __init__(self, caminho):
+        self.conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.conexao.execute(SQL_CRIAR_CACHE)
+
+    def guardar(self, consulta, issues):
+        linhas = [
+            (
+                consulta,
+                issue["key"],
+                (issue.get("fields") or {}).get("updated"),
+                zlib.compress(json.dumps(issue, ensure_ascii=False).encode("utf-8")),
+            )
+            for issue in issues
+        ]
+        with self.conexao:
+            self.conexao.executemany(SQL_GUARDAR_RESPOSTA, linhas)
+
+    def total(self, consulta):
+        return self.conexao.execute("SELECT COUNT(*) FROM respostas WHERE consulta = ?", (consulta,)).fetchone()[0]
+
+    def paginas(self, consulta, tamanho_pagina=TAMANHO_PAGINA_CACHE):
+        """Retorna o total e um gerador de páginas, como paginar_jira, com as tarefas em ordem de chave."""
+        total = self.total(consulta)
+
+        def gerar():
+            cursor = self.conexao.execute("SELECT corpo FROM respostas WHERE consulta = ? ORDER BY chave", (consulta,))
+            try:
+                inicio = 0
+                while True:
+                    linhas = cursor.fetchmany(tamanho_pagina)
+                    if not linhas:
+                        return
+                    yield {
+                        "startAt": inicio,
+                        "maxResults": tamanho_pagina,
+                        "total": total,
+                        "issues": [json.loads(zlib.decompress(corpo)) for (corpo,) in linhas],
+                    }
+                    inicio += len(linhas)
+            finally:
+                cursor.close()
+
+        return total, gerar()
+
+    def fechar(self):
+        self.conexao.close()
+
+# Função para guardar no cache as páginas de uma consulta à medida que são consumidas
+def guardar_paginas(caminho, consulta, paginacao):
+    """
+    Recebe o (total, gerador de páginas) de buscar_consultas e devolve outro igual que
+    guarda as tarefas de cada página antes de entregá-la. O arquivo é aberto na thread
+    que consome as páginas.
+    """
+    total, paginas = paginacao
+
+    def gerar():
+        cache = CacheRespostas(caminho)
+        try:
+            for pagina in paginas:
+                cache.guardar(consulta, pagina.get("issues", []))
+                yield pagina
+        finally:
+            paginas.close()
+            cache.fechar()
+
+    return total, gerar()
@@ -0,0 +1,37 @@
+"""
+Conexão com o banco aberta só no primeiro uso.
+
+update_jira_sql.py e create_jira_sql.py expõem a conexão como sql_client no módulo.
+Com a conexão tardia, importar um deles não conecta ao MySQL, e os comandos que não
+usam o banco (escola-tecnica, a maior parte dos benchmarks) nunca abrem conexão.
+"""
+import threading
+
+class ConexaoTardia:
+    """Repassa atributos e métodos para a conexão criada por abrir(), que só é chamada no primeiro acesso."""
+    def __init__(self, abrir):
+        self._abrir = abrir
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    @property
+    def aberta(self):
+        return self._conexao is not None
+
+    def conexao(self):
+        if self._conexao is None:
+            with self._lock:
+                if self._conexao is None:
+                    print('connecting to database')
+                    self._conexao = self._abrir()
+                    print('connected to database')
+        return self._conexao
+
+    def __getattr__(self, nome):
+        return getattr(self.conexao(), nome)
+
+    # Fechar uma conexão que nunca foi aberta não faz nada; um novo acesso abre outra
+    def close(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
@@ -0,0 +1,118 @@
+"""
+Comandos SQL de consulta e manutenção das dimensões e do resumo de produção usados
+pela sincronização, e a verificação dos seus planos de execução.
+
+O mesmo texto é executado pela sincronização e explicado com EXPLAIN pelo
+create_jira_sql.py. O módulo não abre conexão nenhuma.
+"""
+
+# Dimensões carregadas inteiras uma vez por execução (tabelas pequenas, lidas por completo de propósito)
+SQL_CARREGAR_COORDENADORES = "SELECT id, coordenador, coordenador_master FROM coordenadores"
+SQL_CARREGAR_CURSOS = "SELECT id, nome_curso, entidade, coordenador_id FROM cursos"
+
+# Coordenadores novos ou com coordenador_master alterado
+SQL_UPSERT_COORDENADORES = """
+    INSERT INTO coordenadores (coordenador, coordenador_master)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE coordenador_master = VALUES(coordenador_master)
+"""
+
+# IDs dos membros recém-inseridos, consultados pela chave única de cada dimensão
+SQL_COORDENADORES_POR_NOME = "SELECT id, coordenador FROM coordenadores WHERE coordenador IN ({marcadores})"
+SQL_CURSOS_POR_NOME = "SELECT id, nome_curso, entidade FROM cursos WHERE (nome_curso, entidade) IN ({marcadores})"
+
+# Curso das tarefas pai das disciplinas, consultado em lotes de chaves
+SQL_CURSOS_PAIS = "SELECT chave, curso FROM db_dpc_jira WHERE chave IN ({marcadores})"
+
+# Hash do conteúdo já gravado, para ignorar as linhas que chegam sem alteração
+SQL_HASHES_DADOS = "SELECT chave, hash_conteudo FROM db_dpc_jira WHERE chave IN ({marcadores})"
+SQL_HASHES_DISCIPLINAS = "SELECT chave, hash_conteudo FROM db_dpc_jira_disciplinas WHERE chave IN ({marcadores})"
+
+# Resumo de produção por curso (tabela resumo_producao, lida pela vw_analise_producao).
+# {filtro} escolhe os cursos recalculados: todos na carga inicial, só os alterados na sincronização
+SQL_RESUMO_PRODUCAO = """
+    SELECT
+        curso_id,
+        MIN(data_criacao) AS primeira_data_criacao,
+        COUNT(*) AS total_disciplinas,
+        SUM(CASE 
+            WHEN tipo_de_item = 'SR-Completa' AND status_conteudos = 'Fechado' THEN 1 
+            ELSE 0 
+        END) AS conteudo_fechado,
+        SUM(CASE 
+            WHEN tipo_de_item = 'SR-Completa' AND status_videos = 'Fechado' THEN 1
+            ELSE 0 
+        END) AS video_fechado,
+        SUM(CASE 
+            WHEN tipo_de_item = 'SR-Reuso' THEN 1 
+            ELSE 0 
+        END) AS disciplinas_reuso
+    FROM db_dpc_jira
+    WHERE {filtro}
+    GROUP BY curso_id
+"""
+SQL_INSERIR_RESUMO = """
+    INSERT INTO resumo_producao (
+        curso_id, primeira_data_criacao, total_disciplinas, conteudo_fechado, video_fechado, disciplinas_reuso
+    )
+""" + SQL_RESUMO_PRODUCAO
+SQL_APAGAR_RESUMO = "DELETE FROM resumo_producao WHERE curso_id IN ({marcadores})"
+
+# Cursos a recalcular: o curso atual das tarefas antes da gravação (pode mudar) e
+# os cursos das tarefas gravadas desde a marca d'água
+SQL_CURSO_ID_POR_CHAVE = "SELECT curso_id FROM db_dpc_jira WHERE chave IN ({marcadores}) AND curso_id IS NOT NULL"
+SQL_CURSOS_ATUALIZADOS_DESDE = (
+    "SELECT DISTINCT curso_id FROM db_dpc_jira WHERE data_atualizacao >= %s AND curso_id IS NOT NULL"
+)
+
+# Snapshot analítico (snapshot_analitico.py). As tabelas fato são lidas por partição (índice
+# (entidade, curso); <=> também encontra a partição das linhas sem entidade) e, nas
+# atualizações, pelas chaves gravadas ou atualizadas desde o último snapshot
+SQL_SNAPSHOT_TABELA = "SELECT * FROM {tabela}"
+SQL_SNAPSHOT_PARTICOES = "SELECT DISTINCT {coluna} FROM {tabela}"
+SQL_SNAPSHOT_POR_PARTICAO = "SELECT * FROM {tabela} WHERE {coluna} <=> %s"
+SQL_SNAPSHOT_POR_CHAVE = "SELECT * FROM {tabela} WHERE chave IN ({marcadores})"
+SQL_SNAPSHOT_ATUALIZADAS_DESDE = "SELECT chave FROM {tabela} WHERE data_atualizacao >= %s"
+
+# Comandos conferidos por verificar_planos: nome -> (comando, parâmetros de exemplo)
+PLANOS_VERIFICADOS = {
+    "cursos_pais": (SQL_CURSOS_PAIS.format(marcadores="%s, %s"), ("PROCONTEUD-1", "PROCONTEUD-2")),
+    "coordenadores_por_nome": (SQL_COORDENADORES_POR_NOME.format(marcadores="%s, %s"), ("A", "B")),
+    "cursos_por_nome": (
+        SQL_CURSOS_POR_NOME.format(marcadores="(%s, %s), (%s, %s)"),
+        ("Curso A", "CETEC", "Curso B", "CEAB"),
+    ),
+    "hashes_dados": (SQL_HASHES_DADOS.format(marcadores="%s, %s"), ("PROCONTEUD-1", "PROCONTEUD-2")),
+    "hashes_disciplinas": (SQL_HASHES_DISCIPLINAS.format(marcadores="%s, %s"), ("PROCONTEUD-1", "PROCONTEUD-2")),
+    "curso_id_por_chave": (SQL_CURSO_ID_POR_CHAVE.format(marcadores="%s, %s"), ("PROCONTEUD-1", "PROCONTEUD-2")),
+    "cursos_atualizados_desde": (SQL_CURSOS_ATUALIZADOS_DESDE, ("2999-01-01",)),
+    "resumo_producao": (SQL_RESUMO_PRODUCAO.format(filtro="curso_id IN (%s, %s)"), (1, 2)),
+    **{
+        f"snapshot_{nome}_{tabela}": (sql.format(tabela=tabela, coluna="entidade", marcadores="%s, %s"), parametros)
+        for tabela in ("db_dpc_jira", "db_dpc_jira_disciplinas")
+        for nome, sql, parametros in (
+            ("particoes", SQL_SNAPSHOT_PARTICOES, ()),
+            ("por_particao", SQL_SNAPSHOT_POR_PARTICAO, ("CETEC",)),
+            ("por_chave", SQL_SNAPSHOT_POR_CHAVE, ("PROCONTEUD-1", "PROCONTEUD-2")),
+            ("atualizadas_desde", SQL_SNAPSHOT_ATUALIZADAS_DESDE, ("2999-01-01",)),
+        )
+    },
+}
+
+# Função para conferir se algum comando da sincronização voltou a varrer uma tabela inteira
+def verificar_planos(cursor, planos=PLANOS_VERIFICADOS):
+    """
+    Roda EXPLAIN em cada comando e devolve uma lista (comando, tabela, linhas estimadas)
+    com as tabelas lidas por varredura completa (type = ALL). Tabelas derivadas, como as
+    subconsultas do FROM, não contam.
+    """
+    varreduras = []
+    for nome, (sql, parametros) in planos.items():
+        cursor.execute("EXPLAIN " + sql, parametros)
+        colunas = [descricao[0] for descricao in cursor.description]
+        for linha in cursor.fetchall():
+            plano = dict(zip(colunas, linha))
+            tabela = plano.get("table") or ""
+            if plano.get("type") == "ALL" and not tabela.startswith("<"):
+                varreduras.append((nome, tabela, plano.get("rows")))
+    return varreduras
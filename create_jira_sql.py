@@ -1,10 +1,13 @@
 import os
+import sys
 import time
 import pymysql
 import base64
 from dotenv import load_dotenv
 from tqdm import tqdm
 from datetime import datetime
+from conexao_tardia import ConexaoTardia
+from consultas_sincronizacao import PLANOS_VERIFICADOS, SQL_INSERIR_RESUMO, verificar_planos
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -32,18 +35,17 @@ if use_client:
     DB_USER = os.getenv("11DB_USER")
     DB_PASSWORD = os.getenv("11DB_PASSWORD")
     DB_NAME = os.getenv("11DB_NAME")
-    DB_PORT = int(os.getenv("11DB_PORT"))
+    DB_PORT = int(os.getenv("11DB_PORT", "3306"))
 else:
     DB_HOST = os.getenv("DB_HOST")
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     DB_NAME = os.getenv("DB_NAME")
-    DB_PORT = int(os.getenv("DB_PORT"))
+    DB_PORT = int(os.getenv("DB_PORT", "3306"))
 
 ano_atual = datetime.now().year
 mes_atual = datetime.now().month
 
-last_updated = open('last_updated.txt', 'r').read().strip()
 update_time = datetime.now().strftime('%Y-%m-%d')
 
 # Atualizar o CREATE_TABLE_SQL para incluir a nova estrutura
@@ -59,14 +61,19 @@ CREATE TABLE IF NOT EXISTS db_dpc_jira_disciplinas (
     disciplina TEXT,
     coordenador_id INT,
     coordenador TEXT,
+    coordenador_chave VARCHAR(255),
     coordenador_master TEXT,
     entidade_curso TEXT,
     entidade VARCHAR(50),
     migracao VARCHAR(10),
-    curso TEXT,
+    curso VARCHAR(255),
     curso_id INT,
     situacao VARCHAR(50),
     tipo VARCHAR(25),
+    hash_conteudo CHAR(32),
+    INDEX idx_coordenador_chave (coordenador_chave),
+    INDEX idx_entidade_curso (entidade, curso),
+    INDEX idx_data_atualizacao (data_atualizacao),
     FOREIGN KEY (curso_id) REFERENCES cursos(id),
     FOREIGN KEY (coordenador_id) REFERENCES coordenadores(id)
 );
@@ -81,7 +88,9 @@ CREATE TABLE IF NOT EXISTS cursos (
     id INT AUTO_INCREMENT PRIMARY KEY,
     nome_curso VARCHAR(255) NOT NULL,
     entidade VARCHAR(50) NOT NULL,
+    versao VARCHAR(10),
     coordenador_id INT,
+    UNIQUE KEY uq_curso_entidade (nome_curso, entidade),
     FOREIGN KEY (coordenador_id) REFERENCES coordenadores(id)
 );
 
@@ -105,107 +114,163 @@ CREATE TABLE IF NOT EXISTS db_dpc_jira (
     cpf_conteudista VARCHAR(50),
     conteudista TEXT,
     coordenador TEXT,
+    coordenador_chave VARCHAR(255),
     coordenador_master TEXT,
     entidade_curso TEXT,
     entidade VARCHAR(50),
     migracao VARCHAR(10),
-    curso TEXT,
+    curso VARCHAR(255),
     curso_id INT,
     coordenador_id INT,
     status_contrato VARCHAR(50),
     status_conteudos TEXT,
     status_videos TEXT,
+    hash_conteudo CHAR(32),
+    INDEX idx_coordenador_chave (coordenador_chave),
+    INDEX idx_entidade_curso (entidade, curso),
+    INDEX idx_data_atualizacao (data_atualizacao),
     FOREIGN KEY (curso_id) REFERENCES cursos(id),
     FOREIGN KEY (coordenador_id) REFERENCES coordenadores(id)
 );
 
+CREATE TABLE IF NOT EXISTS resumo_producao (
+    curso_id INT PRIMARY KEY,
+    primeira_data_criacao DATE,
+    total_disciplinas INT NOT NULL,
+    conteudo_fechado INT NOT NULL,
+    video_fechado INT NOT NULL,
+    disciplinas_reuso INT NOT NULL,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 CREATE OR REPLACE VIEW vw_analise_producao AS
-WITH status_count AS (
-    SELECT 
-        c.id AS curso_id,
-        c.nome_curso AS curso,
-        c.entidade AS entidade,
-        c.coordenador_id AS coordenador_id,
-        MIN(d.data_criacao) AS primeira_data_criacao,
-        COUNT(*) AS total_disciplinas,
-        SUM(CASE 
-            WHEN d.tipo_de_item = 'SR-Completa' AND d.status_conteudos = 'Fechado' THEN 1 
-            ELSE 0 
-        END) AS Conteudo_Fechado,
-        SUM(CASE 
-            WHEN d.tipo_de_item = 'SR-Reuso' THEN 1 
-            ELSE 0 
-        END) AS disciplinas_reuso,
-        SUM(CASE 
-            WHEN d.tipo_de_item = 'SR-Completa' AND d.status_videos = 'Fechado' THEN 1
-            ELSE 0 
-        END) AS Video_Fechado,
-        SUM(CASE 
-            WHEN d.tipo_de_item = 'SR-Reuso' AND d.status_videos = 'Fechado' THEN 1 
-            ELSE 0 
-        END) AS Video_Reuso
-    FROM db_dpc_jira d
-    JOIN cursos c ON d.curso_id = c.id
-    WHERE c.nome_curso IS NOT NULL AND c.entidade != "Pós-Graduação"
-    GROUP BY c.id, c.nome_curso, c.entidade, c.coordenador_id
-)
 SELECT 
-    curso_id,
-    coordenador_id,
-    curso,
-    entidade,
-    primeira_data_criacao,
-    total_disciplinas,
-    Conteudo_Fechado,
-    Video_Fechado,
-    disciplinas_reuso,
+    r.curso_id AS curso_id,
+    c.coordenador_id AS coordenador_id,
+    c.nome_curso AS curso,
+    c.entidade AS entidade,
+    r.primeira_data_criacao AS primeira_data_criacao,
+    r.total_disciplinas AS total_disciplinas,
+    r.conteudo_fechado AS Conteudo_Fechado,
+    r.video_fechado AS Video_Fechado,
+    r.disciplinas_reuso AS disciplinas_reuso,
     ROUND(
         CASE 
-            WHEN total_disciplinas > 0 THEN (Conteudo_Fechado * 100.0 / (total_disciplinas-disciplinas_reuso)) 
+            WHEN r.total_disciplinas > 0 THEN (r.conteudo_fechado * 100.0 / (r.total_disciplinas-r.disciplinas_reuso)) 
             ELSE 0 
         END, 2
     ) AS prod_conteudo,
     ROUND(
         CASE 
-            WHEN total_disciplinas > 0 THEN (Video_Fechado * 100.0 / (total_disciplinas-disciplinas_reuso)) 
+            WHEN r.total_disciplinas > 0 THEN (r.video_fechado * 100.0 / (r.total_disciplinas-r.disciplinas_reuso)) 
             ELSE 0 
         END, 2
     ) AS prod_video,
     ROUND(
         CASE 
-            WHEN total_disciplinas > 0 THEN 
-                (((Conteudo_Fechado + disciplinas_reuso) * 100.0 / total_disciplinas) + 
-                 ((Video_Fechado + disciplinas_reuso) * 100.0 / total_disciplinas)) / 2
+            WHEN r.total_disciplinas > 0 THEN 
+                (((r.conteudo_fechado + r.disciplinas_reuso) * 100.0 / r.total_disciplinas) + 
+                 ((r.video_fechado + r.disciplinas_reuso) * 100.0 / r.total_disciplinas)) / 2
             ELSE 0 
         END, 2
     ) AS prod_curso,
     CASE 
-        WHEN total_disciplinas = 0 THEN 'Não Iniciado'
-        WHEN (total_disciplinas - disciplinas_reuso) = Conteudo_Fechado 
-             AND (total_disciplinas - disciplinas_reuso) = Video_Fechado THEN 'Completo'
-        WHEN Conteudo_Fechado > 0 OR Video_Fechado > 0 THEN 'Em Andamento'
+        WHEN r.total_disciplinas = 0 THEN 'Não Iniciado'
+        WHEN (r.total_disciplinas - r.disciplinas_reuso) = r.conteudo_fechado 
+             AND (r.total_disciplinas - r.disciplinas_reuso) = r.video_fechado THEN 'Completo'
+        WHEN r.conteudo_fechado > 0 OR r.video_fechado > 0 THEN 'Em Andamento'
         ELSE 'Não Iniciado'
     END AS status_producao
-FROM status_count
-where total_disciplinas > 5
+FROM resumo_producao r
+JOIN cursos c ON c.id = r.curso_id
+WHERE c.nome_curso IS NOT NULL AND c.entidade != "Pós-Graduação" AND r.total_disciplinas > 5
 ORDER BY curso;
 """
 
-print('connecting to database')
-sql_client = pymysql.connect(
+# Alterações para bancos criados antes das colunas novas; cada comando pode já ter sido aplicado
+MIGRACOES_SQL = [
+    "ALTER TABLE db_dpc_jira ADD COLUMN coordenador_chave VARCHAR(255) AFTER coordenador",
+    "ALTER TABLE db_dpc_jira ADD INDEX idx_coordenador_chave (coordenador_chave)",
+    "ALTER TABLE db_dpc_jira_disciplinas ADD COLUMN coordenador_chave VARCHAR(255) AFTER coordenador",
+    "ALTER TABLE db_dpc_jira_disciplinas ADD INDEX idx_coordenador_chave (coordenador_chave)",
+    # Os joins com cursos e o filtro da marca d'água passam a usar índices
+    "ALTER TABLE db_dpc_jira MODIFY COLUMN curso VARCHAR(255)",
+    "ALTER TABLE db_dpc_jira_disciplinas MODIFY COLUMN curso VARCHAR(255)",
+    "ALTER TABLE db_dpc_jira ADD INDEX idx_entidade_curso (entidade, curso)",
+    "ALTER TABLE db_dpc_jira_disciplinas ADD INDEX idx_entidade_curso (entidade, curso)",
+    "ALTER TABLE db_dpc_jira ADD INDEX idx_data_atualizacao (data_atualizacao)",
+    "ALTER TABLE db_dpc_jira_disciplinas ADD INDEX idx_data_atualizacao (data_atualizacao)",
+    # Hash do conteúdo gravado; linhas antigas ficam com NULL e são regravadas uma vez
+    "ALTER TABLE db_dpc_jira ADD COLUMN hash_conteudo CHAR(32)",
+    "ALTER TABLE db_dpc_jira_disciplinas ADD COLUMN hash_conteudo CHAR(32)",
+    # Cursos repetidos: as tarefas passam para o menor ID de cada (nome_curso, entidade),
+    # os demais são removidos e a chave única impede novas cópias
+    "ALTER TABLE cursos ADD COLUMN versao VARCHAR(10) AFTER entidade",
+    """
+    UPDATE db_dpc_jira d
+    JOIN cursos c ON d.curso_id = c.id
+    JOIN (SELECT nome_curso, entidade, MIN(id) AS id FROM cursos GROUP BY nome_curso, entidade) m
+        ON m.nome_curso = c.nome_curso AND m.entidade = c.entidade
+    SET d.curso_id = m.id
+    WHERE c.id <> m.id
+    """,
+    """
+    UPDATE db_dpc_jira_disciplinas d
+    JOIN cursos c ON d.curso_id = c.id
+    JOIN (SELECT nome_curso, entidade, MIN(id) AS id FROM cursos GROUP BY nome_curso, entidade) m
+        ON m.nome_curso = c.nome_curso AND m.entidade = c.entidade
+    SET d.curso_id = m.id
+    WHERE c.id <> m.id
+    """,
+    """
+    DELETE c FROM cursos c
+    JOIN (SELECT nome_curso, entidade, MIN(id) AS id FROM cursos GROUP BY nome_curso, entidade) m
+        ON m.nome_curso = c.nome_curso AND m.entidade = c.entidade
+    WHERE c.id > m.id
+    """,
+    "ALTER TABLE cursos ADD UNIQUE KEY uq_curso_entidade (nome_curso, entidade)",
+]
+
+# Erros do MySQL que indicam migração já aplicada: coluna duplicada e índice duplicado
+ERROS_MIGRACAO_APLICADA = (1060, 1061)
+
+# Conexão aberta no primeiro uso; importar o módulo não conecta ao banco
+sql_client = ConexaoTardia(lambda: pymysql.connect(
     host=DB_HOST,
     user=DB_USER,
     password=DB_PASSWORD,
     database=DB_NAME,
     port=DB_PORT
-)
-print('connected to database')
+))
+
+# Função para preencher coordenador_chave nas linhas que ainda não têm a chave
+def preencher_chave_coordenador(cursor, tabela):
+    """
+    A chave é calculada pela própria obter_primeiro_coordenador da sincronização, e não
+    por uma cópia em SQL, para que as linhas antigas e as novas se juntem ao mesmo
+    coordenador. As linhas são atualizadas pela chave primária, em lotes.
+    """
+    # Importado aqui para que o schema só carregue a sincronização quando precisar
+    from update_jira_sql import executar_em_lotes, obter_primeiro_coordenador
+
+    cursor.execute(f"""
+        SELECT chave, coordenador FROM {tabela}
+        WHERE coordenador_chave IS NULL AND coordenador IS NOT NULL
+    """)
+    linhas = []
+    for chave, coordenador in cursor.fetchall():
+        chave_coordenador = obter_primeiro_coordenador(coordenador)
+        if chave_coordenador:
+            linhas.append((chave_coordenador, chave))
+    executar_em_lotes(cursor, f"UPDATE {tabela} SET coordenador_chave = %s WHERE chave = %s", linhas)
+    print(f"{len(linhas)} linhas de {tabela} receberam a chave do coordenador")
 
 def atualizar_estrutura_tabela():
     """
     Atualiza a estrutura da tabela existente e popula as tabelas de cursos e coordenadores
     """
-    sql_client
+    with open('last_updated.txt', 'r') as f:
+        last_updated = f.read().strip()
     cursor = sql_client.cursor()
     
     try:
@@ -213,7 +278,18 @@ def atualizar_estrutura_tabela():
         for comando in CREATE_TABLE_SQL.split(';'):
             if comando.strip():
                 cursor.execute(comando)
-       
+
+        for comando in MIGRACOES_SQL:
+            try:
+                cursor.execute(comando)
+            except pymysql.MySQLError as e:
+                if e.args[0] not in ERROS_MIGRACAO_APLICADA:
+                    raise
+
+        # Preenche a chave do coordenador das linhas gravadas antes da coluna existir
+        for tabela in ("db_dpc_jira", "db_dpc_jira_disciplinas"):
+            preencher_chave_coordenador(cursor, tabela)
+
         
         # Popula a tabela de cursos
         cursor.execute(f"""
@@ -225,27 +301,22 @@ def atualizar_estrutura_tabela():
             WHERE curso IS NOT NULL AND entidade IS NOT NULL AND data_atualizacao >= '{last_updated}'
         """)
         
-        # Atualiza os IDs dos cursos na tabela principal
+        # Atualiza os IDs dos cursos nas tabelas de tarefas; a sincronização já grava os IDs,
+        # isto completa as linhas antigas
         cursor.execute("SET SQL_SAFE_UPDATES = 0")  
-        cursor.execute("""
-            UPDATE db_dpc_jira d
-            JOIN cursos c ON d.curso = c.nome_curso AND d.entidade = c.entidade
-            SET d.curso_id = c.id
-            WHERE d.chave IS NOT NULL
-        """)
+        for tabela in ("db_dpc_jira", "db_dpc_jira_disciplinas"):
+            cursor.execute(f"""
+                UPDATE {tabela} d
+                JOIN cursos c ON d.curso = c.nome_curso AND d.entidade = c.entidade
+                SET d.curso_id = c.id
+                WHERE d.chave IS NOT NULL
+            """)
 
-        # Popula a tabela de coordenadores com os dados existentes, utilizando primeiro_coordenador
+        # Popula a tabela de coordenadores com a chave normalizada
         cursor.execute("""
             INSERT INTO coordenadores (coordenador, coordenador_master)
             SELECT 
-                TRIM(SUBSTRING_INDEX(
-                    REPLACE(
-                        REPLACE(
-                            REPLACE(REPLACE(CONVERT(coordenador USING utf8mb4), ' / ', '/'), 
-                        ' /', '/'),
-                    '/ ', '/'), 
-                '’', ''''), 
-                '/', 1)) AS primeiro_coordenador,
+                coordenador_chave,
                 
                 CASE 
                     WHEN d.coordenador_master = 'InsBE' THEN 'INSBE'
@@ -257,37 +328,22 @@ def atualizar_estrutura_tabela():
                 END AS coordenador_master
 
             FROM (
-                SELECT DISTINCT 
-                    CASE 
-                        WHEN coordenador LIKE 'Coord. Geral dos Cursos em Direito%' THEN 'Coordenação Geral dos Cursos de Direito'
-                        WHEN coordenador LIKE 'Renata Alcione de Faria Rodrigues%' THEN 'Renata Alcione de Faria Villela de Araújo'
-                        ELSE TRIM(REPLACE(CONVERT(coordenador USING utf8mb4), UNHEX('C2A0'), ''))
-                    END AS coordenador,
-                    coordenador_master
+                SELECT DISTINCT coordenador_chave, coordenador_master
                 FROM db_dpc_jira 
-                WHERE coordenador IS NOT NULL
+                WHERE coordenador_chave IS NOT NULL
             ) d
-            ORDER BY primeiro_coordenador
+            ORDER BY coordenador_chave
             ON DUPLICATE KEY UPDATE coordenador_master = VALUES(coordenador_master);
         """)
 
-        # Atualiza os IDs dos coordenadores na tabela principal utilizando "primeiro_coordenador"
-        cursor.execute("""
-            UPDATE db_dpc_jira d
-            JOIN (
-                SELECT id, coordenador 
-                FROM coordenadores
-            ) c ON TRIM(SUBSTRING_INDEX(
-                REPLACE(
-                    REPLACE(
-                        REPLACE(REPLACE(CONVERT(d.coordenador USING utf8mb4), ' / ', '/'), 
-                    ' /', '/'),
-                '/ ', '/'), 
-            '’', ''''), 
-            '/', 1)) = c.coordenador
-            SET d.coordenador_id = c.id
-            WHERE d.chave IS NOT NULL
-        """)
+        # Atualiza os IDs dos coordenadores nas tabelas de tarefas pela chave indexada
+        for tabela in ("db_dpc_jira", "db_dpc_jira_disciplinas"):
+            cursor.execute(f"""
+                UPDATE {tabela} d
+                JOIN coordenadores c ON c.coordenador = d.coordenador_chave
+                SET d.coordenador_id = c.id
+                WHERE d.chave IS NOT NULL
+            """)
         
         # Atualiza os IDs de coordenadores na tabela cursos
         cursor.execute("SET SQL_SAFE_UPDATES = 0")  
@@ -297,6 +353,10 @@ def atualizar_estrutura_tabela():
             SET c.coordenador_id = d.coordenador_id
             WHERE d.coordenador_id IS NOT NULL
         """)
+
+        # Recalcula o resumo de produção de todos os cursos; a sincronização mantém só os alterados
+        cursor.execute("DELETE FROM resumo_producao")
+        cursor.execute(SQL_INSERIR_RESUMO.format(filtro="curso_id IS NOT NULL"))
         cursor.execute("SET SQL_SAFE_UPDATES = 1")  
         
         sql_client.commit()
@@ -309,9 +369,32 @@ def atualizar_estrutura_tabela():
     finally:
         cursor.close()
 
-def main():
+# Função para conferir se os comandos da sincronização usam os índices do esquema
+def verificar_indices():
+    """
+    Roda EXPLAIN nos comandos da sincronização e encerra com erro se algum deles
+    voltar a ler uma tabela inteira.
+    """
+    cursor = sql_client.cursor()
+    try:
+        varreduras = verificar_planos(cursor)
+    finally:
+        cursor.close()
+
+    if not varreduras:
+        print(f"Planos conferidos: nenhum dos {len(PLANOS_VERIFICADOS)} comandos varre uma tabela inteira.")
+        return
+    for comando, tabela, linhas in varreduras:
+        print(f"Varredura completa em {comando}: tabela {tabela} (~{linhas} linhas)")
+    sys.exit(1)
+
+def main(explicar=False):
     atualizar_estrutura_tabela()
+    if explicar:
+        verificar_indices()
 
 if __name__ == "__main__":
-    main()
-    sql_client.close()
\ No newline at end of file
+    try:
+        main(explicar="--explain" in sys.argv)
+    finally:
+        sql_client.close()
\ No newline at end of file
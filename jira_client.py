@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import queue
+import asyncio
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dotenv import load_dotenv
+from metricas import metricas
+
+# Carregar variáveis de ambiente do arquivo .env
+load_dotenv()
+
+# Endereço do Jira e quantidade máxima de páginas baixadas ao mesmo tempo
+JIRA_BASE_URL = os.getenv("JIRA_BASE_URL", "https://jira.unyleya.com.br").rstrip("/")
+JIRA_MAX_WORKERS = int(os.getenv("JIRA_MAX_WORKERS", "4"))
+# Tempo máximo, em segundos, para conectar e para cada leitura do socket; sem ele uma conexão
+# travada segura para sempre uma vaga do pool
+JIRA_TIMEOUT = float(os.getenv("JIRA_TIMEOUT", "60"))
+
+# Decodificador de JSON mais rápido quando instalado (orjson ou msgspec); senão, o json da biblioteca padrão
+try:
+    import orjson
+    _decodificar = orjson.loads
+    DECODIFICADOR_JSON = "orjson"
+except ImportError:
+    try:
+        import msgspec
+        _decodificar = msgspec.json.decode
+        DECODIFICADOR_JSON = "msgspec"
+    except ImportError:
+        _decodificar = json.loads
+        DECODIFICADOR_JSON = "json"
+
+# Compressões aceitas nas respostas; o urllib3 descompacta o corpo antes de ele chegar em response.content
+ACCEPT_ENCODING = "gzip, deflate"
+
+_sessao = None
+_sessao_lock = threading.Lock()
+
+# Função para criar uma sessão HTTP com pool de conexões reaproveitáveis
+def criar_sessao(headers=None, max_conexoes=JIRA_MAX_WORKERS):
+    """
+    Cria uma sessão com keep-alive e um pool do tamanho da concorrência de busca.
+    Com pool_block as threads aguardam uma conexão livre em vez de abrir conexões extras.
+    """
+    sessao = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_conexoes), pool_block=True)
+    sessao.mount("https://", adapter)
+    sessao.mount("http://", adapter)
+    sessao.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if headers:
+        sessao.headers.update(headers)
+    return sessao
+
+# Função para definir a sessão compartilhada (autenticação e cookies configurados uma única vez)
+def configurar_sessao(headers=None, max_conexoes=JIRA_MAX_WORKERS):
+    global _sessao
+    with _sessao_lock:
+        if _sessao is not None:
+            _sessao.close()
+        _sessao = criar_sessao(headers, max_conexoes)
+        return _sessao
+
+def obter_sessao():
+    global _sessao
+    with _sessao_lock:
+        if _sessao is None:
+            _sessao = criar_sessao()
+        return _sessao
+
+# Função para realizar uma requisição com retentativas
+def realizar_requisicao(url, headers=None, params=None, max_retentativas=3, sessao=None):
+    sessao = sessao or obter_sessao()
+    for tentativa in range(max_retentativas):
+        try:
+            response = sessao.get(url, params=params, headers=headers, timeout=JIRA_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as erro:
+            # Conexão keep-alive derrubada ou socket parado: conta como uma tentativa falha
+            metricas.somar("http_requisicoes_total", status="erro")
+            detalhe = f"erro: {erro}"
+        else:
+            metricas.somar("http_requisicoes_total", status=response.status_code)
+            if response.status_code == 200:
+                # Com gzip o Content-Length é o tamanho comprimido, o que de fato passou pela rede
+                metricas.somar("http_bytes_recebidos_total", int(response.headers.get("Content-Length") or len(response.content)))
+                return response
+            detalhe = f"response: {response.text}"
+        metricas.somar("http_retentativas_total")
+        print(f"Tentativa {tentativa + 1} falhou. Retentando em 2 segundos...")
+        time.sleep(2)
+    raise Exception(f"Falha ao conectar à API após {max_retentativas} tentativas. \n {detalhe}")
+
+# Função para decodificar o corpo JSON de uma resposta
+def decodificar_json(response):
+    """
+    Decodifica os bytes da resposta direto com o DECODIFICADOR_JSON, sem passar pela
+    conversão para texto do response.json(). O Jira responde em UTF-8.
+    """
+    return _decodificar(response.content)
+
+# Cliente assíncrono: cada requisição roda no executor sobre a sessão com pool,
+# e o semáforo global limita quantas requisições ficam em voo somando todas as consultas
+class ClienteJiraAsync:
+    def __init__(self, max_concorrencia=JIRA_MAX_WORKERS, sessao=None):
+        self.max_concorrencia = max(1, max_concorrencia)
+        self.sessao = sessao
+        self.semaforo = asyncio.Semaphore(self.max_concorrencia)
+
+    def _buscar_json(self, base_url, params, consulta):
+        with metricas.medir("busca", consulta=consulta):
+            response = realizar_requisicao(base_url, params=params, sessao=self.sessao)
+        with metricas.medir("decodificacao", consulta=consulta):
+            pagina = decodificar_json(response)
+        metricas.somar("json_bytes_total", len(response.content), consulta=consulta)
+        return pagina
+
+    async def buscar_pagina(self, base_url, params, consulta="consulta"):
+        async with self.semaforo:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._buscar_json, base_url, params, consulta)
+
+_FIM_DAS_PAGINAS = object()
+
+class _ErroNaBusca:
+    def __init__(self, erro):
+        self.erro = erro
+
+# Coloca um item na fila da consulta sem bloquear o loop; desiste se o consumidor parou de ler
+async def _colocar(fila, item, parar):
+    while not parar.is_set():
+        try:
+            fila.put_nowait(item)
+            return True
+        except queue.Full:
+            await asyncio.sleep(0.01)
+    return False
+
+# Função para calcular o passo da paginação a partir da primeira resposta
+def planejar_passo(pedido, pagina):
+    """
+    O Jira limita maxResults no servidor e informa na resposta o valor aplicado. O passo
+    é o menor entre o pedido e o aplicado; se a página veio ainda mais curta sem ser a
+    última, vale o tamanho real, para que nenhum intervalo de startAt fique sem busca.
+    """
+    passo = min(pedido, pagina.get("maxResults") or pedido)
+    recebidas = len(pagina.get("issues", []))
+    if 0 < recebidas < passo and pagina.get("startAt", 0) + recebidas < pagina["total"]:
+        passo = recebidas
+    return max(1, passo)
+
+# Corrotina de paginação de uma consulta: a primeira página informa o total e o tamanho de
+# página do servidor, e as demais são buscadas com no máximo max_concorrencia páginas
+# pendentes, entregues na ordem original
+async def _paginar_consulta(cliente, nome, base_url, params, fila, total_futuro, parar):
+    pendentes = deque()
+
+    def buscar(inicio, quantidade):
+        pagina_params = dict(params, startAt=inicio, maxResults=quantidade)
+        return asyncio.ensure_future(cliente.buscar_pagina(base_url, pagina_params, nome))
+
+    try:
+        # Uma consulta retomada de um checkpoint começa no startAt informado
+        inicio = params.get("startAt", 0)
+        params = dict(params, startAt=inicio)
+        primeira_pagina = await cliente.buscar_pagina(base_url, params, nome)
+        total_issues = primeira_pagina["total"]
+        total_futuro.set_result(total_issues)
+        if not await _colocar(fila, primeira_pagina, parar):
+            return
+
+        passo = planejar_passo(params["maxResults"], primeira_pagina)
+        inicios = deque(range(inicio + len(primeira_pagina.get("issues", [])), total_issues, passo))
+        while inicios or pendentes:
+            while inicios and len(pendentes) < cliente.max_concorrencia:
+                pagina_inicio = inicios.popleft()
+                esperadas = min(passo, total_issues - pagina_inicio)
+                pendentes.append((pagina_inicio, esperadas, buscar(pagina_inicio, passo)))
+            pagina_inicio, esperadas, tarefa = pendentes.popleft()
+            pagina = await tarefa
+            recebidas = len(pagina.get("issues", []))
+            # Página mais curta que o planejado: o restante do intervalo é pedido antes das
+            # próximas, para manter a ordem; uma página vazia indica que o total diminuiu
+            if 0 < recebidas < esperadas:
+                metricas.somar("paginas_complementares_total", consulta=nome)
+                resto, faltam = pagina_inicio + recebidas, esperadas - recebidas
+                pendentes.appendleft((resto, faltam, buscar(resto, faltam)))
+            if not await _colocar(fila, pagina, parar):
+                return
+        await _colocar(fila, _FIM_DAS_PAGINAS, parar)
+    except Exception as erro:
+        if not total_futuro.done():
+            total_futuro.set_exception(erro)
+        await _colocar(fila, _ErroNaBusca(erro), parar)
+    finally:
+        for *_, tarefa in pendentes:
+            tarefa.cancel()
+
+async def _executar_consultas(execucoes, max_concorrencia, sessao):
+    cliente = ClienteJiraAsync(max_concorrencia, sessao)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=cliente.max_concorrencia))
+    await asyncio.gather(*(
+        _paginar_consulta(cliente, nome, base_url, params, fila, total_futuro, parar)
+        for nome, base_url, params, fila, total_futuro, parar in execucoes
+    ))
+
+# Versão síncrona de _colocar para a thread do motor, usada quando o loop já terminou
+def _avisar_erro(fila, item, parar):
+    while not parar.is_set():
+        try:
+            fila.put_nowait(item)
+            return True
+        except queue.Full:
+            time.sleep(0.01)
+    return False
+
+# Roda o loop asyncio na thread de segundo plano; se o próprio loop falhar, avisa todas as consultas
+def _rodar_motor(execucoes, max_concorrencia, sessao):
+    try:
+        asyncio.run(_executar_consultas(execucoes, max_concorrencia, sessao))
+    except Exception as erro:
+        for _, _, _, fila, total_futuro, parar in execucoes:
+            if not total_futuro.done():
+                total_futuro.set_exception(erro)
+            _avisar_erro(fila, _ErroNaBusca(erro), parar)
+
+def _consumir_paginas(fila, parar):
+    try:
+        while True:
+            item = fila.get()
+            if item is _FIM_DAS_PAGINAS:
+                return
+            if isinstance(item, _ErroNaBusca):
+                raise item.erro
+            yield item
+    finally:
+        parar.set()
+
+# Função para buscar várias consultas JQL ao mesmo tempo
+def buscar_consultas(consultas, max_concorrencia=JIRA_MAX_WORKERS, tamanho_fila=JIRA_MAX_WORKERS, sessao=None):
+    """
+    Recebe um dicionário nome -> (base_url, params) e pagina todas as consultas em um
+    loop asyncio rodando em segundo plano. Retorna nome -> (total, gerador de páginas);
+    cada gerador pode ser consumido no seu próprio ritmo, e a fila limitada de cada
+    consulta segura a busca quando o consumidor está atrasado.
+    """
+    execucoes = {
+        nome: (nome, base_url, params, queue.Queue(maxsize=max(1, tamanho_fila)), Future(), threading.Event())
+        for nome, (base_url, params) in consultas.items()
+    }
+    threading.Thread(
+        target=_rodar_motor,
+        args=(list(execucoes.values()), max_concorrencia, sessao),
+        daemon=True,
+    ).start()
+
+    resultado = {}
+    for nome, (_, _, _, fila, total_futuro, parar) in execucoes.items():
+        try:
+            resultado[nome] = (total_futuro.result(), _consumir_paginas(fila, parar))
+        except Exception:
+            for *_, outro_parar in execucoes.values():
+                outro_parar.set()
+            raise
+    return resultado
+
+# Função para saber quantas tarefas uma consulta tem, sem baixar nenhuma
+def contar_tarefas(base_url, params, sessao=None):
+    response = realizar_requisicao(base_url, params=dict(params, startAt=0, maxResults=0), sessao=sessao)
+    return decodificar_json(response)["total"]
+
+# Função para buscar todas as páginas de uma consulta
+def paginar_jira(base_url, params, max_workers=JIRA_MAX_WORKERS, sessao=None):
+    """
+    Busca a primeira página para descobrir o total de tarefas e baixa as demais em
+    paralelo. Retorna o total e um gerador que entrega as páginas na ordem original.
+    """
+    return buscar_consultas({"consulta": (base_url, params)}, max_workers, sessao=sessao)["consulta"]
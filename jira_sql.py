@@ -0,0 +1,123 @@
+"""
+Linha de comando da sincronização Jira -> MySQL.
+
+    python jira_sql.py sync [--replay] [--escola-tecnica] [--perfil PASTA]
+    python jira_sql.py backfill [--por entidade|criacao]
+    python jira_sql.py schema [--explain]
+    python jira_sql.py escola-tecnica [--completa]
+    python jira_sql.py snapshot [--pasta PASTA]
+    python jira_sql.py benchmark ponta_a_ponta --escalas 1000,10000
+
+Cada subcomando importa só os módulos de que precisa, e a conexão com o banco e as marcas
+d'água são carregadas no primeiro uso. As demais configurações continuam nas
+variáveis de ambiente (.env) descritas no README.
+"""
+import time
+
+# Marcado antes dos demais imports para medir a inicialização do comando
+INICIO = time.perf_counter()
+
+import argparse
+import pkgutil
+import runpy
+import sys
+from pathlib import Path
+
+PASTA_BENCHMARKS = Path(__file__).resolve().parent / "benchmarks"
+
+# Benchmarks disponíveis: os módulos benchmarks/bench_*.py, sem o prefixo
+def listar_benchmarks():
+    return sorted(
+        modulo.name.removeprefix("bench_")
+        for modulo in pkgutil.iter_modules([str(PASTA_BENCHMARKS)])
+        if modulo.name.startswith("bench_")
+    )
+
+def comando_sync(args):
+    import update_jira_sql as sync
+    from metricas import metricas
+
+    if args.replay:
+        sync.SYNC_REPLAY = True
+    if args.escola_tecnica:
+        sync.SYNC_ESCOLA_TECNICA = True
+    metricas.definir("inicializacao_segundos", time.perf_counter() - INICIO)
+    sync.executar(args.perfil)
+
+def comando_backfill(args):
+    import update_jira_sql as sync
+    from metricas import metricas
+
+    metricas.definir("inicializacao_segundos", time.perf_counter() - INICIO)
+    sync.executar(args.perfil, lambda: sync.backfill(args.por))
+
+def comando_schema(args):
+    import create_jira_sql as schema
+
+    try:
+        schema.main(explicar=args.explain)
+    finally:
+        schema.sql_client.close()
+
+def comando_escola_tecnica(args):
+    import update_jira_sql as sync
+
+    sync.exportar_escola_tecnica(completa=args.completa or None)
+
+def comando_snapshot(args):
+    import update_jira_sql as sync
+
+    pasta = args.pasta or sync.SYNC_SNAPSHOT_DIR
+    if not pasta:
+        raise SystemExit("Defina SYNC_SNAPSHOT_DIR ou use --pasta")
+    try:
+        sync.atualizar_snapshot_analitico(pasta)
+    finally:
+        sync.sql_client.close()
+
+def comando_benchmark(args):
+    sys.argv = [f"benchmarks.bench_{args.nome}", *args.argumentos]
+    runpy.run_module(f"benchmarks.bench_{args.nome}", run_name="__main__", alter_sys=True)
+
+def criar_parser():
+    from particoes import SYNC_BACKFILL_POR
+    from perfilamento import SYNC_PROFILE_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    sync = subcomandos.add_parser("sync", help="sincroniza tarefas e disciplinas do Jira com o MySQL")
+    sync.add_argument("--replay", action="store_true", help="reprocessa o cache local (SYNC_CACHE_FILE) em vez de consultar o Jira")
+    sync.add_argument("--escola-tecnica", action="store_true", help="exporta também os vídeos da escola técnica")
+    sync.add_argument("--perfil", default=SYNC_PROFILE_DIR, metavar="PASTA", help="grava o perfil de CPU e memória de cada etapa nesta pasta")
+    sync.set_defaults(funcao=comando_sync)
+
+    backfill = subcomandos.add_parser("backfill", help="recarrega todas as tarefas e disciplinas em partições paralelas")
+    backfill.add_argument("--por", choices=["entidade", "criacao"], default=SYNC_BACKFILL_POR, help="divide a carga por entidade ou por janela de criação")
+    backfill.add_argument("--perfil", default=SYNC_PROFILE_DIR, metavar="PASTA", help="grava o perfil de CPU e memória de cada etapa nesta pasta")
+    backfill.set_defaults(funcao=comando_backfill)
+
+    schema = subcomandos.add_parser("schema", help="cria ou atualiza as tabelas e recalcula o resumo de produção")
+    schema.add_argument("--explain", action="store_true", help="confere se os comandos da sincronização usam índices")
+    schema.set_defaults(funcao=comando_schema)
+
+    escola = subcomandos.add_parser("escola-tecnica", help="exporta os vídeos da escola técnica alterados desde a última exportação")
+    escola.add_argument("--completa", action="store_true", help="busca todo o histórico e regrava o CSV e a planilha só com as tarefas que ainda casam com a consulta")
+    escola.set_defaults(funcao=comando_escola_tecnica)
+
+    snapshot = subcomandos.add_parser("snapshot", help="atualiza o snapshot analítico em Parquet sem sincronizar")
+    snapshot.add_argument("--pasta", metavar="PASTA", help="pasta do snapshot (padrão: SYNC_SNAPSHOT_DIR)")
+    snapshot.set_defaults(funcao=comando_snapshot)
+
+    benchmark = subcomandos.add_parser("benchmark", help="roda um dos scripts de benchmarks/")
+    benchmark.add_argument("nome", choices=listar_benchmarks())
+    benchmark.add_argument("argumentos", nargs=argparse.REMAINDER, help="argumentos repassados ao benchmark")
+    benchmark.set_defaults(funcao=comando_benchmark)
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    args.funcao(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Métricas da sincronização: duração de cada etapa e contadores de linhas, requisições,
+retentativas, bytes recebidos e comandos enviados ao banco.
+
+Os valores ficam em um registro único do processo (metricas), alimentado pelas threads
+da busca e do pipeline, e são exportados ao fim da execução em SYNC_METRICS_FILE: no
+formato textfile do Prometheus (node_exporter) quando o arquivo termina em .prom, e em
+JSON nos demais casos.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Arquivo de métricas gerado ao fim de cada execução; vazio desliga a exportação
+SYNC_METRICS_FILE = os.getenv("SYNC_METRICS_FILE", "")
+
+PREFIXO = "jira_sync_"
+
+# Tipo de cada métrica no formato do Prometheus; as não listadas são contadores
+TIPOS_METRICAS = {
+    "sucesso": "gauge",
+    "inicio_timestamp_segundos": "gauge",
+    "fim_timestamp_segundos": "gauge",
+    "duracao_segundos": "gauge",
+    "inicializacao_segundos": "gauge",
+}
+
+# Escapa um valor de rótulo do formato textfile (barra invertida, aspas e quebra de linha)
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metricas:
+    """Registro de métricas nome + rótulos -> valor, seguro para uso entre threads."""
+    def __init__(self):
+        self._valores = {}
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+        # Perfilador de perfilamento.py, quando o modo de perfilamento está ativo
+        self.perfilador = None
+
+    def somar(self, nome, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        with self._lock:
+            self._valores[(nome, tuple(sorted(rotulos.items())))] = valor
+
+    @contextmanager
+    def medir(self, etapa, **rotulos):
+        """Soma a duração do bloco em etapa_segundos_total e conta uma execução da etapa."""
+        perfil = nullcontext()
+        if self.perfilador is not None:
+            perfil = self.perfilador.etapa("_".join([etapa, *(str(v) for _, v in sorted(rotulos.items()))]))
+        inicio = time.perf_counter()
+        try:
+            with perfil:
+                yield
+        finally:
+            self.somar("etapa_segundos_total", time.perf_counter() - inicio, etapa=etapa, **rotulos)
+            self.somar("etapa_execucoes_total", 1, etapa=etapa, **rotulos)
+
+    def valor(self, nome, **rotulos):
+        with self._lock:
+            return self._valores.get((nome, tuple(sorted(rotulos.items()))), 0)
+
+    def itens(self):
+        with self._lock:
+            return sorted(self._valores.items())
+
+    def zerar(self):
+        with self._lock:
+            self._valores.clear()
+        self.inicio = time.time()
+
+    def finalizar(self, sucesso):
+        fim = time.time()
+        self.definir("sucesso", 1 if sucesso else 0)
+        self.definir("inicio_timestamp_segundos", self.inicio)
+        self.definir("fim_timestamp_segundos", fim)
+        self.definir("duracao_segundos", fim - self.inicio)
+
+    def formato_prometheus(self):
+        linhas = []
+        declarados = set()
+        for (nome, rotulos), valor in self.itens():
+            nome_completo = PREFIXO + nome
+            if nome_completo not in declarados:
+                declarados.add(nome_completo)
+                linhas.append(f"# TYPE {nome_completo} {TIPOS_METRICAS.get(nome, 'counter')}")
+            if rotulos:
+                texto_rotulos = ",".join(f'{chave}="{_escapar(v)}"' for chave, v in rotulos)
+                linhas.append(f"{nome_completo}{{{texto_rotulos}}} {valor!r}")
+            else:
+                linhas.append(f"{nome_completo} {valor!r}")
+        return "\n".join(linhas) + "\n"
+
+    def formato_json(self):
+        return json.dumps({
+            "metricas": [
+                {"nome": PREFIXO + nome, "rotulos": dict(rotulos), "valor": valor}
+                for (nome, rotulos), valor in self.itens()
+            ],
+        }, indent=2, ensure_ascii=False)
+
+    def exportar(self, caminho=SYNC_METRICS_FILE):
+        """Grava as métricas em um arquivo temporário e troca de uma vez, para o coletor nunca ler um arquivo pela metade."""
+        if not caminho:
+            return
+        conteudo = self.formato_prometheus() if caminho.endswith(".prom") else self.formato_json()
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+metricas = Metricas()
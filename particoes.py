@@ -0,0 +1,182 @@
+"""
+Carga completa (backfill) dividida em consultas independentes.
+
+Em vez de uma única consulta paginada por startAt até o fim, a carga é dividida em
+partições: uma por entidade de ENTIDADES_VALIDAS ou uma por janela da data de criação.
+As partições são paginadas ao mesmo tempo pelo motor de jira_client e combinadas em um
+único fluxo de páginas. Cada partição tem a própria barra de progresso e é retomada do
+ponto onde parou se a busca falhar. Uma tarefa que aparece em mais de uma partição
+(por exemplo, porque mudou de entidade durante a carga) só é entregue uma vez.
+"""
+import os
+import queue
+import threading
+import time
+from datetime import date
+
+from tqdm import tqdm
+
+from metricas import metricas
+
+# Divisão padrão da carga completa: "entidade" ou "criacao"
+SYNC_BACKFILL_POR = os.getenv("SYNC_BACKFILL_POR", "entidade")
+# Data de criação a partir da qual começam as janelas; o que for anterior fica em uma partição só
+SYNC_BACKFILL_INICIO = os.getenv("SYNC_BACKFILL_INICIO", "2018-01-01")
+# Tamanho de cada janela de criação, em meses
+SYNC_BACKFILL_MESES = int(os.getenv("SYNC_BACKFILL_MESES", "6"))
+# Novas tentativas de uma partição cuja busca falhou, retomando da última página entregue
+SYNC_BACKFILL_RETENTATIVAS = int(os.getenv("SYNC_BACKFILL_RETENTATIVAS", "3"))
+
+# Nome da partição com as tarefas de nenhuma das entidades listadas
+PARTICAO_RESTANTE = "outras"
+
+# Função para montar um filtro JQL por entidade ("Entidade e Curso" é um campo em cascata)
+def particoes_por_entidade(entidades):
+    """
+    cascadeOption só casa com o valor exato da opção, e o transform aceita toda opção que
+    começa com uma das entidades (por exemplo, uma opção nova com sufixo). Por isso a
+    última partição pega tudo o que não está nas demais, e nenhuma tarefa fica de fora.
+    """
+    filtros = [f'"Entidade e Curso" in cascadeOption("{entidade}")' for entidade in entidades]
+    particoes = {entidade.split(" | ", 1)[-1]: f" AND {filtro}" for entidade, filtro in zip(entidades, filtros)}
+    particoes[PARTICAO_RESTANTE] = f" AND NOT ({' OR '.join(filtros)})" if filtros else ""
+    return particoes
+
+def _somar_meses(dia, meses):
+    mes = dia.month - 1 + meses
+    return dia.replace(year=dia.year + mes // 12, month=mes % 12 + 1)
+
+# Função para montar um filtro JQL por janela de criação
+def particoes_por_criacao(inicio=SYNC_BACKFILL_INICIO, meses=SYNC_BACKFILL_MESES, hoje=None):
+    """
+    Janelas [início, início + meses) até a data de hoje. A primeira partição pega tudo o
+    que foi criado antes do início, e a última não tem data final, para que nenhuma
+    tarefa fique de fora.
+    """
+    hoje = hoje or date.today()
+    janela = date.fromisoformat(inicio).replace(day=1)
+    particoes = {f"antes-{janela:%Y-%m}": f' AND created < "{janela:%Y-%m-%d}"'}
+    while True:
+        proxima = _somar_meses(janela, meses)
+        if proxima > hoje:
+            particoes[f"desde-{janela:%Y-%m}"] = f' AND created >= "{janela:%Y-%m-%d}"'
+            return particoes
+        particoes[f"{janela:%Y-%m}"] = f' AND created >= "{janela:%Y-%m-%d}" AND created < "{proxima:%Y-%m-%d}"'
+        janela = proxima
+
+# Função para escolher as partições da carga completa
+def planejar_particoes(por=SYNC_BACKFILL_POR, entidades=()):
+    if por == "entidade":
+        return particoes_por_entidade(entidades)
+    if por == "criacao":
+        return particoes_por_criacao()
+    raise ValueError(f"Divisão de carga desconhecida: {por!r} (use 'entidade' ou 'criacao')")
+
+# Função para conferir a soma dos totais das partições com o total da consulta sem partições
+def conferir_total(total_particoes, total_esperado):
+    if total_esperado is None or total_particoes == total_esperado:
+        return
+    if total_particoes < total_esperado:
+        raise Exception(
+            f"As partições somam {total_particoes} tarefas, mas a consulta sem partições tem {total_esperado}; "
+            f"{total_esperado - total_particoes} tarefas não cairiam em nenhuma partição"
+        )
+    # Tarefas editadas entre as buscas podem aparecer em duas partições; as repetidas são descartadas
+    print(f"As partições somam {total_particoes} tarefas, mais que as {total_esperado} da consulta sem partições")
+
+_FIM_DA_PARTICAO = object()
+
+# Função para combinar as páginas das partições em um único fluxo, sem chaves repetidas
+def intercalar_particoes(paginacoes, reabrir, retentativas=SYNC_BACKFILL_RETENTATIVAS, tamanho_fila=4, total_esperado=None):
+    """
+    Recebe nome -> (total, gerador de páginas), como devolvido por buscar_consultas, e
+    retorna um único (total, gerador de páginas). Cada partição é consumida por uma
+    thread própria; se a busca de uma delas falhar, reabrir(nome, start_at) devolve uma
+    nova paginação a partir da primeira tarefa ainda não entregue, até retentativas vezes.
+    As páginas entregues não têm startAt, porque a posição não vale entre partições.
+
+    total_esperado é o total da consulta sem partições. Se as partições somam menos, parte
+    das tarefas não caiu em nenhuma delas, e o gerador falha antes da primeira página.
+    """
+    total = sum(total for total, _ in paginacoes.values())
+    fila = queue.Queue(maxsize=max(1, tamanho_fila))
+    parar = threading.Event()
+    barras = {
+        nome: tqdm(total=total, desc=f"Partição {nome}", unit="tarefa", position=posicao + 1, leave=False)
+        for posicao, (nome, (total, _)) in enumerate(paginacoes.items())
+    }
+
+    def colocar(item):
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def consumir(nome, paginas):
+        inicio = time.time()
+        proxima = 0
+        tentativas = 0
+        try:
+            while True:
+                try:
+                    if paginas is None:
+                        _, paginas = reabrir(nome, proxima)
+                    for pagina in paginas:
+                        issues = pagina.get("issues", [])
+                        proxima = pagina.get("startAt", 0) + len(issues)
+                        if not colocar((nome, issues, None)):
+                            return
+                        barras[nome].update(len(issues))
+                    break
+                except Exception as erro:
+                    if paginas is not None:
+                        paginas.close()
+                        paginas = None
+                    tentativas += 1
+                    metricas.somar("particao_retentativas_total", particao=nome)
+                    if tentativas > retentativas:
+                        colocar((nome, _FIM_DA_PARTICAO, erro))
+                        return
+                    tqdm.write(f"Partição {nome} falhou ({erro}); nova tentativa a partir da tarefa {proxima}")
+        finally:
+            if paginas is not None:
+                paginas.close()
+        tqdm.write(
+            f"Partição {nome}: {barras[nome].n} tarefas em {time.time() - inicio:.2f} segundos"
+            + (f" ({tentativas} {'nova tentativa' if tentativas == 1 else 'novas tentativas'})" if tentativas else "")
+        )
+        colocar((nome, _FIM_DA_PARTICAO, None))
+
+    for nome, (_, paginas) in paginacoes.items():
+        threading.Thread(target=consumir, args=(nome, paginas), daemon=True).start()
+
+    def gerar():
+        vistas = set()
+        abertas = len(paginacoes)
+        duplicadas = 0
+        try:
+            conferir_total(total, total_esperado)
+            while abertas:
+                nome, issues, erro = fila.get()
+                if erro is not None:
+                    raise erro
+                if issues is _FIM_DA_PARTICAO:
+                    abertas -= 1
+                    barras[nome].close()
+                    continue
+                novas = [issue for issue in issues if issue["key"] not in vistas]
+                vistas.update(issue["key"] for issue in novas)
+                duplicadas += len(issues) - len(novas)
+                yield {"startAt": None, "issues": novas}
+            if duplicadas:
+                metricas.somar("particao_duplicadas_total", duplicadas)
+                print(f"{duplicadas} tarefas repetidas entre partições foram descartadas")
+        finally:
+            parar.set()
+            for barra in barras.values():
+                barra.close()
+
+    return total, gerar()
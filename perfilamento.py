@@ -0,0 +1,96 @@
+"""
+Modo de perfilamento da sincronização: CPU (cProfile) e memória (tracemalloc) por etapa.
+
+Ativado com SYNC_PROFILE_DIR. Cada etapa medida por metricas.medir (busca, decodificacao,
+transformacao, dimensoes, gravacao, resumo_producao, separadas por consulta) ganha um
+perfil próprio. Enquanto o modo está ativo as etapas rodam uma de cada vez, mesmo quando
+vêm de threads diferentes, para que o tempo de CPU e as alocações de uma não se misturem
+com as de outra; o código fora das etapas, como a leitura das páginas, continua em
+paralelo e pode aparecer nos locais de alocação. Os tempos totais da execução, portanto,
+não são comparáveis aos de uma execução normal.
+
+Ao final são gravados, na pasta:
+- relatorio.txt: para cada etapa, as funções com maior tempo acumulado, o pico de memória
+  alocada durante a etapa e os locais que mais alocaram na primeira execução dela;
+- <etapa>.pstats: o perfil completo da etapa, para abrir com pstats ou snakeviz.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+# Pasta do relatório de perfilamento; vazio desliga o modo
+SYNC_PROFILE_DIR = os.getenv("SYNC_PROFILE_DIR", "")
+
+FUNCOES_POR_ETAPA = 25
+LOCAIS_DE_ALOCACAO = 10
+
+# Alocações do próprio tracemalloc e da importação de módulos não interessam no relatório
+FILTROS_ALOCACAO = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+class Perfilador:
+    def __init__(self, quadros=1):
+        self._vez = threading.RLock()
+        self._por_thread = threading.local()
+        self._perfis = {}
+        self._execucoes = {}
+        self._picos = {}
+        self._alocacoes = {}
+        tracemalloc.start(quadros)
+
+    @contextmanager
+    def etapa(self, nome):
+        # Uma etapa dentro de outra na mesma thread fica no perfil da externa
+        if getattr(self._por_thread, "ativa", False):
+            yield
+            return
+
+        with self._vez:
+            self._por_thread.ativa = True
+            perfil = self._perfis.setdefault(nome, cProfile.Profile())
+            primeira = nome not in self._execucoes
+            self._execucoes[nome] = self._execucoes.get(nome, 0) + 1
+            antes = tracemalloc.take_snapshot().filter_traces(FILTROS_ALOCACAO) if primeira else None
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+            perfil.enable()
+            try:
+                yield
+            finally:
+                perfil.disable()
+                pico = tracemalloc.get_traced_memory()[1] - memoria_inicial
+                self._picos[nome] = max(self._picos.get(nome, 0), pico)
+                if antes is not None:
+                    depois = tracemalloc.take_snapshot().filter_traces(FILTROS_ALOCACAO)
+                    aumentos = [d for d in depois.compare_to(antes, "lineno") if d.size_diff > 0]
+                    self._alocacoes[nome] = aumentos[:LOCAIS_DE_ALOCACAO]
+                self._por_thread.ativa = False
+
+    def relatorio(self):
+        texto = io.StringIO()
+        for nome in sorted(self._perfis):
+            texto.write(f"{'=' * 100}\n{nome}: {self._execucoes[nome]} execuções, ")
+            texto.write(f"pico de memória alocada durante a etapa {self._picos[nome] / 2**20:.1f} MiB\n{'=' * 100}\n")
+            estatisticas = pstats.Stats(self._perfis[nome], stream=texto)
+            estatisticas.strip_dirs().sort_stats("cumulative").print_stats(FUNCOES_POR_ETAPA)
+            texto.write("Locais que mais alocaram na primeira execução:\n")
+            for diferenca in self._alocacoes.get(nome, []):
+                texto.write(f"    {diferenca}\n")
+            texto.write("\n")
+        return texto.getvalue()
+
+    def gravar(self, pasta=SYNC_PROFILE_DIR):
+        os.makedirs(pasta, exist_ok=True)
+        for nome, perfil in self._perfis.items():
+            perfil.dump_stats(os.path.join(pasta, f"{nome}.pstats"))
+        with open(os.path.join(pasta, "relatorio.txt"), "w", encoding="utf-8") as f:
+            f.write(self.relatorio())
+        tracemalloc.stop()
+        print(f"Relatório de perfilamento gravado em {pasta}")
@@ -0,0 +1,245 @@
+"""
+Snapshot colunar das tabelas da sincronização, para as consultas analíticas.
+
+db_dpc_jira, db_dpc_jira_disciplinas e cursos são gravadas em Parquet, particionadas por
+entidade no formato Hive (<tabela>/entidade=<valor>/dados.parquet), que pyarrow.dataset,
+pandas.read_parquet e DuckDB leem como uma tabela só; coordenadores, sem entidade, fica
+em um arquivo único. Assim as leituras pesadas saem do MySQL da sincronização.
+
+Na primeira execução, ou quando as colunas de uma tabela mudam, a tabela é exportada
+inteira, uma partição por vez. Depois, só as partições das tarefas gravadas nesta
+execução ou atualizadas desde o último snapshot são regravadas: as linhas dessas chaves
+são lidas do banco pela chave primária e substituem as anteriores. As dimensões, pequenas,
+são regravadas inteiras. Cada arquivo é trocado de uma vez, então um leitor nunca vê uma
+partição pela metade.
+
+O pyarrow (requirements.txt) só é importado quando o snapshot está ligado; sem ele,
+atualizar_snapshot falha em vez de deixar o snapshot desatualizado sem aviso.
+"""
+import os
+import shutil
+import time
+from urllib.parse import quote
+
+from pymysql.constants import FIELD_TYPE
+
+from consultas_sincronizacao import (
+    SQL_SNAPSHOT_ATUALIZADAS_DESDE,
+    SQL_SNAPSHOT_PARTICOES,
+    SQL_SNAPSHOT_POR_CHAVE,
+    SQL_SNAPSHOT_POR_PARTICAO,
+    SQL_SNAPSHOT_TABELA,
+)
+from metricas import metricas
+
+# Parquet pelo pyarrow; o erro de importação é guardado para a falha de atualizar_snapshot
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    ERRO_PYARROW = None
+except ImportError as erro:
+    pa = pc = pq = None
+    ERRO_PYARROW = erro
+
+# Tabelas do snapshot: nome -> coluna de partição (None: arquivo único)
+TABELAS_SNAPSHOT = {
+    "db_dpc_jira": "entidade",
+    "db_dpc_jira_disciplinas": "entidade",
+    "cursos": "entidade",
+    "coordenadores": None,
+}
+# Tabelas atualizadas pelas chaves alteradas; as demais são regravadas inteiras
+TABELAS_POR_CHAVE = ("db_dpc_jira", "db_dpc_jira_disciplinas")
+
+ARQUIVO_DADOS = "dados.parquet"
+# Marca d'água do snapshot; os leitores de datasets ignoram arquivos e pastas começados por "_" ou "."
+ARQUIVO_MARCA = "_last_updated.txt"
+# Partição das linhas sem entidade, com o nome que o Hive e o pyarrow leem como nulo
+PARTICAO_NULA = "__HIVE_DEFAULT_PARTITION__"
+
+TIPOS_INTEIROS = (
+    FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG, FIELD_TYPE.INT24, FIELD_TYPE.LONGLONG, FIELD_TYPE.YEAR,
+)
+TIPOS_REAIS = (FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE)
+TIPOS_DATA_HORA = (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP)
+
+# Função para escolher o tipo Arrow de uma coluna pelo tipo do MySQL; textos e o resto viram string
+def tipo_arrow(tipo_mysql):
+    if tipo_mysql in TIPOS_INTEIROS:
+        return pa.int64()
+    if tipo_mysql in TIPOS_REAIS:
+        return pa.float64()
+    if tipo_mysql == FIELD_TYPE.DATE:
+        return pa.date32()
+    if tipo_mysql in TIPOS_DATA_HORA:
+        return pa.timestamp("us")
+    return pa.string()
+
+# Função para ler o resultado de um comando como tabela Arrow, com o esquema das colunas do banco
+def consultar_arrow(cursor, sql, parametros=None):
+    """
+    O esquema vem do cursor.description, não dos valores: uma coluna toda nula mantém o
+    tipo, e as partições de uma tabela têm sempre as mesmas colunas.
+    """
+    cursor.execute(sql, parametros)
+    esquema = pa.schema([(coluna[0], tipo_arrow(coluna[1])) for coluna in cursor.description])
+    linhas = cursor.fetchall()
+    colunas = list(zip(*linhas)) if linhas else [()] * len(esquema)
+    return pa.Table.from_arrays(
+        [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, esquema)], schema=esquema,
+    )
+
+def _pasta_particao(pasta_tabela, coluna, valor):
+    nome = PARTICAO_NULA if valor is None else quote(str(valor), safe="")
+    return os.path.join(pasta_tabela, f"{coluna}={nome}")
+
+def _filtrar_particao(tabela, coluna, valor):
+    mascara = pc.is_null(tabela[coluna]) if valor is None else pc.equal(tabela[coluna], valor)
+    return tabela.filter(mascara).drop_columns([coluna])
+
+# Função para gravar uma partição, trocando o arquivo anterior de uma vez
+def gravar_particao(tabela, pasta):
+    """Grava pasta/dados.parquet ordenado por chave (quando houver); sem linhas, a partição é removida."""
+    if tabela.num_rows == 0:
+        shutil.rmtree(pasta, ignore_errors=True)
+        return
+    if "chave" in tabela.column_names:
+        tabela = tabela.sort_by("chave")
+    os.makedirs(pasta, exist_ok=True)
+    destino = os.path.join(pasta, ARQUIVO_DADOS)
+    temporario = os.path.join(pasta, f".{ARQUIVO_DADOS}.tmp")
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, destino)
+
+# Função para exportar uma tabela inteira, uma partição por vez
+def exportar_tabela(cursor, pasta, tabela, coluna):
+    """
+    Grava a tabela em uma pasta nova e só então troca a pasta anterior por ela.
+    Devolve a contagem (linhas, partições).
+    """
+    destino = os.path.join(pasta, tabela)
+    nova = os.path.join(pasta, f".{tabela}.novo")
+    antiga = os.path.join(pasta, f".{tabela}.antigo")
+    shutil.rmtree(nova, ignore_errors=True)
+    os.makedirs(nova)
+
+    linhas = particoes = 0
+    if coluna is None:
+        dados = consultar_arrow(cursor, SQL_SNAPSHOT_TABELA.format(tabela=tabela))
+        gravar_particao(dados, nova)
+        linhas, particoes = dados.num_rows, 1
+    else:
+        cursor.execute(SQL_SNAPSHOT_PARTICOES.format(tabela=tabela, coluna=coluna))
+        for (valor,) in cursor.fetchall():
+            dados = consultar_arrow(cursor, SQL_SNAPSHOT_POR_PARTICAO.format(tabela=tabela, coluna=coluna), (valor,))
+            gravar_particao(dados.drop_columns([coluna]), _pasta_particao(nova, coluna, valor))
+            linhas += dados.num_rows
+            particoes += 1
+
+    shutil.rmtree(antiga, ignore_errors=True)
+    if os.path.exists(destino):
+        os.replace(destino, antiga)
+    os.replace(nova, destino)
+    shutil.rmtree(antiga, ignore_errors=True)
+    return linhas, particoes
+
+# Função para regravar só as partições das chaves alteradas
+def atualizar_tabela(cursor, pasta, tabela, coluna, chaves, tamanho_lote=500):
+    """
+    Lê do banco as linhas atuais das chaves e regrava as partições onde elas estavam e
+    as partições para onde foram: uma tarefa que trocou de entidade sai da partição
+    anterior, e uma chave que não existe mais no banco sai do snapshot. Devolve a contagem
+    (linhas, partições), ou None quando as colunas da tabela mudaram e ela precisa ser
+    exportada inteira.
+    """
+    destino = os.path.join(pasta, tabela)
+    chaves = sorted(chaves)
+    if not chaves:
+        return 0, 0
+
+    lotes = [
+        consultar_arrow(
+            cursor, SQL_SNAPSHOT_POR_CHAVE.format(tabela=tabela, marcadores=", ".join(["%s"] * len(lote))), lote,
+        )
+        for lote in (chaves[inicio:inicio + tamanho_lote] for inicio in range(0, len(chaves), tamanho_lote))
+    ]
+    atuais = pa.concat_tables(lotes)
+    esquema = atuais.schema.remove(atuais.schema.get_field_index(coluna))
+    conjunto_chaves = pa.array(chaves, type=pa.string())
+
+    # Partições com linhas novas ou atualizadas, e partições que tinham alguma das chaves
+    regravar = {
+        _pasta_particao(destino, coluna, valor): _filtrar_particao(atuais, coluna, valor)
+        for valor in pc.unique(atuais[coluna]).to_pylist()
+    }
+    for nome in os.listdir(destino):
+        arquivo = os.path.join(destino, nome, ARQUIVO_DADOS)
+        if not nome.startswith(f"{coluna}=") or not os.path.exists(arquivo):
+            continue
+        if not pq.read_schema(arquivo).equals(esquema, check_metadata=False):
+            return None
+        if pc.any(pc.is_in(pq.ParquetFile(arquivo).read(columns=["chave"])["chave"], value_set=conjunto_chaves)).as_py():
+            regravar.setdefault(os.path.join(destino, nome), esquema.empty_table())
+
+    for pasta_particao, novas in regravar.items():
+        arquivo = os.path.join(pasta_particao, ARQUIVO_DADOS)
+        if os.path.exists(arquivo):
+            anteriores = pq.ParquetFile(arquivo).read()
+            mantidas = anteriores.filter(pc.invert(pc.is_in(anteriores["chave"], value_set=conjunto_chaves)))
+            novas = pa.concat_tables([mantidas, novas])
+        gravar_particao(novas, pasta_particao)
+    return atuais.num_rows, len(regravar)
+
+# Função para ler a marca d'água do snapshot
+def marca_dagua_snapshot(pasta):
+    caminho = os.path.join(pasta, ARQUIVO_MARCA)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "r") as f:
+        return f.read().strip() or None
+
+# Função para atualizar o snapshot de todas as tabelas
+def atualizar_snapshot(conexao, pasta, chaves_alteradas, hoje, tamanho_lote=500):
+    """
+    chaves_alteradas: tabela -> chaves gravadas nesta execução. As chaves atualizadas
+    desde a marca d'água do snapshot também são relidas, o que cobre uma execução anterior
+    em que a sincronização gravou e o snapshot falhou. Ao fim a marca d'água passa para
+    hoje. Devolve tabela -> (linhas lidas do banco, partições gravadas).
+    """
+    if pa is None:
+        raise ImportError(
+            f"O snapshot analítico em {pasta!r} precisa do pyarrow (pip install -r requirements.txt)"
+        ) from ERRO_PYARROW
+
+    os.makedirs(pasta, exist_ok=True)
+    marca_dagua = marca_dagua_snapshot(pasta)
+    resumo = {}
+    cursor = conexao.cursor()
+    try:
+        for tabela, coluna in TABELAS_SNAPSHOT.items():
+            inicio = time.time()
+            with metricas.medir("snapshot", tabela=tabela):
+                resultado = None
+                if tabela in TABELAS_POR_CHAVE and marca_dagua and os.path.isdir(os.path.join(pasta, tabela)):
+                    chaves = set(chaves_alteradas.get(tabela, ()))
+                    cursor.execute(SQL_SNAPSHOT_ATUALIZADAS_DESDE.format(tabela=tabela), (marca_dagua,))
+                    chaves.update(chave for (chave,) in cursor.fetchall())
+                    resultado = atualizar_tabela(cursor, pasta, tabela, coluna, chaves, tamanho_lote)
+                    modo = "atualizada"
+                if resultado is None:
+                    resultado = exportar_tabela(cursor, pasta, tabela, coluna)
+                    modo = "exportada"
+            resumo[tabela] = resultado
+            metricas.somar("snapshot_linhas_total", resultado[0], tabela=tabela)
+            metricas.somar("snapshot_particoes_total", resultado[1], tabela=tabela)
+            print(
+                f"Snapshot {tabela} {modo}: {resultado[0]} linhas, {resultado[1]} partições gravadas "
+                f"em {time.time() - inicio:.2f} segundos"
+            )
+    finally:
+        cursor.close()
+
+    with open(os.path.join(pasta, ARQUIVO_MARCA), "w") as f:
+        f.write(hoje)
+    return resumo
@@ -0,0 +1,50 @@
+"""
+O preenchimento de coordenador_chave nas linhas antigas usa a mesma normalização da
+sincronização.
+"""
+from create_jira_sql import preencher_chave_coordenador
+from update_jira_sql import obter_primeiro_coordenador
+
+
+class CursorFalso:
+    """Devolve as linhas sem chave no SELECT e guarda os UPDATEs enviados."""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+        self.atualizacoes = []
+
+    def execute(self, sql, parametros=None):
+        if parametros is not None:
+            self.atualizacoes.append(parametros)
+
+    def executemany(self, sql, lote):
+        self.atualizacoes.extend(lote)
+
+    def fetchall(self):
+        return self.linhas
+
+
+def test_chave_igual_a_da_sincronizacao():
+    coordenadores = [
+        "Ana Souza / Bruno Lima",
+        "Ana Souza /Bruno Lima",
+        "  Ana Souza\t/\tBruno Lima ",
+        "Ｃarla Dias/Outra Pessoa",
+        "Joana D’Arc",
+        "Coord. Geral dos Cursos em Direito - Pós",
+        "Renata Alcione de Faria Rodrigues / Fulano",
+        " ",
+    ]
+    linhas = [(f"PROCONTEUD-{i}", coordenador) for i, coordenador in enumerate(coordenadores)]
+    cursor = CursorFalso(linhas)
+
+    preencher_chave_coordenador(cursor, "db_dpc_jira")
+
+    esperadas = [
+        (obter_primeiro_coordenador(coordenador), chave)
+        for chave, coordenador in linhas
+        if obter_primeiro_coordenador(coordenador)
+    ]
+    assert cursor.atualizacoes == esperadas
+    assert ("Ana Souza", "PROCONTEUD-2") in esperadas
+    assert ("Carla Dias", "PROCONTEUD-3") in esperadas
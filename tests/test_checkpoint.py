@@ -0,0 +1,116 @@
+"""
+Retomada de uma sincronização interrompida a partir do checkpoint por página, contra o
+servidor Jira falso. A gravação no banco é trocada por uma lista das chaves gravadas.
+"""
+import json
+
+import pytest
+
+import update_jira_sql as sync
+from benchmarks.fake_jira import ServidorJiraFalso, gerar_issue
+
+TOTAL_ISSUES = 3500
+MARCA_DAGUA = "2000-01-01"
+DIA_DA_FALHA = "2026-10-17"
+DIA_DA_RETOMADA = "2026-10-18"
+
+
+class FalhaNaGravacao(Exception):
+    pass
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for arquivo in ("last_updated.txt", "last_updated_disciplinas.txt"):
+        (tmp_path / arquivo).write_text(MARCA_DAGUA)
+    monkeypatch.setattr(sync, "SYNC_CHECKPOINT_FILE", str(tmp_path / "checkpoint_sync.json"))
+    monkeypatch.setattr(sync, "SYNC_STREAMING", True)
+    monkeypatch.setattr(sync, "SYNC_ESCOLA_TECNICA", False)
+    monkeypatch.setattr(sync, "SYNC_CACHE_FILE", "")
+    monkeypatch.setattr(sync, "SYNC_SNAPSHOT_DIR", "")
+    monkeypatch.setattr(sync, "last_updated", None)
+    monkeypatch.setattr(sync, "last_updated_disciplinas", None)
+    monkeypatch.setattr(sync, "datas_retomadas", {})
+    monkeypatch.setattr(sync, "atualizar_resumo_producao", lambda: None)
+
+    def sincronizar_disciplinas(consulta, paginacao):
+        paginacao[1].close()
+
+    monkeypatch.setattr(sync, "sincronizar_disciplinas_jira", sincronizar_disciplinas)
+
+    gravadas = []
+
+    def executar(dia, falhar_na_pagina=None):
+        """Roda main() como se fosse o dia informado; a gravação da página falhar_na_pagina (1, 2, ...) falha."""
+        paginas = []
+
+        def gravar_lote(sql, dados, **kwargs):
+            paginas.append(dados)
+            if len(paginas) == falhar_na_pagina:
+                raise FalhaNaGravacao()
+            gravadas.extend(linha[0] for linha in dados)
+            return (len(dados), 0, 0)
+
+        monkeypatch.setattr(sync, "gravar_lote_mysql", gravar_lote)
+        monkeypatch.setattr(sync, "update_time", dia)
+        monkeypatch.setattr(sync, "update_time_disciplinas", dia)
+        monkeypatch.setattr(sync, "last_updated", None)
+        monkeypatch.setattr(sync, "last_updated_disciplinas", None)
+        sync.main()
+
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES) as servidor:
+        monkeypatch.setattr(sync, "JIRA_BASE_URL", servidor.url)
+        yield tmp_path, executar, gravadas
+
+
+def chaves_esperadas():
+    return [linha[0] for linha in sync.transformar_pagina_dados([gerar_issue(i) for i in range(TOTAL_ISSUES)])]
+
+
+def test_retomada_grava_cada_tarefa_uma_vez(ambiente):
+    pasta, executar, gravadas = ambiente
+    with pytest.raises(FalhaNaGravacao):
+        executar(DIA_DA_FALHA, falhar_na_pagina=3)
+
+    checkpoint = json.loads((pasta / "checkpoint_sync.json").read_text())["dados"]
+    assert checkpoint["proxima"] == 2000
+    assert checkpoint["data"] == DIA_DA_FALHA
+    assert (pasta / "last_updated.txt").read_text() == MARCA_DAGUA
+
+    executar(DIA_DA_RETOMADA)
+    assert gravadas == chaves_esperadas()
+    assert not (pasta / "checkpoint_sync.json").exists()
+
+
+def test_retomada_deixa_a_marca_dagua_na_data_da_execucao_interrompida(ambiente):
+    pasta, executar, _ = ambiente
+    with pytest.raises(FalhaNaGravacao):
+        executar(DIA_DA_FALHA, falhar_na_pagina=2)
+    # A retomada também falha; o checkpoint mantém a data da primeira execução
+    with pytest.raises(FalhaNaGravacao):
+        executar(DIA_DA_RETOMADA, falhar_na_pagina=2)
+    assert json.loads((pasta / "checkpoint_sync.json").read_text())["dados"]["data"] == DIA_DA_FALHA
+
+    executar("2026-10-19")
+    assert (pasta / "last_updated.txt").read_text() == DIA_DA_FALHA
+    assert (pasta / "last_updated_disciplinas.txt").read_text() == "2026-10-19"
+
+
+def test_execucao_sem_checkpoint_grava_a_data_de_hoje(ambiente):
+    pasta, executar, gravadas = ambiente
+    executar(DIA_DA_RETOMADA)
+    assert gravadas == chaves_esperadas()
+    assert (pasta / "last_updated.txt").read_text() == DIA_DA_RETOMADA
+
+
+def test_checkpoint_antigo_sem_data_volta_a_marca_dagua_da_consulta(ambiente):
+    pasta, executar, _ = ambiente
+    with pytest.raises(FalhaNaGravacao):
+        executar(DIA_DA_FALHA, falhar_na_pagina=2)
+    checkpoints = json.loads((pasta / "checkpoint_sync.json").read_text())
+    del checkpoints["dados"]["data"]
+    (pasta / "checkpoint_sync.json").write_text(json.dumps(checkpoints))
+
+    executar(DIA_DA_RETOMADA)
+    assert (pasta / "last_updated.txt").read_text() == MARCA_DAGUA
@@ -0,0 +1,64 @@
+"""
+Exportação da escola técnica contra o servidor Jira falso: a consulta traz todas as
+subtarefas, e só as de vídeo, reconhecidas pelo resumo, entram no CSV.
+"""
+import csv
+
+import pytest
+
+import update_jira_sql as sync
+from benchmarks.fake_jira import ServidorJiraFalso, gerar_subtarefa
+
+TOTAL_ISSUES = 300
+MARCA_DAGUA = "2030-01-01"
+ALTERACAO = "2030-01-02"
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sync, "update_time", MARCA_DAGUA)
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES) as servidor:
+        monkeypatch.setattr(sync, "JIRA_BASE_URL", servidor.url)
+        yield servidor
+
+
+def exportar(**kwargs):
+    return sync.exportar_escola_tecnica(caminho="escola_tecnica.csv", caminho_xlsx="", **kwargs)
+
+
+def chaves_do_csv():
+    with open("escola_tecnica.csv", newline="", encoding="utf-8-sig") as arquivo:
+        leitor = csv.reader(arquivo)
+        next(leitor)
+        return sorted(linha[0] for linha in leitor)
+
+
+def chaves_de_video():
+    # As subtarefas de vídeo têm índice ímpar
+    return sorted(f"PROCONTEUD-{TOTAL_ISSUES + indice + 1}" for indice in range(1, 2 * TOTAL_ISSUES, 2))
+
+
+def test_consulta_sem_busca_em_texto():
+    base_url, _ = sync.consulta_escola_tecnica_jira(completa=True)
+    assert "text" not in base_url
+
+
+def test_so_as_subtarefas_de_video_sao_exportadas(ambiente):
+    assert exportar(completa=True) == (TOTAL_ISSUES, 0, 0)
+    assert chaves_do_csv() == chaves_de_video()
+
+    # Subtarefas de conteúdo alteradas vêm na busca incremental e continuam fora do CSV
+    ambiente.atualizar(range(20), ALTERACAO, subtarefas=True)
+    assert exportar(completa=False) == (0, 10, TOTAL_ISSUES - 10)
+    assert chaves_do_csv() == chaves_de_video()
+
+
+def test_subtarefa_que_deixou_de_ser_de_video_sai_do_csv(ambiente):
+    exportar(completa=True)
+    renomeada = gerar_subtarefa(1, TOTAL_ISSUES)
+    renomeada["fields"]["summary"] = "Disciplina 0: CONTEÚDO - ENTREGAR"
+    paginas = (pagina for pagina in [{"issues": [renomeada]}])
+
+    assert exportar(paginacao=(1, paginas), completa=False, registrar_marca=False) == (0, 0, TOTAL_ISSUES - 1)
+    assert chaves_do_csv() == [chave for chave in chaves_de_video() if chave != renomeada["key"]]
@@ -0,0 +1,158 @@
+"""
+Planejamento de páginas de jira_client contra o servidor Jira falso: em todos os casos
+cada tarefa chega uma única vez e na ordem da consulta.
+"""
+import math
+from time import sleep as esperar
+
+import pytest
+
+import jira_client
+from benchmarks.fake_jira import ServidorJiraFalso
+from jira_client import paginar_jira, planejar_passo
+
+TOTAL_ISSUES = 2503
+
+
+class ServidorQueEncolhe(ServidorJiraFalso):
+    """Depois da primeira página, as últimas tarefas deixam de casar com a consulta."""
+
+    def __init__(self, total_depois, **kwargs):
+        super().__init__(**kwargs)
+        self.total_depois = total_depois
+
+    def pagina(self, start_at, max_results, subtarefas=False, jql=""):
+        corpo = super().pagina(start_at, max_results, subtarefas, jql)
+        self.total_issues = self.total_depois
+        return corpo
+
+
+class ServidorInstavel(ServidorJiraFalso):
+    """As primeiras requisições derrubam a conexão sem resposta ou ficam paradas além do timeout."""
+
+    def __init__(self, falhas, **kwargs):
+        super().__init__(**kwargs)
+        self.falhas = list(falhas)
+
+    def pagina(self, start_at, max_results, subtarefas=False, jql=""):
+        with self._lock:
+            falha = self.falhas.pop(0) if self.falhas else None
+        if falha == "derrubar":
+            raise ConnectionResetError("conexão derrubada pelo servidor falso")
+        if falha == "travar":
+            esperar(1)
+        return super().pagina(start_at, max_results, subtarefas, jql)
+
+
+def paginar(servidor, max_results=1000, start_at=0):
+    params = {"fields": "summary", "startAt": start_at, "maxResults": max_results}
+    total, paginas = paginar_jira(f"{servidor.url}/rest/api/2/search?jql=teste", params)
+    return total, [issue["key"] for pagina in paginas for issue in pagina.get("issues", [])]
+
+
+def chaves(inicio, fim):
+    return [f"PROCONTEUD-{indice + 1}" for indice in range(inicio, fim)]
+
+
+def complementares():
+    return jira_client.metricas.valor("paginas_complementares_total", consulta="consulta")
+
+
+@pytest.mark.parametrize("limite", [None, 50, 100, 1000])
+def test_max_results_limitado_pelo_servidor(limite):
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES, limite_max_results=limite) as servidor:
+        total, recebidas = paginar(servidor)
+        requisicoes = servidor.requisicoes
+    assert total == TOTAL_ISSUES
+    assert recebidas == chaves(0, TOTAL_ISSUES)
+    # Nenhum intervalo pulado e nenhuma requisição vazia ao fim
+    assert requisicoes == math.ceil(TOTAL_ISSUES / min(1000, limite or 1000))
+
+
+def test_paginas_curtas_que_nao_sao_a_ultima():
+    antes = complementares()
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES, limite_max_results=100, encurtar=0.3) as servidor:
+        _, recebidas = paginar(servidor)
+    assert recebidas == chaves(0, TOTAL_ISSUES)
+    assert complementares() > antes
+
+
+def test_primeira_pagina_curta_define_o_passo():
+    # startAt=0 é uma das páginas encurtadas com encurtar=0.9
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES, limite_max_results=100, encurtar=0.9) as servidor:
+        _, recebidas = paginar(servidor)
+    assert recebidas == chaves(0, TOTAL_ISSUES)
+
+
+def test_total_diminui_durante_a_busca():
+    with ServidorQueEncolhe(total_depois=1500, total_issues=TOTAL_ISSUES) as servidor:
+        total, recebidas = paginar(servidor)
+    assert total == TOTAL_ISSUES
+    assert recebidas == chaves(0, 1500)
+
+
+def test_total_diminui_com_paginas_limitadas():
+    with ServidorQueEncolhe(total_depois=1234, total_issues=TOTAL_ISSUES, limite_max_results=100) as servidor:
+        _, recebidas = paginar(servidor)
+    assert recebidas == chaves(0, 1234)
+
+
+@pytest.mark.parametrize("limite", [None, 100])
+def test_retomada_a_partir_de_start_at(limite):
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES, limite_max_results=limite, encurtar=0.2) as servidor:
+        total, recebidas = paginar(servidor, start_at=1500)
+    assert total == TOTAL_ISSUES
+    assert recebidas == chaves(1500, TOTAL_ISSUES)
+
+
+@pytest.mark.parametrize("falhas", [["derrubar"], ["travar"], ["derrubar", "travar"]])
+def test_conexao_derrubada_ou_parada_e_retentada(monkeypatch, falhas):
+    monkeypatch.setattr(jira_client, "JIRA_TIMEOUT", 0.2)
+    monkeypatch.setattr(jira_client.time, "sleep", lambda segundos: None)
+    with ServidorInstavel(falhas, total_issues=TOTAL_ISSUES, limite_max_results=1000) as servidor:
+        total, recebidas = paginar(servidor)
+    assert total == TOTAL_ISSUES
+    assert recebidas == chaves(0, TOTAL_ISSUES)
+
+
+def test_conexao_sempre_parada_falha(monkeypatch):
+    monkeypatch.setattr(jira_client, "JIRA_TIMEOUT", 0.1)
+    monkeypatch.setattr(jira_client.time, "sleep", lambda segundos: None)
+    with ServidorInstavel(["travar"] * 3, total_issues=10) as servidor:
+        with pytest.raises(Exception, match="após 3 tentativas"):
+            jira_client.realizar_requisicao(f"{servidor.url}/rest/api/2/search?jql=teste", sessao=jira_client.criar_sessao())
+
+
+def test_motor_nao_trava_com_consumidor_parado(monkeypatch):
+    fila, total_futuro, parar = jira_client.queue.Queue(maxsize=1), jira_client.Future(), jira_client.threading.Event()
+
+    async def loop_que_falha(execucoes, max_concorrencia, sessao):
+        fila.put_nowait({"issues": []})
+        total_futuro.set_result(1)
+        parar.set()
+        raise RuntimeError("falha no loop")
+
+    monkeypatch.setattr(jira_client, "_executar_consultas", loop_que_falha)
+    motor = jira_client.threading.Thread(
+        target=jira_client._rodar_motor, args=([("consulta", "", {}, fila, total_futuro, parar)], 1, None), daemon=True,
+    )
+    motor.start()
+    motor.join(timeout=5)
+    assert not motor.is_alive()
+
+
+def test_planejar_passo():
+    def pagina(start_at, recebidas, max_results=100, total=5000):
+        return {"startAt": start_at, "maxResults": max_results, "total": total, "issues": [{}] * recebidas}
+
+    # O servidor aplicou um maxResults menor que o pedido
+    assert planejar_passo(1000, pagina(0, 100)) == 100
+    # O pedido é menor que o limite do servidor
+    assert planejar_passo(50, pagina(0, 50)) == 50
+    # Página curta que não é a última: vale o tamanho real
+    assert planejar_passo(1000, pagina(0, 40)) == 40
+    # A última página pode vir curta sem mudar o passo
+    assert planejar_passo(1000, pagina(4960, 40)) == 100
+    # Resposta sem maxResults e sem tarefas
+    assert planejar_passo(1000, {"startAt": 0, "total": 0, "issues": []}) == 1000
+    assert planejar_passo(0, {"startAt": 0, "total": 0, "issues": []}) == 1
@@ -0,0 +1,41 @@
+"""
+As partições da carga completa cobrem a mesma consulta sem partições, contra o servidor
+Jira falso.
+"""
+import pytest
+
+import update_jira_sql as sync
+from benchmarks.fake_jira import ServidorJiraFalso
+from particoes import PARTICAO_RESTANTE, conferir_total, particoes_por_entidade
+
+TOTAL_ISSUES = 3000
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    with ServidorJiraFalso(total_issues=TOTAL_ISSUES) as servidor:
+        monkeypatch.setattr(sync, "JIRA_BASE_URL", servidor.url)
+        yield servidor
+
+
+def test_particao_restante_exclui_as_entidades_listadas():
+    particoes = particoes_por_entidade(("Fac. Unyleya | CETEC", "Fac. Unyleya | CEAB"))
+    assert particoes[PARTICAO_RESTANTE] == (
+        ' AND NOT ("Entidade e Curso" in cascadeOption("Fac. Unyleya | CETEC")'
+        ' OR "Entidade e Curso" in cascadeOption("Fac. Unyleya | CEAB"))'
+    )
+
+
+@pytest.mark.parametrize("por", ["entidade", "criacao"])
+def test_particoes_entregam_todas_as_tarefas(servidor, por):
+    total, paginas = sync.paginar_backfill("dados", sync.consulta_dados_jira, por)
+    chaves = [issue["key"] for pagina in paginas for issue in pagina["issues"]]
+    assert total == TOTAL_ISSUES
+    assert sorted(chaves) == sorted(f"PROCONTEUD-{i + 1}" for i in range(TOTAL_ISSUES))
+
+
+def test_particoes_incompletas_falham_antes_da_primeira_pagina():
+    with pytest.raises(Exception, match="não cairiam em nenhuma partição"):
+        conferir_total(2545, 3000)
+    conferir_total(3000, 3000)
+    conferir_total(3001, 3000)
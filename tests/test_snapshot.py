@@ -0,0 +1,21 @@
+"""
+Com o snapshot ligado e sem o pyarrow, a execução falha em vez de seguir sem o snapshot.
+"""
+import pytest
+
+import snapshot_analitico
+import update_jira_sql as sync
+
+
+def test_snapshot_ligado_sem_pyarrow_falha(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_analitico, "pa", None)
+    monkeypatch.setattr(sync, "SYNC_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    with pytest.raises(ImportError, match="precisa do pyarrow"):
+        sync.atualizar_snapshot_analitico()
+    assert not (tmp_path / "snapshot").exists()
+
+
+def test_snapshot_desligado_nao_precisa_do_pyarrow(monkeypatch):
+    monkeypatch.setattr(snapshot_analitico, "pa", None)
+    monkeypatch.setattr(sync, "SYNC_SNAPSHOT_DIR", "")
+    assert sync.atualizar_snapshot_analitico() is None
@@ -1,17 +1,43 @@
 import os
 import re
+import csv
+import sys
 import time
-import requests
 import pymysql
 import base64
 from dotenv import load_dotenv
 from tqdm import tqdm
 from datetime import datetime
 from urllib.parse import quote
-import pandas as pd
 import unicodedata
 import re
 import json
+import queue
+import hashlib
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from operator import itemgetter
+from jira_client import JIRA_BASE_URL, buscar_consultas, configurar_sessao, contar_tarefas, paginar_jira
+from cache_respostas import CacheRespostas, guardar_paginas
+from particoes import SYNC_BACKFILL_POR, intercalar_particoes, planejar_particoes
+from metricas import metricas
+from conexao_tardia import ConexaoTardia
+from perfilamento import SYNC_PROFILE_DIR, Perfilador
+from consultas_sincronizacao import (
+    SQL_CARREGAR_COORDENADORES,
+    SQL_CARREGAR_CURSOS,
+    SQL_COORDENADORES_POR_NOME,
+    SQL_CURSOS_PAIS,
+    SQL_CURSOS_POR_NOME,
+    SQL_UPSERT_COORDENADORES,
+    SQL_APAGAR_RESUMO,
+    SQL_CURSO_ID_POR_CHAVE,
+    SQL_CURSOS_ATUALIZADOS_DESDE,
+    SQL_HASHES_DADOS,
+    SQL_HASHES_DISCIPLINAS,
+    SQL_INSERIR_RESUMO,
+)
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -34,6 +60,9 @@ headers = {
     "cookie": f"JSESSIONID={cookie1}; atlassian.xsrf.token={cookie2}; seraph.rememberme.cookie={cookie3}",
 }
 
+# Sessão HTTP compartilhada pelos fetchers, com autenticação e cookies definidos uma única vez
+configurar_sessao(headers)
+
 # Configurações do Banco de Dados MySQL
 use_client = False
 
@@ -42,46 +71,102 @@ if use_client:
     DB_USER = os.getenv("11DB_USER")
     DB_PASSWORD = os.getenv("11DB_PASSWORD")
     DB_NAME = os.getenv("11DB_NAME")
-    DB_PORT = int(os.getenv("11DB_PORT"))
+    DB_PORT = int(os.getenv("11DB_PORT", "3306"))
 else:
     DB_HOST = os.getenv("DB_HOST")
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     DB_NAME = os.getenv("DB_NAME")
-    DB_PORT = int(os.getenv("DB_PORT"))
+    DB_PORT = int(os.getenv("DB_PORT", "3306"))
 
 ano_atual = datetime.now().year
 mes_atual = datetime.now().month
 
-print('connecting to database')
-sql_client = pymysql.connect(
-    host=DB_HOST,
-    user=DB_USER,
-    password=DB_PASSWORD,
-    database=DB_NAME,
-    port=DB_PORT
-)
-print('connected to database')
+# Quantidade de linhas enviadas ao banco por comando
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "500"))
+
+# Sincronização em fluxo contínuo: cada página é transformada e gravada enquanto as próximas são baixadas
+SYNC_STREAMING = os.getenv("SYNC_STREAMING", "1") == "1"
+# Quantidade de páginas que podem aguardar entre um estágio e outro
+SYNC_QUEUE_SIZE = int(os.getenv("SYNC_QUEUE_SIZE", "2"))
+# Exporta os vídeos da escola técnica junto com a sincronização
+SYNC_ESCOLA_TECNICA = os.getenv("SYNC_ESCOLA_TECNICA", "0") == "1"
+# CSV com os vídeos da escola técnica; cada exportação mescla nele as tarefas novas e alteradas
+SYNC_ESCOLA_TECNICA_CSV = os.getenv("SYNC_ESCOLA_TECNICA_CSV", "escola_tecnica.csv")
+# Planilha regerada a partir do CSV ao fim de cada exportação; vazio desliga
+SYNC_ESCOLA_TECNICA_XLSX = os.getenv("SYNC_ESCOLA_TECNICA_XLSX", "escola_tecnica.xlsx")
+# Arquivo com a última página gravada de cada consulta, usado para retomar uma sincronização interrompida
+SYNC_CHECKPOINT_FILE = os.getenv("SYNC_CHECKPOINT_FILE", "checkpoint_sync.json")
+# Arquivo SQLite onde as respostas do Jira são guardadas; vazio desliga o cache
+SYNC_CACHE_FILE = os.getenv("SYNC_CACHE_FILE", "")
+# Reprocessa as tarefas guardadas no cache em vez de consultar o Jira
+SYNC_REPLAY = os.getenv("SYNC_REPLAY", "0") == "1"
+# Pasta do snapshot analítico em Parquet, atualizada ao fim de cada execução; vazio desliga
+SYNC_SNAPSHOT_DIR = os.getenv("SYNC_SNAPSHOT_DIR", "")
+
+# Cursor que conta os comandos enviados ao banco; o executemany do PyMySQL passa por execute a cada lote
+class CursorContado(pymysql.cursors.Cursor):
+    def execute(self, query, args=None):
+        metricas.somar("banco_comandos_total")
+        return super().execute(query, args)
+
+# Função para abrir uma conexão com o banco
+def conectar_banco():
+    return pymysql.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        port=DB_PORT,
+        cursorclass=CursorContado,
+    )
+
+# Conexão principal, aberta no primeiro uso; importar o módulo não conecta ao banco
+sql_client = ConexaoTardia(conectar_banco)
 
 update_time = datetime.now().strftime("%Y-%m-%d")
 update_time_disciplinas = datetime.now().strftime("%Y-%m-%d")
-last_updated = open("last_updated.txt", "r").read().strip()
-last_updated_disciplinas = open("last_updated_disciplinas.txt", "r").read().strip()
-
-print(last_updated)
-if last_updated == update_time and last_updated_disciplinas == update_time_disciplinas:
-    print("Já foi atualizado hoje.")
-    exit()
+# Marcas d'água, lidas de last_updated*.txt na primeira vez que uma consulta precisa delas
+last_updated = None
+last_updated_disciplinas = None
+
+# Função para ler as marcas d'água que ainda não foram carregadas
+def carregar_marcas_dagua():
+    global last_updated, last_updated_disciplinas
+    if last_updated is None:
+        with open("last_updated.txt", "r") as f:
+            last_updated = f.read().strip()
+    if last_updated_disciplinas is None:
+        with open("last_updated_disciplinas.txt", "r") as f:
+            last_updated_disciplinas = f.read().strip()
+
+# Função para saber se as duas consultas já foram sincronizadas hoje
+def atualizado_hoje():
+    carregar_marcas_dagua()
+    return last_updated == update_time and last_updated_disciplinas == update_time_disciplinas
+
+# Coordenadores cadastrados no Jira com nomes antigos ou compostos; vale o primeiro prefixo que casar
+ALIASES_COORDENADORES = (
+    ("Coord. Geral dos Cursos em Direito", "Coordenação Geral dos Cursos de Direito"),
+    ("Renata Alcione de Faria Rodrigues", "Renata Alcione de Faria Villela de Araújo"),
+)
 
+# Chave normalizada do coordenador, gravada em coordenador_chave e comparada com coordenadores.coordenador.
+# Os mesmos poucos nomes se repetem em todas as tarefas, então o resultado fica em cache
+@lru_cache(maxsize=4096)
 def obter_primeiro_coordenador(coordenador):
     if not coordenador:
         return None
+
+    for prefixo, nome in ALIASES_COORDENADORES:
+        if coordenador.startswith(prefixo):
+            return nome
     
+    # Remove espaços invisíveis como CHAR(160) (U+00A0); antes do NFKC, que os trocaria por espaço comum
+    coordenador = coordenador.replace("\u00A0", "")
+
     # Normaliza espaços invisíveis e caracteres especiais
     coordenador = unicodedata.normalize("NFKC", coordenador).strip()
-    
-    # Remove espaços invisíveis como CHAR(160) (U+00A0)
-    coordenador = coordenador.replace("\u00A0", "")
 
     # Substitui variações de separadores "/ ", " /" e " / " por "/"
     coordenador = re.sub(r"\s*/\s*", "/", coordenador)
@@ -93,10 +178,371 @@ def obter_primeiro_coordenador(coordenador):
     # Obtém o primeiro coordenador antes da primeira "/"
     primeiro_coordenador = coordenador.split("/", 1)[0].strip()
     
-    return primeiro_coordenador
+    return primeiro_coordenador or None
+
+# Comandos de gravação e a ordem das colunas de cada um
+SQL_UPSERT_DADOS = """
+    INSERT INTO db_dpc_jira (
+        chave, link_jira, rotulos, data_para_ficar_pronto, data_criacao, data_atualizacao, 
+        data_de_lancamento, date_launch_jira, ano, mes, status_launch, 
+        resumo, versoes_corrigidas, tipo_de_item, situacao, cpf_conteudista,
+        conteudista, coordenador, coordenador_chave, coordenador_master, entidade_curso, entidade,
+        migracao, curso, status_contrato, status_conteudos, 
+        status_videos, descricao, hash_conteudo, curso_id, coordenador_id
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
+         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        rotulos = VALUES(rotulos),
+        link_jira = VALUES(link_jira),
+        data_para_ficar_pronto = VALUES(data_para_ficar_pronto),
+        data_criacao = VALUES(data_criacao),
+        data_atualizacao = VALUES(data_atualizacao),
+        data_de_lancamento = VALUES(data_de_lancamento),
+        date_launch_jira = VALUES(date_launch_jira),
+        ano = VALUES(ano),
+        mes = VALUES(mes),
+        status_launch = VALUES(status_launch),
+        resumo = VALUES(resumo),
+        versoes_corrigidas = VALUES(versoes_corrigidas),
+        tipo_de_item = VALUES(tipo_de_item),
+        situacao = VALUES(situacao),
+        cpf_conteudista = VALUES(cpf_conteudista),
+        conteudista = VALUES(conteudista),
+        coordenador = VALUES(coordenador),
+        coordenador_chave = VALUES(coordenador_chave),
+        coordenador_master = VALUES(coordenador_master),
+        entidade_curso = VALUES(entidade_curso),
+        entidade = VALUES(entidade),
+        migracao = VALUES(migracao),
+        curso = VALUES(curso),
+        curso_id = COALESCE(VALUES(curso_id), curso_id),
+        coordenador_id = COALESCE(VALUES(coordenador_id), coordenador_id),
+        status_contrato = VALUES(status_contrato),
+        status_conteudos = VALUES(status_conteudos),
+        status_videos = VALUES(status_videos),
+        descricao = VALUES(descricao),
+        hash_conteudo = VALUES(hash_conteudo)
+"""
+COLUNAS_DADOS = [
+    "chave", "link_jira", "rotulos", "data_para_ficar_pronto", "data_criacao", "data_atualizacao",
+    "data_de_lancamento", "date_launch_jira", "ano", "mes", "status_launch",
+    "resumo", "versoes_corrigidas", "tipo_de_item", "situacao", "cpf_conteudista",
+    "conteudista", "coordenador", "coordenador_chave", "coordenador_master", "entidade_curso", "entidade",
+    "migracao", "curso", "status_contrato", "status_conteudos",
+    "status_videos", "descricao", "hash_conteudo",
+]
+
+SQL_UPSERT_DISCIPLINAS = """
+    INSERT INTO db_dpc_jira_disciplinas (
+        chave, link_jira, rotulos, data_para_ficar_pronto, data_criacao, data_atualizacao, 
+        data_de_resolucao, disciplina, coordenador, coordenador_chave, coordenador_master, entidade_curso, entidade,
+        migracao, curso, situacao, tipo, hash_conteudo, curso_id, coordenador_id
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        rotulos = VALUES(rotulos),
+        link_jira = VALUES(link_jira),
+        data_para_ficar_pronto = VALUES(data_para_ficar_pronto),
+        data_criacao = VALUES(data_criacao),
+        data_atualizacao = VALUES(data_atualizacao),
+        data_de_resolucao = VALUES(data_de_resolucao),
+        disciplina = VALUES(disciplina),
+        coordenador = VALUES(coordenador),
+        coordenador_chave = VALUES(coordenador_chave),
+        coordenador_master = VALUES(coordenador_master),
+        entidade_curso = VALUES(entidade_curso),
+        entidade = VALUES(entidade),
+        migracao = VALUES(migracao),
+        curso = VALUES(curso),
+        curso_id = COALESCE(VALUES(curso_id), curso_id),
+        coordenador_id = COALESCE(VALUES(coordenador_id), coordenador_id),
+        situacao = VALUES(situacao),
+        tipo = VALUES(tipo),
+        hash_conteudo = VALUES(hash_conteudo)
+"""
+COLUNAS_DISCIPLINAS = [
+    "chave", "link_jira", "rotulos", "data_para_ficar_pronto", "data_criacao", "data_atualizacao",
+    "data_de_resolucao", "disciplina", "coordenador", "coordenador_chave", "coordenador_master", "entidade_curso", "entidade",
+    "migracao", "curso", "situacao", "tipo", "hash_conteudo",
+]
+
+# Colunas dos comandos de gravação que não ficam nas linhas: os IDs são resolvidos na gravação,
+# a partir de curso, entidade e coordenador_chave, e vão ao fim dos parâmetros de cada linha
+COLUNAS_IDS = ("curso_id", "coordenador_id")
+
+# Colunas cobertas pelo hash do conteúdo: tudo que vem do Jira. Os IDs já ficam de fora das
+# linhas, e curso, entidade e coordenador_chave, de onde eles vêm, entram no hash
+COLUNAS_FORA_DO_HASH = ("hash_conteudo",)
+
+# Colunas com um valor próprio por tarefa; os textos das demais (situação, entidade,
+# coordenador, tipo de item, datas...) se repetem entre tarefas e são internados
+COLUNAS_PROPRIAS = ("chave", "link_jira", "resumo", "descricao", "hash_conteudo")
+
+# Função para calcular o hash do conteúdo de uma linha
+def calcular_hash_conteudo(valores, selecionar):
+    # repr é estável para os tipos das linhas (texto, None e struct_time) e custa menos que json.dumps.
+    # É o repr de uma lista, como quando as linhas eram dicionários, para valer com os hashes já gravados
+    conteudo = repr(list(selecionar(valores)))
+    return hashlib.blake2b(conteudo.encode("utf-8"), digest_size=16).hexdigest()
+
+# Formato dos registros de uma tabela
+class FormatoRegistro:
+    """
+    Cada linha é uma tupla simples com um valor por coluna, na ordem do comando de gravação,
+    montada uma única vez. Uma tupla só com textos e None deixa de ser acompanhada pelo
+    coletor de lixo (subclasses como namedtuple continuam), o que importa quando milhares
+    de linhas ficam em memória. A chave é sempre a primeira coluna e hash_conteudo a
+    última; os IDs de COLUNAS_IDS não fazem parte da linha e são acrescentados aos
+    parâmetros na gravação.
+    """
+    def __init__(self, colunas):
+        self.colunas = tuple(colunas)
+        # Colunas preenchidas pelos transforms; hash_conteudo é calculado por montar
+        self.campos = self.colunas[:-1]
+        self.posicoes = {coluna: posicao for posicao, coluna in enumerate(colunas)}
+        self.internadas = tuple(posicao for posicao, coluna in enumerate(colunas) if coluna not in COLUNAS_PROPRIAS)
+        self.selecionar_hash = itemgetter(*(
+            posicao for posicao, coluna in enumerate(colunas) if coluna not in COLUNAS_FORA_DO_HASH
+        ))
+
+    def montar(self, **campos):
+        """
+        Monta o registro a partir dos valores por coluna (as omitidas ficam None): interna
+        os textos repetidos e acrescenta hash_conteudo.
+        """
+        valores = [campos.pop(coluna, None) for coluna in self.campos]
+        if campos:
+            raise TypeError(f"Colunas desconhecidas: {', '.join(campos)}")
+        for posicao in self.internadas:
+            if type(valores[posicao]) is str:
+                valores[posicao] = sys.intern(valores[posicao])
+        valores.append(calcular_hash_conteudo(valores, self.selecionar_hash))
+        return tuple(valores)
+
+REGISTRO_DADOS = FormatoRegistro(COLUNAS_DADOS)
+REGISTRO_DISCIPLINAS = FormatoRegistro(COLUNAS_DISCIPLINAS)
+
+SQL_UPSERT_CURSOS = """
+    INSERT INTO cursos (nome_curso, entidade, versao, coordenador_id)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        versao = VALUES(versao),
+        coordenador_id = COALESCE(VALUES(coordenador_id), coordenador_id)
+"""
+
+# Função para gravar linhas em lotes
+def executar_em_lotes(cursor, sql, linhas, tamanho_lote=DB_BATCH_SIZE, progress_bar=None):
+    """
+    Envia as linhas em lotes de tamanho_lote. O executemany do PyMySQL reescreve o
+    INSERT em um único comando com vários VALUES por lote, mantendo o ON DUPLICATE KEY UPDATE.
+    Com tamanho_lote=1 as linhas são enviadas uma a uma, como antes.
+    """
+    tamanho_lote = max(1, tamanho_lote)
+    for inicio in range(0, len(linhas), tamanho_lote):
+        lote = linhas[inicio:inicio + tamanho_lote]
+        if tamanho_lote > 1:
+            cursor.executemany(sql, lote)
+        else:
+            cursor.execute(sql, lote[0])
+        if progress_bar is not None:
+            progress_bar.update(len(lote))
+
+# coordenador_master gravado na tabela coordenadores; os demais valores ficam como 'None'
+MASTERS_COORDENADORES = {
+    "InsBE": "INSBE",
+    "IBREAD": "IBREAD",
+    "André Luiz Cecil Vaz de Carvalho": "INSBE",
+    "Marcel Hasslocher": "IBREAD",
+    "Jackson Santos dos Reis": "Jackson Santos dos Reis",
+}
+
+# Chave de comparação das dimensões: como o MySQL, ignora maiúsculas, acentos e espaços finais
+@lru_cache(maxsize=65536)
+def chave_dimensao(texto):
+    if texto is None:
+        return None
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold().rstrip(" ")
+
+# Dimensões cursos e coordenadores em memória, carregadas uma vez por execução
+class CacheDimensoes:
+    """
+    Mantém os mapas chave -> [id, atributo] das tabelas cursos e coordenadores. Cada tarefa
+    é gravada com o curso_id e o coordenador_id do cache; cursos e coordenadores novos
+    (ou com atributo alterado) são gravados em lote na mesma transação da página.
+    """
+    def __init__(self):
+        self.cursos = None
+        self.coordenadores = None
+
+    def carregar(self, cursor):
+        if self.cursos is not None:
+            return
+        cursor.execute(SQL_CARREGAR_COORDENADORES)
+        self.coordenadores = {
+            chave_dimensao(nome): [id_coordenador, master]
+            for id_coordenador, nome, master in cursor.fetchall()
+        }
+        cursor.execute(SQL_CARREGAR_CURSOS)
+        self.cursos = {
+            (chave_dimensao(nome), chave_dimensao(entidade)): [id_curso, coordenador_id]
+            for id_curso, nome, entidade, coordenador_id in cursor.fetchall()
+        }
+
+    # Após um rollback os IDs inseridos na transação deixam de existir; a próxima página recarrega
+    def descartar(self):
+        self.cursos = None
+        self.coordenadores = None
+
+    @staticmethod
+    def _buscar(cursor, sql, valores, largura, tamanho_lote):
+        marcador = "%s" if largura == 1 else "(" + ", ".join(["%s"] * largura) + ")"
+        encontrados = []
+        for inicio in range(0, len(valores), tamanho_lote):
+            lote = valores[inicio:inicio + tamanho_lote]
+            parametros = lote if largura == 1 else [v for linha in lote for v in linha]
+            cursor.execute(sql.format(marcadores=", ".join([marcador] * len(lote))), parametros)
+            encontrados.extend(cursor.fetchall())
+        return encontrados
+
+    def _gravar_coordenadores(self, cursor, dados, tamanho_lote, formato):
+        coluna_nome = formato.posicoes["coordenador_chave"]
+        coluna_master = formato.posicoes["coordenador_master"]
+        pendentes = {}
+        for issue in dados:
+            nome = issue[coluna_nome]
+            if not nome:
+                continue
+            master = MASTERS_COORDENADORES.get(issue[coluna_master], "None")
+            atual = self.coordenadores.get(chave_dimensao(nome))
+            if atual is None or atual[1] != master:
+                pendentes[chave_dimensao(nome)] = (nome, master)
+        if not pendentes:
+            return
+
+        executar_em_lotes(cursor, SQL_UPSERT_COORDENADORES, list(pendentes.values()), tamanho_lote)
+        novos = [nome for chave, (nome, _) in pendentes.items() if chave not in self.coordenadores]
+        for chave, (_, master) in pendentes.items():
+            if chave in self.coordenadores:
+                self.coordenadores[chave][1] = master
+        for id_coordenador, nome in self._buscar(cursor, SQL_COORDENADORES_POR_NOME, novos, 1, tamanho_lote):
+            chave = chave_dimensao(nome)
+            self.coordenadores[chave] = [id_coordenador, pendentes[chave][1] if chave in pendentes else None]
+
+    def _gravar_cursos(self, cursor, dados, tamanho_lote, formato):
+        coluna_curso, coluna_entidade = formato.posicoes["curso"], formato.posicoes["entidade"]
+        pendentes = {}
+        for issue in dados:
+            nome, entidade = issue[coluna_curso], issue[coluna_entidade]
+            if not nome or not entidade:
+                continue
+            chave = (chave_dimensao(nome), chave_dimensao(entidade))
+            atual = self.cursos.get(chave)
+            coordenador_id = self._id_coordenador(issue, formato)
+            if chave in pendentes:
+                # Vale o último coordenador conhecido entre as tarefas do curso
+                coordenador_id = coordenador_id or pendentes[chave][3]
+            elif atual is not None and (coordenador_id is None or coordenador_id == atual[1]):
+                continue
+            versao = "SV" if entidade == "Pós-Graduação" else "CV"
+            pendentes[chave] = (nome, entidade, versao, coordenador_id)
+        if not pendentes:
+            return
+
+        executar_em_lotes(cursor, SQL_UPSERT_CURSOS, list(pendentes.values()), tamanho_lote)
+        novos = [(nome, entidade) for chave, (nome, entidade, _, _) in pendentes.items() if chave not in self.cursos]
+        for chave, (_, _, _, coordenador_id) in pendentes.items():
+            if chave in self.cursos and coordenador_id is not None:
+                self.cursos[chave][1] = coordenador_id
+        for id_curso, nome, entidade in self._buscar(cursor, SQL_CURSOS_POR_NOME, novos, 2, tamanho_lote):
+            chave = (chave_dimensao(nome), chave_dimensao(entidade))
+            self.cursos[chave] = [id_curso, pendentes[chave][3] if chave in pendentes else None]
+
+    def _id_coordenador(self, issue, formato):
+        coordenador = self.coordenadores.get(chave_dimensao(issue[formato.posicoes["coordenador_chave"]]))
+        return coordenador[0] if coordenador else None
+
+    def _id_curso(self, issue, formato):
+        curso = self.cursos.get((
+            chave_dimensao(issue[formato.posicoes["curso"]]), chave_dimensao(issue[formato.posicoes["entidade"]])
+        ))
+        return curso[0] if curso else None
+
+    # Parâmetros da gravação: cada linha seguida dos IDs, na ordem de COLUNAS_IDS; as linhas não mudam
+    def _parametros(self, dados, formato):
+        return [issue + (self._id_curso(issue, formato), self._id_coordenador(issue, formato)) for issue in dados]
+
+    def resolver_dados(self, cursor, dados, tamanho_lote=DB_BATCH_SIZE):
+        """Grava os coordenadores e cursos novos das tarefas e devolve os parâmetros da gravação, com os IDs."""
+        self.carregar(cursor)
+        self._gravar_coordenadores(cursor, dados, tamanho_lote, REGISTRO_DADOS)
+        self._gravar_cursos(cursor, dados, tamanho_lote, REGISTRO_DADOS)
+        return self._parametros(dados, REGISTRO_DADOS)
+
+    def resolver_disciplinas(self, cursor, dados, tamanho_lote=DB_BATCH_SIZE):
+        """Devolve os parâmetros da gravação das disciplinas, com os IDs; só consulta, como os joins de antes."""
+        self.carregar(cursor)
+        return self._parametros(dados, REGISTRO_DISCIPLINAS)
+
+dimensoes = CacheDimensoes()
+
+# Cursos cujas tarefas mudaram nesta execução, inclusive o curso anterior de tarefas que trocaram de curso
+cursos_alterados = set()
+
+# Função para preparar uma página de tarefas para a gravação
+def preparar_dados(cursor, dados, tamanho_lote=DB_BATCH_SIZE):
+    """
+    Anota o curso que as tarefas tinham antes desta gravação, resolve curso_id e
+    coordenador_id pelo cache de dimensões e anota os cursos novos das tarefas. Devolve
+    os parâmetros da gravação, com os IDs ao fim de cada linha.
+    """
+    chaves = [issue[0] for issue in dados]
+    for inicio in range(0, len(chaves), tamanho_lote):
+        lote = chaves[inicio:inicio + tamanho_lote]
+        cursor.execute(SQL_CURSO_ID_POR_CHAVE.format(marcadores=", ".join(["%s"] * len(lote))), lote)
+        cursos_alterados.update(curso_id for (curso_id,) in cursor.fetchall())
+    parametros = dimensoes.resolver_dados(cursor, dados, tamanho_lote)
+    posicao_curso_id = len(REGISTRO_DADOS.colunas) + COLUNAS_IDS.index("curso_id")
+    cursos_alterados.update(linha[posicao_curso_id] for linha in parametros if linha[posicao_curso_id] is not None)
+    return parametros
+
+# Função para separar as linhas novas ou alteradas das que já estão gravadas com o mesmo conteúdo
+def filtrar_alterados(cursor, sql_hashes, dados, tamanho_lote=DB_BATCH_SIZE):
+    """
+    Busca em lote o hash_conteudo gravado para as chaves das linhas e devolve as linhas
+    a gravar e a contagem (inseridos, atualizados, ignorados). Linhas gravadas antes da
+    coluna existir têm hash NULL e são regravadas uma vez.
+    """
+    hashes = {}
+    chaves = [issue[0] for issue in dados]
+    for inicio in range(0, len(chaves), tamanho_lote):
+        lote = chaves[inicio:inicio + tamanho_lote]
+        cursor.execute(sql_hashes.format(marcadores=", ".join(["%s"] * len(lote))), lote)
+        hashes.update(cursor.fetchall())
+
+    # A chave é a primeira coluna dos registros e hash_conteudo a última
+    gravar = [issue for issue in dados if issue[0] not in hashes or hashes[issue[0]] != issue[-1]]
+    inseridos = sum(issue[0] not in hashes for issue in gravar)
+    return gravar, (inseridos, len(gravar) - inseridos, len(dados) - len(gravar))
+
+# Função para exibir as contagens de uma gravação
+def resumo_contagem(contagem):
+    inseridos, atualizados, ignorados = contagem
+    return f"{inseridos} novos, {atualizados} alterados, {ignorados} sem alteração"
+
+def registrar_contagem(consulta, contagem):
+    for resultado, quantidade in zip(("inseridas", "atualizadas", "ignoradas"), contagem):
+        metricas.somar("linhas_total", quantidade, consulta=consulta, resultado=resultado)
+
+# Chaves gravadas nesta execução, por consulta, relidas pelo snapshot analítico ao fim da execução
+chaves_gravadas = {"dados": set(), "disciplinas": set()}
+
+# Função para anotar as chaves de uma gravação confirmada
+def anotar_gravadas(consulta, dados):
+    if SYNC_SNAPSHOT_DIR:
+        chaves_gravadas[consulta].update(issue[0] for issue in dados)
 
 # Função para salvar dados no banco com transação
-def salvar_dados_mysql(dados):
+def salvar_dados_mysql(dados, tamanho_lote=DB_BATCH_SIZE, pular_inalterados=True):
     cursor = sql_client.cursor()
     
     try:
@@ -104,80 +550,34 @@ def salvar_dados_mysql(dados):
         start_commit_time = time.time()
         print("***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***")
 
+        contagem = (0, len(dados), 0)
+        if pular_inalterados:
+            with metricas.medir("gravacao", consulta="dados"):
+                dados, contagem = filtrar_alterados(cursor, SQL_HASHES_DADOS, dados, tamanho_lote)
         progress_bar = tqdm(total=len(dados), desc="Salvando chamados", unit="chamado")
-        
-        for issue in dados:
-            # Inserir na tabela principal
-            cursor.execute(
-            """
-            INSERT INTO db_dpc_jira (
-                chave, link_jira, rotulos, data_para_ficar_pronto, data_criacao, data_atualizacao, 
-                data_de_lancamento, date_launch_jira, ano, mes, status_launch, 
-                resumo, versoes_corrigidas, tipo_de_item, situacao, cpf_conteudista,
-                conteudista, coordenador, coordenador_master, entidade_curso, entidade,
-                migracao, curso, status_contrato, status_conteudos, 
-                status_videos, descricao
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                 %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                rotulos = VALUES(rotulos),
-                link_jira = VALUES(link_jira),
-                data_para_ficar_pronto = VALUES(data_para_ficar_pronto),
-                data_criacao = VALUES(data_criacao),
-                data_atualizacao = VALUES(data_atualizacao),
-                data_de_lancamento = VALUES(data_de_lancamento),
-                date_launch_jira = VALUES(date_launch_jira),
-                ano = VALUES(ano),
-                mes = VALUES(mes),
-                status_launch = VALUES(status_launch),
-                resumo = VALUES(resumo),
-                versoes_corrigidas = VALUES(versoes_corrigidas),
-                tipo_de_item = VALUES(tipo_de_item),
-                situacao = VALUES(situacao),
-                cpf_conteudista = VALUES(cpf_conteudista),
-                conteudista = VALUES(conteudista),
-                coordenador = VALUES(coordenador),
-                coordenador_master = VALUES(coordenador_master),
-                entidade_curso = VALUES(entidade_curso),
-                entidade = VALUES(entidade),
-                migracao = VALUES(migracao),
-                curso = VALUES(curso),
-                status_contrato = VALUES(status_contrato),
-                status_conteudos = VALUES(status_conteudos),
-                status_videos = VALUES(status_videos),
-                descricao = VALUES(descricao)
-            """,
-            (
-                issue['chave'], issue['link_jira'], issue['rotulos'], 
-                issue['data_para_ficar_pronto'], issue['data_criacao'], issue['data_atualizacao'], 
-                issue['data_de_lancamento'], issue['date_launch_jira'], 
-                issue['ano'], issue['mes'], issue['status_launch'], 
-                issue['resumo'], issue['versoes_corrigidas'], 
-                issue['tipo_de_item'], issue['situacao'], 
-                issue['cpf_conteudista'], issue['conteudista'], 
-                issue['coordenador'], issue['coordenador_master'], 
-                issue['entidade_curso'], issue['entidade'],
-                issue['migracao'], issue['curso'], 
-                issue['status_contrato'], issue['status_conteudos'], 
-                issue['status_videos'], issue['descricao']
-            )
-            )
-            progress_bar.update(1)
-        
-        sql_client.commit()
+        with metricas.medir("dimensoes", consulta="dados"):
+            parametros = preparar_dados(cursor, dados, tamanho_lote)
+        with metricas.medir("gravacao", consulta="dados"):
+            executar_em_lotes(cursor, SQL_UPSERT_DADOS, parametros, tamanho_lote, progress_bar)
+            sql_client.commit()
+        registrar_contagem("dados", contagem)
+        anotar_gravadas("dados", dados)
         progress_bar.close()
         end_commit_time = time.time()
         print("***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***\n")
+        if pular_inalterados:
+            print(f"Chamados: {resumo_contagem(contagem)}")
         print(f"Chamados salvos com sucesso!\nTempo gasto para salvar os chamados: {end_commit_time - start_commit_time:.2f} segundos\n***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***")
         
     except Exception as e:
         sql_client.rollback()
+        dimensoes.descartar()
         print(f"Erro ao salvar dados: {str(e)}")
         raise e
     finally:
         cursor.close()
 
-def salvar_disciplinas_mysql(dados):
+def salvar_disciplinas_mysql(dados, tamanho_lote=DB_BATCH_SIZE, pular_inalterados=True):
     cursor = sql_client.cursor()
     
     try:
@@ -185,145 +585,161 @@ def salvar_disciplinas_mysql(dados):
         start_commit_time = time.time()
         print("***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***")
 
+        contagem = (0, len(dados), 0)
+        if pular_inalterados:
+            with metricas.medir("gravacao", consulta="disciplinas"):
+                dados, contagem = filtrar_alterados(cursor, SQL_HASHES_DISCIPLINAS, dados, tamanho_lote)
         progress_bar = tqdm(total=len(dados), desc="Salvando chamados", unit="chamado")
-        
-        for issue in dados:
-            # Inserir na tabela principal
-            cursor.execute(
-                """
-                INSERT INTO db_dpc_jira_disciplinas (
-                    chave, link_jira, rotulos, data_para_ficar_pronto, data_criacao, data_atualizacao, 
-                    data_de_resolucao, disciplina, coordenador, coordenador_master, entidade_curso, entidade,
-                    migracao, curso, situacao, tipo
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    rotulos = VALUES(rotulos),
-                    link_jira = VALUES(link_jira),
-                    data_para_ficar_pronto = VALUES(data_para_ficar_pronto),
-                    data_criacao = VALUES(data_criacao),
-                    data_atualizacao = VALUES(data_atualizacao),
-                    data_de_resolucao = VALUES(data_de_resolucao),
-                    disciplina = VALUES(disciplina),
-                    coordenador = VALUES(coordenador),
-                    coordenador_master = VALUES(coordenador_master),
-                    entidade_curso = VALUES(entidade_curso),
-                    entidade = VALUES(entidade),
-                    migracao = VALUES(migracao),
-                    curso = VALUES(curso),
-                    situacao = VALUES(situacao),
-                    tipo = VALUES(tipo)
-                """,
-                (
-                    issue['chave'], issue['link_jira'], issue['rotulos'], 
-                    issue['data_para_ficar_pronto'], issue['data_criacao'], issue['data_atualizacao'], 
-                    issue['data_de_resolucao'], issue['disciplina'], 
-                    issue['coordenador'], issue['coordenador_master'], 
-                    issue['entidade_curso'], issue['entidade'],
-                    issue['migracao'], issue['curso'], 
-                    issue['situacao'], issue['tipo']
-                )
-            )
-            progress_bar.update(1)
-        
-        sql_client.commit()
+        with metricas.medir("dimensoes", consulta="disciplinas"):
+            parametros = dimensoes.resolver_disciplinas(cursor, dados, tamanho_lote)
+        with metricas.medir("gravacao", consulta="disciplinas"):
+            executar_em_lotes(cursor, SQL_UPSERT_DISCIPLINAS, parametros, tamanho_lote, progress_bar)
+            sql_client.commit()
+        registrar_contagem("disciplinas", contagem)
+        anotar_gravadas("disciplinas", dados)
         progress_bar.close()
         end_commit_time = time.time()
         print("***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***\n")
+        if pular_inalterados:
+            print(f"Disciplinas: {resumo_contagem(contagem)}")
         print(f"Chamados salvos com sucesso!\nTempo gasto para salvar os chamados: {end_commit_time - start_commit_time:.2f} segundos\n***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***")
         
     except Exception as e:
         sql_client.rollback()
+        dimensoes.descartar()
         print(f"Erro ao salvar dados: {str(e)}")
         raise e
     finally:
         cursor.close()
 
-def salvar_escola_tecnica(dados):
-    # usar pandas para criar um dataframe dos dados e salvar em excel
-    df = pd.DataFrame(dados)
-    df.to_excel("escola_tecnica.xlsx", index=False)
-
-# Função para realizar uma requisição com retentativas
-def realizar_requisicao(url, headers, params, max_retentativas=3):
-    for tentativa in range(max_retentativas):
-        response = requests.get(url, params=params, headers=headers)
-        if response.status_code == 200:
-            return response
-        print(f"Tentativa {tentativa + 1} falhou. Retentando em 2 segundos...")
-        time.sleep(2)
-    raise Exception(f"Falha ao conectar à API após {max_retentativas} tentativas. \n response: {response.text}")
+# Função para gravar um lote de linhas em uma transação própria
+def gravar_lote_mysql(sql, dados, tamanho_lote=DB_BATCH_SIZE, resolver=None, sql_hashes=None, consulta="dados"):
+    """
+    Grava as linhas e devolve a contagem (inseridos, atualizados, ignorados). Com sql_hashes,
+    as linhas com o mesmo hash_conteudo já gravado são ignoradas; sem ele todas contam como gravadas.
+    resolver devolve os parâmetros da gravação (as linhas com os IDs); sem ele as linhas vão como estão.
+    """
+    cursor = sql_client.cursor()
+    try:
+        contagem = (0, len(dados), 0)
+        if sql_hashes:
+            with metricas.medir("gravacao", consulta=consulta):
+                dados, contagem = filtrar_alterados(cursor, sql_hashes, dados, tamanho_lote)
+        parametros = dados
+        if resolver and dados:
+            with metricas.medir("dimensoes", consulta=consulta):
+                parametros = resolver(cursor, dados, tamanho_lote)
+        with metricas.medir("gravacao", consulta=consulta):
+            executar_em_lotes(cursor, sql, parametros, tamanho_lote)
+            sql_client.commit()
+        registrar_contagem(consulta, contagem)
+        anotar_gravadas(consulta, dados)
+        return contagem
+    except Exception as e:
+        sql_client.rollback()
+        dimensoes.descartar()
+        print(f"Erro ao salvar dados: {str(e)}")
+        raise e
+    finally:
+        cursor.close()
+
+# Precedência dos status das subtarefas, do mais forte para o mais fraco: cada categoria
+# fica com o status consolidado de maior precedência entre as suas subtarefas
+PRECEDENCIA_STATUS_SUBTAREFAS = (
+    ("Aberto", ("Aberto",)),
+    ("Fechado", ("Resolvido", "Fechado/Aprovado")),
+    ("Em Resolução", ("Em Resolução",)),
+    ("Pendente", ("Reopen", "Pendente")),
+)
+
+# Categorias de subtarefa: nome, trecho do resumo que identifica a categoria e tabela de
+# precedência. Vale a primeira categoria cujo trecho aparece no resumo
+CATEGORIAS_SUBTAREFAS = (
+    ("status_contrato", "CONTRATO - ELABORAR", PRECEDENCIA_STATUS_SUBTAREFAS),
+    ("status_conteudos", "CONTEÚDO - ENTREGAR", PRECEDENCIA_STATUS_SUBTAREFAS),
+    ("status_videos", "VÍDEO - GRAVAR", PRECEDENCIA_STATUS_SUBTAREFAS),
+)
+
+MARCADOR_VIDEO = "VÍDEO - GRAVAR"
+
+# Consolidação dos status das subtarefas guiada por tabelas
+class ConsolidadorStatus:
+    """
+    Compila a tabela de precedência de cada categoria uma única vez em um dicionário
+    status -> posto e consolida as subtarefas de uma tarefa em
+    uma única passada. Novas categorias entram em CATEGORIAS_SUBTAREFAS sem novas varreduras.
+    """
+    def __init__(self, categorias=CATEGORIAS_SUBTAREFAS, marcador_video=MARCADOR_VIDEO, tipo_reuso="SR-Reuso"):
+        compiladas = [self._compilar(precedencia) for _, _, precedencia in categorias]
+        self.nomes = tuple(nome for nome, _, _ in categorias)
+        self.marcadores = tuple(enumerate(marcador for _, marcador, _ in categorias))
+        self.postos = tuple(postos for postos, _ in compiladas)
+        self.consolidados = tuple(consolidados for _, consolidados in compiladas)
+        self.marcador_video = marcador_video
+        self.tipo_reuso = tipo_reuso
+        self.sem_subtarefas = (None,) * len(categorias) + (False,)
+
+    @staticmethod
+    def _compilar(precedencia):
+        """
+        Transforma a tabela em status -> posto (maior é mais forte) e posto -> status
+        consolidado; o posto 0 é o de nenhum status conhecido.
+        """
+        total = len(precedencia)
+        postos = {
+            status: total - posicao
+            for posicao, (_, situacoes) in enumerate(precedencia)
+            for status in situacoes
+        }
+        consolidados = (None,) + tuple(consolidado for consolidado, _ in reversed(precedencia))
+        return postos, consolidados
+
+    def consolidar(self, tipo_de_item, subtasks):
+        """
+        Retorna o status consolidado de cada categoria, na ordem de CATEGORIAS_SUBTAREFAS,
+        seguido de tem_video. Tarefas de reuso com subtarefas ficam REUSO em todas as categorias.
+        """
+        if not subtasks:
+            return self.sem_subtarefas
+        marcador_video = self.marcador_video
+        if tipo_de_item == self.tipo_reuso:
+            tem_video = marcador_video in subtasks[0]["fields"]["summary"].upper()
+            return ("REUSO",) * len(self.nomes) + (tem_video,)
+
+        marcadores, tabelas = self.marcadores, self.postos
+        melhores = [0] * len(self.nomes)
+        tem_video = False
+        for subtask in subtasks:
+            fields = subtask["fields"]
+            summary = fields["summary"].upper()
+            if marcador_video in summary:
+                tem_video = True
+            for indice, marcador in marcadores:
+                if marcador in summary:
+                    posto = tabelas[indice].get(fields["status"]["name"], 0)
+                    if posto > melhores[indice]:
+                        melhores[indice] = posto
+                    break
+        return tuple(consolidados[posto] for consolidados, posto in zip(self.consolidados, melhores)) + (tem_video,)
+
+    def consolidar_lote(self, tarefas):
+        """Consolida um lote de pares (tipo_de_item, subtasks) de uma vez."""
+        consolidar = self.consolidar
+        return [consolidar(tipo_de_item, subtasks or []) for tipo_de_item, subtasks in tarefas]
+
+consolidador_status = ConsolidadorStatus()
 
 # Função para pegar os status das subtasks (Video e Conteúdo)
 def processar_status_subtarefas(tipo_de_item, subtasks):
     """
     Processa as subtarefas para extrair os status específicos e identifica o tipo de curso.
+    Retorna status_contrato, status_conteudos, status_videos e tem_video.
     """
-    status_contrato = []
-    status_conteudos = []
-    status_videos = []
-    tem_video = False
-    
-    # Inicializa as variáveis de status final
-    final_status_contrato = None
-    final_status_conteudos = None
-    final_status_videos = None
-    
-    for subtask in subtasks:
-        fields = subtask['fields']
-        summary = fields['summary'].upper()
-        status = fields['status']['name']
-        
-        # Verifica se há menção a vídeo nas subtarefas
-        if "VÍDEO - GRAVAR" in summary:
-            tem_video = True
-
-        if tipo_de_item == "SR-Reuso":
-            final_status_conteudos = "REUSO"
-            final_status_videos = "REUSO"
-            final_status_contrato = "REUSO"
-            break  # Se é reuso, não precisa continuar o loop
-        else:
-            if "CONTRATO - ELABORAR" in summary:
-                status_contrato.append(status)
-            elif "CONTEÚDO - ENTREGAR" in summary:
-                status_conteudos.append(status)
-            elif "VÍDEO - GRAVAR" in summary:
-                status_videos.append(status)
-                tem_video = True
+    return consolidador_status.consolidar(tipo_de_item, subtasks)
 
-    # Só processa os status se não for REUSO
-    if tipo_de_item != "SR-Reuso":
-        # Processamento do status do contrato
-        if "Aberto" in status_contrato:
-            final_status_contrato = "Aberto"
-        elif any(s in ["Resolvido", "Fechado/Aprovado"] for s in status_contrato):
-            final_status_contrato = "Fechado"
-        elif "Em Resolução" in status_contrato:
-            final_status_contrato = "Em Resolução"
-        elif any(s in ["Reopen", "Pendente"] for s in status_contrato):
-            final_status_contrato = "Pendente"
-
-        # Processamento do status dos conteúdos
-        if "Aberto" in status_conteudos:
-            final_status_conteudos = "Aberto"
-        elif any(s in ["Resolvido", "Fechado/Aprovado"] for s in status_conteudos):
-            final_status_conteudos = "Fechado"
-        elif "Em Resolução" in status_conteudos:
-            final_status_conteudos = "Em Resolução"
-        elif any(s in ["Reopen", "Pendente"] for s in status_conteudos):
-            final_status_conteudos = "Pendente"
-
-        # Processamento do status dos vídeos
-        if "Aberto" in status_videos:
-            final_status_videos = "Aberto"
-        elif any(s in ["Resolvido", "Fechado/Aprovado"] for s in status_videos):
-            final_status_videos = "Fechado"
-        elif "Em Resolução" in status_videos:
-            final_status_videos = "Em Resolução"
-        elif any(s in ["Reopen", "Pendente"] for s in status_videos):
-            final_status_videos = "Pendente"
-    
-    return final_status_contrato, final_status_conteudos, final_status_videos, tem_video
+# Função para pegar os status das subtasks de várias tarefas de uma vez
+def processar_status_lote(tarefas):
+    return consolidador_status.consolidar_lote(tarefas)
 
 # Função para extrair a entidade do curso
 def extrair_entidade(entidade_curso):
@@ -352,46 +768,46 @@ def extrair_entidade(entidade_curso):
     
     return None
 
-# Função para obter dados da API Jira
-def obter_dados_jira():
-    # Lista de prefixos válidos para Entidade e Curso
-    entidades_validas = [
-        "Fac. Unyleya | CETEC",
-        "Fac. Unyleya | CETEC",
-        "Fac. Unyleya | CEAB",
-        "Fac. Unyleya | CECA",
-        "Fac. Unyleya | CECaV",
-        "Fac. Unyleya | CECOMEX",
-        "Fac. Unyleya | CECONF",
-        "Fac. Unyleya | CEDAC",
-        "Fac. Unyleya | CEDUC",
-        "Fac. Unyleya | CEENG",
-        "Fac. Unyleya | CEGEP",
-        "Fac. Unyleya | CEJUR",
-        "Fac. Unyleya | CEPÓS",
-        "Fac. Unyleya | CES",
-        "Fac. Unyleya | NEPIC",
-        "Fac. Unyleya | Pós | 3R Capacita",
-        "Fac. Unyleya | Pós | Bioforense",
-        "Fac. Unyleya | Pós-Graduação",
-        "Fac. Unyleya | YMED",
-        "Fac. Unyleya | YODONTO",
-        "Fac. Unyleya | YVET"
-    ]
-    
-    start_at = 0
-    max_results = 1000
-    all_issues = []
+# Lista de prefixos válidos para Entidade e Curso
+ENTIDADES_VALIDAS = (
+    "Fac. Unyleya | CETEC",
+    "Fac. Unyleya | CEAB",
+    "Fac. Unyleya | CECA",
+    "Fac. Unyleya | CECaV",
+    "Fac. Unyleya | CECOMEX",
+    "Fac. Unyleya | CECONF",
+    "Fac. Unyleya | CEDAC",
+    "Fac. Unyleya | CEDUC",
+    "Fac. Unyleya | CEENG",
+    "Fac. Unyleya | CEGEP",
+    "Fac. Unyleya | CEJUR",
+    "Fac. Unyleya | CEPÓS",
+    "Fac. Unyleya | CES",
+    "Fac. Unyleya | NEPIC",
+    "Fac. Unyleya | Pós | 3R Capacita",
+    "Fac. Unyleya | Pós | Bioforense",
+    "Fac. Unyleya | Pós-Graduação",
+    "Fac. Unyleya | YMED",
+    "Fac. Unyleya | YODONTO",
+    "Fac. Unyleya | YVET",
+)
+
+# Filtro de atualização das consultas incrementais; a carga completa não usa marca d'água
+def filtro_atualizacao(marca_dagua, completa):
+    return "" if completa else f" AND updated >= {marca_dagua}"
 
+# Função para montar a consulta de tarefas (SR) na API Jira
+def consulta_dados_jira(filtro="", completa=False, ordem="duedate DESC"):
+    carregar_marcas_dagua()
     jql_query = (
         'project = PROCONTEUD AND "Entidade e Curso" != "Fac. Unyleya | Graduação"'
         ' AND issuetype in (SR-Completa, SR-Reuso, SR-Modificada)'
         ' AND status in (Reopen, Closed, Done, "In Progress", "To Do", Pending)'
-        f' AND updated >= {last_updated} ORDER BY duedate DESC'
+        f'{filtro_atualizacao(last_updated, completa)}{filtro} ORDER BY {ordem}'
     )
 
     jql_encoded = quote(jql_query, safe=":=,()")
-    base_url = f"https://jira.unyleya.com.br/rest/api/2/search?jql={jql_encoded}"
+    base_url = f"{JIRA_BASE_URL}/rest/api/2/search?jql={jql_encoded}"
     print(base_url)
     params = {
         "fields": ",".join([
@@ -413,183 +829,185 @@ def obter_dados_jira():
             "customfield_10802", # Conteudista
             "subtasks" # Subtarefas
         ]),
-        "startAt": start_at,
-        "maxResults": max_results
+        "startAt": 0,
+        "maxResults": 1000
     }
-    response = realizar_requisicao(base_url, headers, params)
+    return base_url, params
 
-    data = response.json()
-    total_issues = data["total"]  # Total issues from Jira API
-    progress_bar = tqdm(total=total_issues, desc="Processando tarefas", unit="tarefa")
-
-    while True:
-        params["startAt"] = start_at
-        response = realizar_requisicao(base_url, headers, params)
-        data = response.json()
-        issues = data.get("issues", [])
-        if not issues:
-            break
-
-        for issue in issues:
-            fields = issue["fields"]
-
-            # Campo Entidade e Curso
-            entidade_curso_data = fields.get("customfield_10808")
-            if entidade_curso_data:
-                main_value = entidade_curso_data.get("value", "").strip()
-                child_value = entidade_curso_data.get("child", {}).get("value", "").strip()
-                entidade_curso = f"{main_value} - {child_value}" if child_value else main_value
-                entidade = extrair_entidade(entidade_curso)
-            else:   
-                entidade_curso = None
-                entidade = None
-            
-            # Verifica se a entidade_curso começa com algum dos prefixos válidos
-            if not entidade_curso or not any(entidade_curso.startswith(prefix) for prefix in entidades_validas):
-                continue
-            
-            if "Fac. Unyleya | Graduação" in main_value:
-                continue
-            
-            chave = issue["key"]
-            rotulos = fields.get("labels", [])
-            descricao = fields.get("description")
-            coordenador = fields.get("customfield_10803")
-            coordenador_master = fields.get("customfield_10804")
-            versoes_corrigidas = ", ".join(v["name"] for v in fields.get("fixVersions", []))
-            padrao = r'\d{6}-[A-Z]+'
-            date_launch = re.search(padrao, versoes_corrigidas)
-            date_launch_result = date_launch.group(0) if date_launch else "Sem Previsão"
-            if date_launch_result:
-                date_launch_result = date_launch_result.split("-")[0]
-                ano = date_launch_result[-4:].strip() if date_launch_result != "Sem Previsão" else None
-                mes = date_launch_result[:2].strip() if date_launch_result != "Sem Previsão" else None
-
-            status_launch = (
-                "Sem Previsão" if date_launch_result == "Sem Previsão"
-                else "Lançado" if (int(ano) < ano_atual) or (int(ano) == ano_atual and int(mes) <= mes_atual)
-                else "Em breve"
-            )
+# Função para transformar uma página de tarefas nas linhas de db_dpc_jira
+def transformar_pagina_dados(issues):
+    all_issues = []
 
-            link_jira = f"https://jira.unyleya.com.br/browse/{chave}"
-
-            if child_value:
-                curso = child_value
-            elif descricao:
-                if "}" in descricao and "{" in descricao:
-                    try:
-                        curso = descricao.split("}", 1)[1].split("{", 1)[0].strip()
-                    except IndexError:
-                        continue
-                else:
-                    continue
-            if curso:
-                if curso.startswith("CURSO: "):
-                    curso = curso.split("CURSO: ",1)[1].strip()
-                elif curso.startswith("Bom dia") or curso.startswith('*') or curso.startswith("OBS:"):
+    for issue in issues:
+        fields = issue["fields"]
+
+        # Campo Entidade e Curso
+        entidade_curso_data = fields.get("customfield_10808")
+        if entidade_curso_data:
+            main_value = entidade_curso_data.get("value", "").strip()
+            child_value = entidade_curso_data.get("child", {}).get("value", "").strip()
+            entidade_curso = f"{main_value} - {child_value}" if child_value else main_value
+            entidade = extrair_entidade(entidade_curso)
+        else:   
+            entidade_curso = None
+            entidade = None
+        
+        # Verifica se a entidade_curso começa com algum dos prefixos válidos
+        if not entidade_curso or not entidade_curso.startswith(ENTIDADES_VALIDAS):
+            continue
+        
+        if "Fac. Unyleya | Graduação" in main_value:
+            continue
+        
+        chave = issue["key"]
+        rotulos = fields.get("labels", [])
+        descricao = fields.get("description")
+        coordenador = fields.get("customfield_10803")
+        coordenador_master = fields.get("customfield_10804")
+        versoes_corrigidas = ", ".join(v["name"] for v in fields.get("fixVersions", []))
+        padrao = r'\d{6}-[A-Z]+'
+        date_launch = re.search(padrao, versoes_corrigidas)
+        date_launch_result = date_launch.group(0) if date_launch else "Sem Previsão"
+        if date_launch_result:
+            date_launch_result = date_launch_result.split("-")[0]
+            ano = date_launch_result[-4:].strip() if date_launch_result != "Sem Previsão" else None
+            mes = date_launch_result[:2].strip() if date_launch_result != "Sem Previsão" else None
+
+        status_launch = (
+            "Sem Previsão" if date_launch_result == "Sem Previsão"
+            else "Lançado" if (int(ano) < ano_atual) or (int(ano) == ano_atual and int(mes) <= mes_atual)
+            else "Em breve"
+        )
+
+        link_jira = f"https://jira.unyleya.com.br/browse/{chave}"
+
+        # Sem curso no campo nem na descrição a tarefa é ignorada
+        curso = None
+        if child_value:
+            curso = child_value
+        elif descricao:
+            if "}" in descricao and "{" in descricao:
+                try:
+                    curso = descricao.split("}", 1)[1].split("{", 1)[0].strip()
+                except IndexError:
                     continue
             else:
                 continue
+        if curso:
+            if curso.startswith("CURSO: "):
+                curso = curso.split("CURSO: ",1)[1].strip()
+            elif curso.startswith("Bom dia") or curso.startswith('*') or curso.startswith("OBS:"):
+                continue
+        else:
+            continue
 
-            # Data de Criação
-            created_datetime = fields.get("created", "")
-            created_date = created_datetime.split("T")[0] if created_datetime else None
-            updated_datetime = fields.get("updated", "")
-            updated_date = updated_datetime.split("T")[0] if updated_datetime else None
+        # Data de Criação
+        created_datetime = fields.get("created", "")
+        created_date = created_datetime.split("T")[0] if created_datetime else None
+        updated_datetime = fields.get("updated", "")
+        updated_date = updated_datetime.split("T")[0] if updated_datetime else None
 
-            release_dates = [v["releaseDate"] for v in fields.get("fixVersions", []) if "releaseDate" in v]
-            if len(release_dates) > 1:
-                release_date = min(release_dates)
-            else:
-                release_date = release_dates[0] if release_dates else None
-
-            # Tipo de item
-            tipo_de_item = fields.get("issuetype", {}).get("name")
-
-            # Processa as subtarefas
-            subtasks = fields.get("subtasks", [])
-            status_contrato, status_conteudos, status_videos, tem_video = processar_status_subtarefas(tipo_de_item, subtasks)
-
-            migracao = "SV>CV" if any("SV>CV" in label for label in rotulos) else "CV" if tem_video else "SV"
-
-            # Adicionando os dados processados
-            all_issues.append({
-                "chave": chave,
-                "link_jira": link_jira,
-                "rotulos": ", ".join(rotulos) or None,
-                "data_para_ficar_pronto": fields.get("duedate") or None,
-                "data_criacao": created_date,
-                "data_atualizacao": updated_date,
-                "data_de_lancamento": release_date,
-                "date_launch_jira": date_launch_result,
-                "ano": ano,
-                "mes": mes,
-                "status_launch": status_launch,
-                "resumo": fields.get("summary"),
-                "versoes_corrigidas": versoes_corrigidas,
-                "tipo_de_item": tipo_de_item,
-                "situacao": fields.get("status", {}).get("name"),
-                "cpf_conteudista": fields.get("customfield_11303") or None,
-                "conteudista": fields.get("customfield_10802") or None,
-                "coordenador": coordenador,
-                "coordenador_master": coordenador_master,
-                "entidade_curso": entidade_curso,
-                "entidade": entidade,
-                "migracao": migracao,
-                "curso": curso,
-                "status_contrato": status_contrato,
-                "status_conteudos": status_conteudos,
-                "status_videos": status_videos,
-                "descricao": descricao,
-            })
+        release_dates = [v["releaseDate"] for v in fields.get("fixVersions", []) if "releaseDate" in v]
+        if len(release_dates) > 1:
+            release_date = min(release_dates)
+        else:
+            release_date = release_dates[0] if release_dates else None
+
+        # Tipo de item
+        tipo_de_item = fields.get("issuetype", {}).get("name")
+
+        # Processa as subtarefas
+        subtasks = fields.get("subtasks", [])
+        status_contrato, status_conteudos, status_videos, tem_video = processar_status_subtarefas(tipo_de_item, subtasks)
+
+        migracao = "SV>CV" if any("SV>CV" in label for label in rotulos) else "CV" if tem_video else "SV"
+
+        # Adicionando os dados processados
+        all_issues.append(REGISTRO_DADOS.montar(
+            chave=chave,
+            link_jira=link_jira,
+            rotulos=", ".join(rotulos) or None,
+            data_para_ficar_pronto=fields.get("duedate") or None,
+            data_criacao=created_date,
+            data_atualizacao=updated_date,
+            data_de_lancamento=release_date,
+            date_launch_jira=date_launch_result,
+            ano=ano,
+            mes=mes,
+            status_launch=status_launch,
+            resumo=fields.get("summary"),
+            versoes_corrigidas=versoes_corrigidas,
+            tipo_de_item=tipo_de_item,
+            situacao=fields.get("status", {}).get("name"),
+            cpf_conteudista=fields.get("customfield_11303") or None,
+            conteudista=fields.get("customfield_10802") or None,
+            coordenador=coordenador,
+            coordenador_chave=obter_primeiro_coordenador(coordenador),
+            coordenador_master=coordenador_master,
+            entidade_curso=entidade_curso,
+            entidade=entidade,
+            migracao=migracao,
+            curso=curso,
+            status_contrato=status_contrato,
+            status_conteudos=status_conteudos,
+            status_videos=status_videos,
+            descricao=descricao,
+        ))
 
-        progress_bar.update(len(issues))
+    return all_issues
+
+# Função para obter dados da API Jira
+def obter_dados_jira(paginacao=None):
+    all_issues = []
 
-        if start_at >= total_issues:
+    total_issues, paginas = paginacao or paginar_jira(*consulta_dados_jira())
+    progress_bar = tqdm(total=total_issues, desc="Processando tarefas", unit="tarefa")
+
+    for data in paginas:
+        issues = data.get("issues", [])
+        if not issues:
             break
 
-        start_at += max_results
+        with metricas.medir("transformacao", consulta="dados"):
+            all_issues.extend(transformar_pagina_dados(issues))
+        progress_bar.update(len(issues))
 
     return all_issues
 
-def obter_disciplinas_jira():
-    # Lista de prefixos válidos para Entidade e Curso
-    entidades_validas = [
-        "Fac. Unyleya | CETEC",
-        "Fac. Unyleya | CETEC",
-        "Fac. Unyleya | CEAB",
-        "Fac. Unyleya | CECA",
-        "Fac. Unyleya | CECaV",
-        "Fac. Unyleya | CECOMEX",
-        "Fac. Unyleya | CECONF",
-        "Fac. Unyleya | CEDAC",
-        "Fac. Unyleya | CEDUC",
-        "Fac. Unyleya | CEENG",
-        "Fac. Unyleya | CEGEP",
-        "Fac. Unyleya | CEJUR",
-        "Fac. Unyleya | CEPÓS",
-        "Fac. Unyleya | CES",
-        "Fac. Unyleya | NEPIC",
-        "Fac. Unyleya | Pós | 3R Capacita",
-        "Fac. Unyleya | Pós | Bioforense",
-        "Fac. Unyleya | Pós-Graduação",
-        "Fac. Unyleya | YMED",
-        "Fac. Unyleya | YODONTO",
-        "Fac. Unyleya | YVET"
-    ]
-    
-    start_at = 0
-    max_results = 1000
-    all_issues = []
+# Função para buscar o curso das tarefas pai em lote
+def resolver_cursos_pais(chaves, cursos_pais, tamanho_lote=DB_BATCH_SIZE, conexao=None):
+    """
+    Completa o mapa chave -> curso com as tarefas pai ainda não consultadas nesta execução,
+    usando um SELECT ... IN (...) por lote em vez de uma consulta por subtarefa.
+    """
+    faltantes = [chave for chave in dict.fromkeys(chaves) if chave and chave not in cursos_pais]
+    if not faltantes:
+        return cursos_pais
+
+    cursor = (conexao or sql_client).cursor()
+    try:
+        for inicio in range(0, len(faltantes), tamanho_lote):
+            lote = faltantes[inicio:inicio + tamanho_lote]
+            # Chaves sem tarefa pai no banco ficam como None para não serem consultadas de novo
+            cursos_pais.update(dict.fromkeys(lote))
+            marcadores = ", ".join(["%s"] * len(lote))
+            cursor.execute(SQL_CURSOS_PAIS.format(marcadores=marcadores), lote)
+            cursos_pais.update(cursor.fetchall())
+    finally:
+        cursor.close()
+    return cursos_pais
 
+# Função para montar a consulta de subtarefas (disciplinas) na API Jira
+def consulta_disciplinas_jira(filtro="", completa=False, ordem="duedate DESC"):
+    carregar_marcas_dagua()
     jql_query = (
         'project = PROCONTEUD AND "Entidade e Curso" != "Fac. Unyleya | Graduação"'
         ' AND issuetype = Sub-task AND component in ("CONTEÚDO - ENTREGAR", "VÍDEO - GRAVAR")'
-        f' AND updated >= {last_updated_disciplinas} ORDER BY duedate DESC'
+        f'{filtro_atualizacao(last_updated_disciplinas, completa)}{filtro} ORDER BY {ordem}'
     )
 
     jql_encoded = quote(jql_query, safe=":=,()")
-    base_url = f"https://jira.unyleya.com.br/rest/api/2/search?jql={jql_encoded}"
+    base_url = f"{JIRA_BASE_URL}/rest/api/2/search?jql={jql_encoded}"
     print(base_url)
     params = {
         "fields": ",".join([
@@ -610,135 +1028,139 @@ def obter_disciplinas_jira():
             "customfield_11303", # CPF do conteudista
             "customfield_10802" # Conteudista
         ]),
-        "startAt": start_at,
-        "maxResults": max_results
+        "startAt": 0,
+        "maxResults": 1000
     }
-    response = realizar_requisicao(base_url, headers, params)
+    return base_url, params
 
-    data = response.json()
-    total_issues = data["total"]  # Total issues from Jira API
-    progress_bar = tqdm(total=total_issues, desc="Processando tarefas", unit="tarefa")
+# Função para transformar uma página de subtarefas nas linhas de db_dpc_jira_disciplinas
+def transformar_pagina_disciplinas(issues, cursos_pais, conexao=None):
+    all_issues = []
 
-    while True:
-        params["startAt"] = start_at
-        response = realizar_requisicao(base_url, headers, params)
-        data = response.json()
-        issues = data.get("issues", [])
-        if not issues:
-            break
+    resolver_cursos_pais([issue["fields"].get("parent", {}).get("key") for issue in issues], cursos_pais, conexao=conexao)
 
-        for issue in issues:
-            fields = issue["fields"]
+    for issue in issues:
+        fields = issue["fields"]
 
-            parent_key = fields.get("parent", {}).get("key")
+        parent_key = fields.get("parent", {}).get("key")
 
-            # get "tipo_de_item" from parent issue using db_dpc_jira
-            cursor = sql_client.cursor()
-            cursor.execute(f"SELECT curso FROM db_dpc_jira WHERE chave = '{parent_key}'")
-            curso = cursor.fetchone()[0] if cursor.rowcount > 0 else None
-            cursor.close()
-            
-            # Campo Entidade e Curso
-            entidade_curso_data = fields.get("customfield_10808")
-            if entidade_curso_data:
-                main_value = entidade_curso_data.get("value", "").strip()
-                child_value = entidade_curso_data.get("child", {}).get("value", "").strip()
-                entidade_curso = f"{main_value} - {child_value}" if child_value else main_value
-                entidade = extrair_entidade(entidade_curso)
-            else:   
-                entidade_curso = None
-                entidade = None
-            
-            # Verifica se a entidade_curso começa com algum dos prefixos válidos
-            if not entidade_curso or not any(entidade_curso.startswith(prefix) for prefix in entidades_validas):
-                continue
-            
-            if "Fac. Unyleya | Graduação" in main_value:
-                continue
+        # Curso da tarefa pai, já resolvido em lote para a página inteira
+        curso = cursos_pais.get(parent_key)
+        
+        # Campo Entidade e Curso
+        entidade_curso_data = fields.get("customfield_10808")
+        if entidade_curso_data:
+            main_value = entidade_curso_data.get("value", "").strip()
+            child_value = entidade_curso_data.get("child", {}).get("value", "").strip()
+            entidade_curso = f"{main_value} - {child_value}" if child_value else main_value
+            entidade = extrair_entidade(entidade_curso)
+        else:   
+            entidade_curso = None
+            entidade = None
+        
+        # Verifica se a entidade_curso começa com algum dos prefixos válidos
+        if not entidade_curso or not entidade_curso.startswith(ENTIDADES_VALIDAS):
+            continue
+        
+        if "Fac. Unyleya | Graduação" in main_value:
+            continue
 
-            disciplina = fields.get("summary").split(": ")[0]
+        disciplina = fields.get("summary").split(": ")[0]
 
-            componentes = fields.get("components")
+        # A consulta filtra por componente, então toda subtarefa tem ao menos um
+        componentes = fields.get("components")
+        nome_componente = componentes[0]["name"] if componentes else ""
+        tipo = nome_componente.split(" - ")[0]
 
-            if componentes:
-                nome_componente = componentes[0]["name"]
-                if "VÍDEO" in nome_componente.upper():
-                    tem_video = True
-                else:
-                    tem_video = False
-            tipo = nome_componente.split(" - ")[0]
+        chave = issue["key"]
+        rotulos = fields.get("labels", [])
+        coordenador = fields.get("customfield_10803")
+        coordenador_master = fields.get("customfield_10804")
+        
+        link_jira = f"https://jira.unyleya.com.br/browse/{chave}"
+
+        if child_value:
+            curso = child_value
+
+        # Datas
+        data_de_resolucao = fields.get("resolutiondate")
+        data_de_resolucao = time.strptime(data_de_resolucao.split("T")[0], "%Y-%m-%d") if data_de_resolucao else None
+        created_datetime = fields.get("created", "")
+        created_date = created_datetime.split("T")[0] if created_datetime else None
+        updated_datetime = fields.get("updated", "")
+        updated_date = updated_datetime.split("T")[0] if updated_datetime else None
+        migracao = "CV" if entidade != "Pós-Graduação" else "SV"
+
+        situacao = fields.get("status", {}).get("name")
+
+        # Adicionando os dados processados
+        all_issues.append(REGISTRO_DISCIPLINAS.montar(
+            chave=chave,
+            link_jira=link_jira,
+            rotulos=", ".join(rotulos) or None,
+            data_para_ficar_pronto=fields.get("duedate") or None,
+            data_criacao=created_date,
+            data_atualizacao=updated_date,
+            data_de_resolucao=data_de_resolucao,
+            disciplina=disciplina,
+            coordenador=coordenador,
+            coordenador_chave=obter_primeiro_coordenador(coordenador),
+            coordenador_master=coordenador_master,
+            entidade_curso=entidade_curso,
+            entidade=entidade,
+            migracao=migracao,
+            curso=curso,
+            situacao=situacao,
+            tipo=tipo,
+        ))
 
-            chave = issue["key"]
-            rotulos = fields.get("labels", [])
-            coordenador = fields.get("customfield_10803")
-            coordenador_master = fields.get("customfield_10804")
-            
-            link_jira = f"https://jira.unyleya.com.br/browse/{chave}"
+    return all_issues
 
-            if child_value:
-                curso = child_value
-            else:
-                curso = curso
-
-            # Datas
-            data_de_resolucao = fields.get("resolutiondate")
-            data_de_resolucao = time.strptime(data_de_resolucao.split("T")[0], "%Y-%m-%d") if data_de_resolucao else None
-            created_datetime = fields.get("created", "")
-            created_date = created_datetime.split("T")[0] if created_datetime else None
-            updated_datetime = fields.get("updated", "")
-            updated_date = updated_datetime.split("T")[0] if updated_datetime else None
-            migracao = "CV" if entidade != "Pós-Graduação" else "SV"
-
-            situacao = fields.get("status", {}).get("name")
-
-            # Adicionando os dados processados
-            all_issues.append({
-                "chave": chave,
-                "link_jira": link_jira,
-                "rotulos": ", ".join(rotulos) or None,
-                "data_para_ficar_pronto": fields.get("duedate") or None,
-                "data_criacao": created_date,
-                "data_atualizacao": updated_date,
-                "data_de_resolucao": data_de_resolucao,
-                "disciplina": disciplina,
-                "coordenador": coordenador,
-                "coordenador_master": coordenador_master,
-                "entidade_curso": entidade_curso,
-                "entidade": entidade,
-                "migracao": migracao,
-                "curso": curso,
-                "situacao": situacao,
-                "tipo": tipo
-            })
+def obter_disciplinas_jira(paginacao=None):
+    all_issues = []
 
-        progress_bar.update(len(issues))
+    total_issues, paginas = paginacao or paginar_jira(*consulta_disciplinas_jira())
+    progress_bar = tqdm(total=total_issues, desc="Processando tarefas", unit="tarefa")
+    cursos_pais = {}
 
-        if start_at >= total_issues:
+    for data in paginas:
+        issues = data.get("issues", [])
+        if not issues:
             break
 
-        start_at += max_results
+        with metricas.medir("transformacao", consulta="disciplinas"):
+            all_issues.extend(transformar_pagina_disciplinas(issues, cursos_pais))
+        progress_bar.update(len(issues))
 
     return all_issues
 
-def obter_escola_tecnica_jira():
-    
-    start_at = 0
-    max_results = 1000
-    all_issues = []
+# Marca d'água própria da exportação da escola técnica
+ARQUIVO_MARCA_ESCOLA_TECNICA = "last_updated_escola_tecnica.txt"
+
+# Função para ler a marca d'água da escola técnica
+def marca_dagua_escola_tecnica(caminho_csv=SYNC_ESCOLA_TECNICA_CSV):
+    """Sem a marca d'água ou sem o CSV exportado, a exportação busca todo o histórico."""
+    if not os.path.exists(caminho_csv) or not os.path.exists(ARQUIVO_MARCA_ESCOLA_TECNICA):
+        return None
+    with open(ARQUIVO_MARCA_ESCOLA_TECNICA, "r") as f:
+        return f.read().strip() or None
 
+# Função para montar a consulta de vídeos da escola técnica na API Jira
+def consulta_escola_tecnica_jira(completa=False):
+    marca_dagua = None if completa else marca_dagua_escola_tecnica()
     jql_query = (
         'project = PROCONTEUD AND issuetype in (Sub-task)'
         ' AND status in (Reopen, Closed, Done, "In Progress", "To Do", Pending)'
         ' AND "Entidade e Curso" in ("Escola Técnica | Cursos Técnicos | Presencial", "Escola Técnica | Cursos Técnicos | Semipresencial")'
-        ' AND text ~ "VÍDEO - GRAVAR"'
-        ' ORDER BY updated'
+        f'{filtro_atualizacao(marca_dagua, marca_dagua is None)}'
+        ' ORDER BY key ASC'
     )
 
     # Explicar a necessidade de ter uma maquina melhor
     # Maquina I3 ficará como um backup
 
     jql_encoded = quote(jql_query, safe=":=,()")
-    base_url = f"https://jira.unyleya.com.br/rest/api/2/search?jql={jql_encoded}"
+    base_url = f"{JIRA_BASE_URL}/rest/api/2/search?jql={jql_encoded}"
     print(base_url)
     params = {
         "fields": ",".join([
@@ -755,289 +1177,555 @@ def obter_escola_tecnica_jira():
             "customfield_10900", # Carga Horária
             "status" # Situação do chamado
         ]),
-        "startAt": start_at,
-        "maxResults": max_results
+        "startAt": 0,
+        "maxResults": 1000
     }
-    response = realizar_requisicao(base_url, headers, params)
+    return base_url, params
 
-    data = response.json()
-    total_issues = data["total"]  # Total issues from Jira API
-    progress_bar = tqdm(total=total_issues, desc="Processando tarefas", unit="tarefa")
+# Colunas do CSV e da planilha da escola técnica
+COLUNAS_ESCOLA_TECNICA = [
+    "chave", "link_jira", "rotulos", "data_criacao", "data_atualizacao", "disciplina", "conteudista",
+    "entidade_curso", "entidade", "curso", "situacao", "qtd_de_horas", "tipo",
+]
+LinhaEscolaTecnica = namedtuple("LinhaEscolaTecnica", COLUNAS_ESCOLA_TECNICA)
 
-    while True:
-        params["startAt"] = start_at
-        response = realizar_requisicao(base_url, headers, params)
-        data = response.json()
-        issues = data.get("issues", [])
-        if not issues:
-            break
+# Função para transformar uma página de vídeos da escola técnica nas linhas do CSV
+def transformar_pagina_escola_tecnica(issues):
+    """
+    A consulta traz todas as subtarefas da escola técnica; só viram linha as de vídeo,
+    reconhecidas pelo resumo, pela mesma regra de processar_status_subtarefas.
+    """
+    linhas = []
 
-        for issue in issues:
-            fields = issue["fields"]
+    for issue in issues:
+        fields = issue["fields"]
+        if MARCADOR_VIDEO not in fields["summary"].upper():
+            continue
 
-            parent_key = fields.get("parent", {}).get("key")
-            
-            # crie uma condicional para verificar se o campo 12900 é nulo, se for então tpo = carga horária, senão então tipo = qtd de horas
-            if fields.get("customfield_12900") == None:
-                qtd_de_horas = fields.get("customfield_10900")
-                tipo = "Carga Horária"
-            else:
-                qtd_de_horas = fields.get("customfield_12900")
-                tipo = "Qtd de Horas Gravadas"
-            
-            # Campo Entidade e Curso
-            entidade_curso_data = fields.get("customfield_10808")
-            if entidade_curso_data:
-                main_value = entidade_curso_data.get("value", "").strip()
-                child_value = entidade_curso_data.get("child", {}).get("value", "").strip()
-                entidade_curso = f"{main_value} - {child_value}" if child_value else main_value
-                entidade = extrair_entidade(entidade_curso)
-                print(entidade)
-                print(entidade_curso)
-            else:   
-                entidade_curso = None
-                entidade = None
-
-            disciplina = fields.get("summary").split(": ")[0]
-
-            chave = issue["key"]
-            rotulos = fields.get("labels", [])
-            
-            link_jira = f"https://jira.unyleya.com.br/browse/{chave}"
+        # Sem a Qtd de Horas Gravadas (campo 12900), vale a Carga Horária
+        if fields.get("customfield_12900") is None:
+            qtd_de_horas = fields.get("customfield_10900")
+            tipo = "Carga Horária"
+        else:
+            qtd_de_horas = fields.get("customfield_12900")
+            tipo = "Qtd de Horas Gravadas"
+
+        # Campo Entidade e Curso; o curso é o valor filho do campo
+        entidade_curso = entidade = curso = None
+        entidade_curso_data = fields.get("customfield_10808")
+        if entidade_curso_data:
+            main_value = entidade_curso_data.get("value", "").strip()
+            child_value = entidade_curso_data.get("child", {}).get("value", "").strip()
+            entidade_curso = f"{main_value} - {child_value}" if child_value else main_value
+            entidade = extrair_entidade(entidade_curso)
+            curso = child_value or None
+
+        chave = issue["key"]
+        created_datetime = fields.get("created", "")
+        updated_datetime = fields.get("updated", "")
+
+        # Adicionando os dados processados
+        linhas.append(LinhaEscolaTecnica(
+            chave=chave,
+            link_jira=f"https://jira.unyleya.com.br/browse/{chave}",
+            rotulos=", ".join(fields.get("labels", [])) or None,
+            data_criacao=created_datetime.split("T")[0] if created_datetime else None,
+            data_atualizacao=updated_datetime.split("T")[0] if updated_datetime else None,
+            disciplina=fields.get("summary").split(": ")[0],
+            conteudista=fields.get("customfield_10802") or None,
+            entidade_curso=entidade_curso,
+            entidade=entidade,
+            curso=curso,
+            situacao=fields.get("status", {}).get("name"),
+            qtd_de_horas=qtd_de_horas,
+            tipo=tipo,
+        ))
+
+    return linhas
+
+# Função para exportar os vídeos da escola técnica, mesclando as tarefas recebidas ao CSV
+def exportar_escola_tecnica(
+    paginacao=None, completa=None, registrar_marca=True,
+    caminho=SYNC_ESCOLA_TECNICA_CSV, caminho_xlsx=SYNC_ESCOLA_TECNICA_XLSX,
+):
+    """
+    Grava os vídeos recebidos, página a página, em um CSV novo. Na exportação
+    incremental, depois copia do CSV anterior as linhas das tarefas que não vieram nesta
+    busca; uma subtarefa recebida que deixou de ser de vídeo perde a linha. Na completa, o
+    CSV é regravado só com os recebidos, e saem as tarefas apagadas ou que deixaram de casar
+    com a consulta. Sem completa, a exportação é completa quando não há marca d'água. Só as
+    chaves recebidas ficam em memória. O CSV novo substitui o
+    anterior, a planilha é regerada a partir dele (só quando algo pode ter mudado, porque
+    ela é gerada do CSV inteiro) e a marca d'água passa para hoje. Devolve a contagem
+    (novas, alteradas, mantidas).
+    """
+    start_time = time.time()
+    if completa is None:
+        completa = marca_dagua_escola_tecnica(caminho) is None
+    total_issues, paginas = paginacao or paginar_jira(*consulta_escola_tecnica_jira(completa))
+    progress_bar = tqdm(total=total_issues, desc="Exportando escola técnica", unit="tarefa")
+    recebidas = set()
+    # Chaves de todas as subtarefas recebidas, de vídeo ou não, para a mescla incremental
+    vistas = set()
+    alteradas = mantidas = 0
+    temporario = f"{caminho}.tmp"
+    try:
+        with open(temporario, "w", newline="", encoding="utf-8-sig") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(COLUNAS_ESCOLA_TECNICA)
+            for data in paginas:
+                issues = data.get("issues", [])
+                with metricas.medir("transformacao", consulta="escola_tecnica"):
+                    linhas = [linha for linha in transformar_pagina_escola_tecnica(issues) if linha.chave not in recebidas]
+                with metricas.medir("gravacao", consulta="escola_tecnica"):
+                    escritor.writerows(linhas)
+                recebidas.update(linha.chave for linha in linhas)
+                if not completa:
+                    vistas.update(issue["key"] for issue in issues)
+                progress_bar.update(len(issues))
+            progress_bar.close()
+
+            if not completa and os.path.exists(caminho):
+                with metricas.medir("gravacao", consulta="escola_tecnica"):
+                    with open(caminho, newline="", encoding="utf-8-sig") as anterior:
+                        leitor = csv.reader(anterior)
+                        next(leitor, None)
+                        for linha in leitor:
+                            if linha[0] in recebidas:
+                                alteradas += 1
+                            elif linha[0] not in vistas:
+                                escritor.writerow(linha)
+                                mantidas += 1
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    finally:
+        paginas.close()
+
+    # Sem tarefas recebidas o CSV incremental não mudou, e a planilha existente continua valendo
+    if caminho_xlsx and (recebidas or completa or not os.path.exists(caminho_xlsx)):
+        with metricas.medir("gravacao", consulta="escola_tecnica"):
+            gerar_planilha_escola_tecnica(caminho, caminho_xlsx)
+    if registrar_marca:
+        with open(ARQUIVO_MARCA_ESCOLA_TECNICA, "w") as f:
+            f.write(update_time)
 
-            if child_value:
-                curso = child_value
-            else:
-                curso = curso
-
-            created_datetime = fields.get("created", "")
-            created_date = created_datetime.split("T")[0] if created_datetime else None
-            updated_datetime = fields.get("updated", "")
-            updated_date = updated_datetime.split("T")[0] if updated_datetime else None
-
-            situacao = fields.get("status", {}).get("name")
-
-            # Adicionando os dados processados
-            all_issues.append({
-                "chave": chave,
-                "link_jira": link_jira,
-                "rotulos": ", ".join(rotulos) or None,
-                "data_criacao": created_date,
-                "data_atualizacao": updated_date,
-                "disciplina": disciplina,
-                "conteudista": fields.get("customfield_10802") or None,
-                "entidade_curso": entidade_curso,
-                "entidade": entidade,
-                "curso": curso,
-                "situacao": situacao,
-                "qtd_de_horas": qtd_de_horas,
-                "tipo": tipo
-            })
+    contagem = (len(recebidas) - alteradas, alteradas, mantidas)
+    registrar_contagem("escola_tecnica", (contagem[0], alteradas, 0))
+    print(
+        f"Escola técnica: {len(recebidas)} vídeos exportados em {time.time() - start_time:.2f} segundos "
+        f"({contagem[0]} novos, {alteradas} alterados, {mantidas} mantidos do arquivo anterior)"
+    )
+    return contagem
 
-        progress_bar.update(len(issues))
+# Função para gerar a planilha da escola técnica a partir do CSV
+def gerar_planilha_escola_tecnica(caminho_csv=SYNC_ESCOLA_TECNICA_CSV, caminho_xlsx=SYNC_ESCOLA_TECNICA_XLSX):
+    """
+    A planilha é escrita em modo só escrita do openpyxl, que grava cada linha ao recebê-la;
+    só uma linha do CSV fica em memória por vez.
+    """
+    # Importado aqui para que só a planilha pague o custo do openpyxl
+    from openpyxl import Workbook
+
+    coluna_horas = COLUNAS_ESCOLA_TECNICA.index("qtd_de_horas")
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Sheet1")
+    with open(caminho_csv, newline="", encoding="utf-8-sig") as arquivo:
+        leitor = csv.reader(arquivo)
+        aba.append(next(leitor))
+        for linha in leitor:
+            # O CSV não guarda None nem números; células vazias ficam vazias e as horas voltam a ser número
+            valores = [valor or None for valor in linha]
+            try:
+                valores[coluna_horas] = float(valores[coluna_horas])
+            except (TypeError, ValueError):
+                pass
+            aba.append(valores)
+    temporario = f"{caminho_xlsx}.tmp"
+    planilha.save(temporario)
+    os.replace(temporario, caminho_xlsx)
+
+# Funções do checkpoint por página
+def impressao_consulta(consulta):
+    """
+    Identifica uma consulta pela URL (que inclui o JQL com a marca d'água) e pelos campos
+    pedidos; qualquer mudança na consulta invalida o checkpoint.
+    """
+    base_url, params = consulta
+    params = {chave: valor for chave, valor in params.items() if chave != "startAt"}
+    return hashlib.sha1(json.dumps([base_url, params], sort_keys=True).encode("utf-8")).hexdigest()
+
+def ler_checkpoints():
+    if not os.path.exists(SYNC_CHECKPOINT_FILE):
+        return {}
+    with open(SYNC_CHECKPOINT_FILE, "r") as f:
+        return json.load(f)
+
+def gravar_checkpoints(checkpoints):
+    # Escreve em um arquivo temporário e troca de uma vez, para nunca deixar um checkpoint pela metade
+    temporario = f"{SYNC_CHECKPOINT_FILE}.tmp"
+    with open(temporario, "w") as f:
+        json.dump(checkpoints, f, indent=2)
+    os.replace(temporario, SYNC_CHECKPOINT_FILE)
+
+# Data da execução que começou cada consulta retomada. Uma tarefa atualizada depois dessa
+# data pode ter ido parar nas páginas já gravadas, que a retomada pula; por isso a marca
+# d'água gravada ao fim é essa data, e não a de hoje, e a próxima execução busca a tarefa
+datas_retomadas = {}
+
+def registrar_checkpoint(nome, consulta, watermark, ultima_pagina, quantidade, total_issues):
+    checkpoints = ler_checkpoints()
+    checkpoints[nome] = {
+        "impressao": impressao_consulta(consulta),
+        "watermark": watermark,
+        "data": datas_retomadas.get(nome, update_time),
+        "ultima_pagina": ultima_pagina,
+        # Primeira tarefa ainda não gravada; o servidor pode ter devolvido menos que maxResults
+        "proxima": ultima_pagina + quantidade,
+        "total": total_issues,
+    }
+    gravar_checkpoints(checkpoints)
+
+def limpar_checkpoint(nome):
+    checkpoints = ler_checkpoints()
+    if checkpoints.pop(nome, None) is None:
+        return
+    if checkpoints:
+        gravar_checkpoints(checkpoints)
+    else:
+        os.remove(SYNC_CHECKPOINT_FILE)
+
+# Função para continuar uma consulta a partir da página seguinte à última gravada
+def retomar_consulta(nome, consulta):
+    base_url, params = consulta
+    checkpoint = ler_checkpoints().get(nome)
+    if not checkpoint or checkpoint["impressao"] != impressao_consulta(consulta):
+        return consulta
+    # Checkpoints gravados antes do campo "proxima" supunham páginas completas
+    inicio = checkpoint.get("proxima", checkpoint["ultima_pagina"] + params["maxResults"])
+    # Checkpoints gravados antes do campo "data" voltam à marca d'água da consulta
+    datas_retomadas[nome] = checkpoint.get("data", checkpoint["watermark"])
+    print(f"Retomando {nome} a partir da tarefa {inicio} de {checkpoint['total']} (execução de {datas_retomadas[nome]})")
+    return base_url, dict(params, startAt=inicio)
+
+_FIM_DA_FILA = object()
+
+# Função para executar um estágio do pipeline em uma thread própria
+def em_segundo_plano(iteravel, tamanho_fila=SYNC_QUEUE_SIZE):
+    """
+    Consome o iterável em uma thread separada e entrega os itens por uma fila limitada.
+    O estágio seguinte trabalha enquanto este já produz o próximo item, e a fila cheia
+    segura o produtor, de modo que a memória não cresce com o tamanho da sincronização.
+    """
+    fila = queue.Queue(maxsize=max(1, tamanho_fila))
+    parar = threading.Event()
 
-        if start_at >= total_issues:
-            break
+    def colocar(item):
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-        start_at += max_results
+    def produzir():
+        try:
+            for item in iteravel:
+                if not colocar((item, None)):
+                    break
+            else:
+                colocar((_FIM_DA_FILA, None))
+        except BaseException as erro:
+            colocar((_FIM_DA_FILA, erro))
+        finally:
+            if hasattr(iteravel, "close"):
+                iteravel.close()
+
+    threading.Thread(target=produzir, daemon=True).start()
+    try:
+        while True:
+            item, erro = fila.get()
+            if erro is not None:
+                raise erro
+            if item is _FIM_DA_FILA:
+                return
+            yield item
+    finally:
+        parar.set()
 
-    return all_issues
+# Estágio de transformação: entrega o startAt e a quantidade de tarefas da página e as linhas geradas
+def transformar_paginas(paginas, transformar, consulta="dados"):
+    try:
+        for data in paginas:
+            issues = data.get("issues", [])
+            with metricas.medir("transformacao", consulta=consulta):
+                linhas = transformar(issues)
+            yield data.get("startAt"), len(issues), linhas
+    finally:
+        paginas.close()
 
-def popular_atualizar_cursos_coordenadores():
+# Função para buscar, transformar e gravar uma consulta página a página
+def sincronizar_streaming(
+    descricao, paginacao, transformar, sql, checkpoint=None, resolver=None, sql_hashes=None, consulta="dados"
+):
     """
-    Atualiza a estrutura da tabela existente e popula as tabelas de cursos e coordenadores
+    Encadeia busca -> transformação -> gravação com filas limitadas entre os estágios.
+    A busca já roda em segundo plano no motor de jira_client; cada página é gravada e
+    confirmada assim que transformada. Com checkpoint=(nome, consulta, watermark), cada
+    página confirmada é registrada para que uma execução interrompida possa ser retomada.
+    resolver acrescenta as chaves estrangeiras às linhas de cada página na gravação, e com
+    sql_hashes as linhas sem alteração de conteúdo não são regravadas.
     """
-    cursor = sql_client.cursor()
-    
     start_commit_time = time.time()
-    print("***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***\n Populando e atualizando estrutura da tabela...")
-
-    try:        
-        # Popula a tabela de cursos
-        cursor.execute(f"""
-            SELECT DISTINCT nome_curso, entidade, versao
-            FROM (
-                SELECT 
-                    curso AS nome_curso,
-                    entidade,
-                CASE
-                    WHEN entidade != 'Pós-Graduação' THEN "CV"
-                    ELSE "SV"
-                    END as versao
-                FROM db_dpc_jira
-                WHERE curso IS NOT NULL AND entidade IS NOT NULL AND data_atualizacao >= '{last_updated}'
-            ) AS cursos
-        """)
-        cursos = cursor.fetchall()
-        #transform cursos in dataframe:
-        def salvar_cursos_mysql(result):
-            cursor = sql_client.cursor()
-            try:
-                progress_bar = tqdm(total=len(result), desc="Salvando cursos", unit="curso")
-                for curso in result:
-                    cursor.execute(
-                        """
-                        INSERT INTO cursos (nome_curso, entidade, versao)
-                        VALUES (%s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                            versao = VALUES(versao)
-                        """,
-                        (curso[0], curso[1], curso[2])
-                    )
-                    progress_bar.update(1)
-                sql_client.commit()
-                progress_bar.close()
-            except Exception as e:
-                sql_client.rollback()
-                print(f"Erro ao salvar dados: {str(e)}")
-                raise e
-            finally:
-                cursor.close()
-        salvar_cursos_mysql(cursos)
-        # AND data_atualizacao >= '{last_updated})
-        
-        # Atualiza os IDs dos cursos na tabela principal
-        cursor.execute("SET SQL_SAFE_UPDATES = 0")  
-        cursor.execute(f"""
-            UPDATE db_dpc_jira d
-            JOIN cursos c ON d.curso = c.nome_curso AND d.entidade = c.entidade
-            SET d.curso_id = c.id
-            WHERE d.chave IS NOT NULL AND d.data_atualizacao >= '{last_updated}'
-        """)
-
-        cursor.execute(f"""
-            UPDATE db_dpc_jira_disciplinas d
-            JOIN cursos c ON d.curso = c.nome_curso AND d.entidade = c.entidade
-            SET d.curso_id = c.id
-            WHERE d.chave IS NOT NULL AND d.data_atualizacao >= '{last_updated_disciplinas}'
-        """)
-
-        # Popula a tabela de coordenadores com os dados existentes, utilizando primeiro_coordenador
-        cursor.execute(f"""
-            INSERT INTO coordenadores (coordenador, coordenador_master)
-            SELECT 
-                TRIM(SUBSTRING_INDEX(
-                    REPLACE(
-                        REPLACE(
-                            REPLACE(REPLACE(CONVERT(coordenador USING utf8mb4), ' / ', '/'), 
-                        ' /', '/'),
-                    '/ ', '/'), 
-                '’', ''''), 
-                '/', 1)) AS primeiro_coordenador,
-                
-                CASE 
-                    WHEN d.coordenador_master = 'InsBE' THEN 'INSBE'
-                    WHEN d.coordenador_master = 'IBREAD' THEN 'IBREAD'
-                    WHEN d.coordenador_master = 'André Luiz Cecil Vaz de Carvalho' THEN 'INSBE'
-                    WHEN d.coordenador_master = 'Marcel Hasslocher' THEN 'IBREAD'
-                    WHEN d.coordenador_master = 'Jackson Santos dos Reis' THEN 'Jackson Santos dos Reis'
-                    ELSE 'None'
-                END AS coordenador_master
-
-            FROM (
-                SELECT DISTINCT 
-                    CASE 
-                        WHEN coordenador LIKE 'Coord. Geral dos Cursos em Direito / Vitor Fernandes Gonçalves / Simone Cuber Araujo Pinto' THEN 'Coordenação Geral dos Cursos de Direito'
-                        WHEN coordenador LIKE 'Coord. Geral dos Cursos em Direito%' THEN 'Coordenação Geral dos Cursos de Direito'
-                        WHEN coordenador LIKE 'Renata Alcione de Faria Rodrigues%' THEN 'Renata Alcione de Faria Villela de Araújo'
-                        ELSE TRIM(REPLACE(CONVERT(coordenador USING utf8mb4), UNHEX('C2A0'), ''))
-                    END AS coordenador,
-                    coordenador_master
-                FROM db_dpc_jira 
-                WHERE coordenador IS NOT NULL AND data_atualizacao >= '{last_updated}'
-            ) d
-            ORDER BY primeiro_coordenador
-            ON DUPLICATE KEY UPDATE coordenador_master = VALUES(coordenador_master);
-        """)
-
-        # Atualiza os IDs dos coordenadores na tabela principal utilizando "primeiro_coordenador"
-        cursor.execute(f"""
-            UPDATE db_dpc_jira d
-            JOIN (
-                SELECT id, coordenador 
-                FROM coordenadores
-            ) c ON TRIM(SUBSTRING_INDEX(
-                REPLACE(
-                    REPLACE(
-                        REPLACE(REPLACE(CONVERT(d.coordenador USING utf8mb4), ' / ', '/'), 
-                    ' /', '/'),
-                '/ ', '/'), 
-            '’', ''''), 
-            '/', 1)) = c.coordenador
-            SET d.coordenador_id = c.id
-            WHERE d.chave IS NOT NULL AND d.data_atualizacao >= '{last_updated}'
-        """)
-
-        # Atualiza os IDs dos coordenadores na tabela db_dpc_jira_disciplinas utilizando "primeiro_coordenador"
-        cursor.execute(f"""
-            UPDATE db_dpc_jira_disciplinas d
-            JOIN (
-                SELECT id, coordenador 
-                FROM coordenadores
-            ) c ON TRIM(SUBSTRING_INDEX(
-                REPLACE(
-                    REPLACE(
-                        REPLACE(REPLACE(CONVERT(d.coordenador USING utf8mb4), ' / ', '/'), 
-                    ' /', '/'),
-                '/ ', '/'), 
-            '’', ''''), 
-            '/', 1)) = c.coordenador
-            SET d.coordenador_id = c.id
-            WHERE d.chave IS NOT NULL AND d.data_atualizacao >= '{last_updated_disciplinas}'
-        """)
-        
-        # Atualiza os IDs de coordenadores na tabela cursos
-        cursor.execute("SET SQL_SAFE_UPDATES = 0")  
-        cursor.execute(f"""
-            UPDATE cursos c
-            JOIN db_dpc_jira d ON c.nome_curso = d.curso AND c.entidade = d.entidade
-            SET c.coordenador_id = d.coordenador_id
-            WHERE d.coordenador_id IS NOT NULL AND d.data_atualizacao >= '{last_updated}'
-        """)
-        cursor.execute("SET SQL_SAFE_UPDATES = 1")  
-        
-        sql_client.commit()
+    total_issues, paginas = paginacao
+    lotes = em_segundo_plano(transformar_paginas(paginas, transformar, consulta))
+
+    inicio = checkpoint[1][1].get("startAt", 0) if checkpoint else 0
+    progress_bar = tqdm(total=total_issues, initial=min(inicio, total_issues), desc=descricao, unit="tarefa")
+    total_gravado = 0
+    contagem = [0, 0, 0]
+    for start_at, quantidade, dados in lotes:
+        if dados:
+            contagem_pagina = gravar_lote_mysql(
+                sql, dados, resolver=resolver, sql_hashes=sql_hashes, consulta=consulta
+            )
+            contagem = [total + parcial for total, parcial in zip(contagem, contagem_pagina)]
+            total_gravado += len(dados)
+        if checkpoint and start_at is not None:
+            registrar_checkpoint(*checkpoint, start_at, quantidade, total_issues)
+        progress_bar.update(quantidade)
+    progress_bar.close()
+
+    if checkpoint:
+        limpar_checkpoint(checkpoint[0])
+
+    end_commit_time = time.time()
+    print(f"{total_gravado} chamados processados em {end_commit_time - start_commit_time:.2f} segundos ({resumo_contagem(contagem)})")
+    return total_gravado
+
+def sincronizar_dados_jira(consulta=None, paginacao=None, registrar_checkpoint=True):
+    consulta = consulta or retomar_consulta("dados", consulta_dados_jira())
+    return sincronizar_streaming(
+        "Sincronizando tarefas", paginacao or paginar_jira(*consulta),
+        transformar_pagina_dados, SQL_UPSERT_DADOS,
+        checkpoint=("dados", consulta, last_updated) if registrar_checkpoint else None,
+        resolver=preparar_dados, sql_hashes=SQL_HASHES_DADOS,
+    )
 
+def sincronizar_disciplinas_jira(consulta=None, paginacao=None, registrar_checkpoint=True):
+    consulta = consulta or retomar_consulta("disciplinas", consulta_disciplinas_jira())
+    paginacao = paginacao or paginar_jira(*consulta)
+    cursos_pais = {}
+    # A transformação roda em outra thread, e conexões do PyMySQL não podem ser compartilhadas entre threads
+    conexao = conectar_banco()
+    try:
+        return sincronizar_streaming(
+            "Sincronizando disciplinas", paginacao,
+            lambda issues: transformar_pagina_disciplinas(issues, cursos_pais, conexao),
+            SQL_UPSERT_DISCIPLINAS,
+            checkpoint=("disciplinas", consulta, last_updated_disciplinas) if registrar_checkpoint else None,
+            resolver=dimensoes.resolver_disciplinas,
+            sql_hashes=SQL_HASHES_DISCIPLINAS, consulta="disciplinas",
+        )
+    finally:
+        conexao.close()
+
+# Função para recalcular o resumo de produção dos cursos alterados
+def atualizar_resumo_producao(tamanho_lote=DB_BATCH_SIZE):
+    """
+    Recalcula as linhas de resumo_producao dos cursos alterados nesta execução e dos cursos
+    das tarefas gravadas desde a marca d'água (cobre uma execução anterior interrompida).
+    Os demais cursos não são lidos, e a troca acontece em uma única transação.
+    """
+    carregar_marcas_dagua()
+    cursor = sql_client.cursor()
+    start_commit_time = time.time()
+    try:
+        with metricas.medir("resumo_producao"):
+            cursor.execute(SQL_CURSOS_ATUALIZADOS_DESDE, (last_updated,))
+            cursos = sorted(cursos_alterados.union(curso_id for (curso_id,) in cursor.fetchall()))
+            for inicio in range(0, len(cursos), tamanho_lote):
+                lote = cursos[inicio:inicio + tamanho_lote]
+                marcadores = ", ".join(["%s"] * len(lote))
+                cursor.execute(SQL_APAGAR_RESUMO.format(marcadores=marcadores), lote)
+                cursor.execute(SQL_INSERIR_RESUMO.format(filtro=f"curso_id IN ({marcadores})"), lote)
+            sql_client.commit()
+        cursos_alterados.clear()
+        metricas.somar("cursos_resumidos_total", len(cursos))
         end_commit_time = time.time()
-        print("***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***\n")
-        print(f"Estrutura da tabela atualizada com sucesso!\nTempo gasto para atualizar: {end_commit_time - start_commit_time:.2f} segundos\n***-*-*-*-*-*-*-*-*-******-*-*-*-*-*-*-*-*-***")
-        
+        print(f"Resumo de produção atualizado para {len(cursos)} cursos em {end_commit_time - start_commit_time:.2f} segundos")
     except Exception as e:
         sql_client.rollback()
-        print(f"Erro ao atualizar estrutura da tabela: {str(e)}")
+        print(f"Erro ao atualizar o resumo de produção: {str(e)}")
         raise e
     finally:
         cursor.close()
 
-# Modificar a função main para incluir a atualização da estrutura
-def main():    
-    dados_jira = obter_dados_jira()
+# Função para atualizar o snapshot analítico com as tarefas gravadas nesta execução
+def atualizar_snapshot_analitico(pasta=None):
+    """Sem SYNC_SNAPSHOT_DIR (ou pasta) não faz nada; veja snapshot_analitico.py."""
+    pasta = pasta or SYNC_SNAPSHOT_DIR
+    if not pasta:
+        return None
+    # Importado aqui para que só a exportação pague o custo do pyarrow
+    from snapshot_analitico import atualizar_snapshot
 
-    if dados_jira:
-        salvar_dados_mysql(dados_jira)
+    resumo = atualizar_snapshot(
+        sql_client, pasta,
+        {"db_dpc_jira": chaves_gravadas["dados"], "db_dpc_jira_disciplinas": chaves_gravadas["disciplinas"]},
+        update_time, DB_BATCH_SIZE,
+    )
+    for chaves in chaves_gravadas.values():
+        chaves.clear()
+    return resumo
+
+# Função para reprocessar as tarefas guardadas no cache, sem acessar o Jira
+def reprocessar_cache(caminho=SYNC_CACHE_FILE):
+    """
+    Passa as tarefas e disciplinas do cache pelos transforms atuais e grava o resultado,
+    como uma sincronização. Só as linhas cujo conteúdo mudou são regravadas. As marcas
+    d'água e os checkpoints não mudam.
+    """
+    if not caminho or not os.path.exists(caminho):
+        raise FileNotFoundError(f"Cache de respostas não encontrado: {caminho!r} (defina SYNC_CACHE_FILE)")
+
+    cache = CacheRespostas(caminho)
+    try:
+        sincronizar_dados_jira(consulta_dados_jira(), cache.paginas("dados"), registrar_checkpoint=False)
+        atualizar_resumo_producao()
+        sincronizar_disciplinas_jira(consulta_disciplinas_jira(), cache.paginas("disciplinas"), registrar_checkpoint=False)
+        if SYNC_ESCOLA_TECNICA:
+            # O cache pode não ter todas as tarefas, então as linhas do CSV que ele não tem ficam
+            exportar_escola_tecnica(cache.paginas("escola_tecnica"), completa=False, registrar_marca=False)
+        atualizar_snapshot_analitico()
+    finally:
+        cache.fechar()
+
+# Função para paginar a carga completa de uma consulta em partições paralelas
+def paginar_backfill(nome, montar_consulta, por=SYNC_BACKFILL_POR):
+    """
+    Monta uma consulta por partição (entidade ou janela de criação), sem o filtro de
+    marca d'água e ordenada por chave, que não muda durante a carga. As partições são
+    paginadas juntas, com o limite de JIRA_MAX_WORKERS páginas em andamento, e combinadas
+    em um único (total, gerador de páginas) sem chaves repetidas. A soma dos totais das
+    partições é conferida com o total da consulta sem partições.
+    """
+    total_esperado = contar_tarefas(*montar_consulta(completa=True, ordem="key ASC"))
+    consultas = {
+        f"{nome}:{particao}": montar_consulta(filtro=filtro, completa=True, ordem="key ASC")
+        for particao, filtro in planejar_particoes(por, ENTIDADES_VALIDAS).items()
+    }
+
+    def reabrir(particao, start_at):
+        base_url, params = consultas[particao]
+        return paginar_jira(base_url, dict(params, startAt=start_at))
+
+    return intercalar_particoes(buscar_consultas(consultas), reabrir, total_esperado=total_esperado)
+
+# Função para recarregar todas as tarefas e disciplinas, sem marca d'água
+def backfill(por=SYNC_BACKFILL_POR):
+    """
+    Carga completa para a primeira execução ou depois de recriar as tabelas. As tarefas
+    são gravadas antes das disciplinas, que dependem dos cursos das tarefas pai. Ao fim,
+    as marcas d'água passam para hoje.
+    """
+    carregar_marcas_dagua()
+    sincronizar_dados_jira(
+        consulta_dados_jira(completa=True), paginar_backfill("dados", consulta_dados_jira, por),
+        registrar_checkpoint=False,
+    )
+    atualizar_resumo_producao()
+    sincronizar_disciplinas_jira(
+        consulta_disciplinas_jira(completa=True), paginar_backfill("disciplinas", consulta_disciplinas_jira, por),
+        registrar_checkpoint=False,
+    )
+
+    with open("last_updated.txt", "w") as f:
+        f.write(update_time)
+    with open("last_updated_disciplinas.txt", "w") as f:
+        f.write(update_time_disciplinas)
+    atualizar_snapshot_analitico()
+
+# Modificar a função main para incluir a atualização da estrutura
+def main():
+    if SYNC_REPLAY:
+        reprocessar_cache()
+        return
+
+    carregar_marcas_dagua()
+    print(last_updated)
+    if atualizado_hoje():
+        print("Já foi atualizado hoje.")
+        return
+
+    # As duas consultas são paginadas ao mesmo tempo; as disciplinas ficam retidas
+    # na fila até que as tarefas, das quais dependem os cursos pai, estejam gravadas
+    consultas = {
+        "dados": consulta_dados_jira(),
+        "disciplinas": consulta_disciplinas_jira(),
+    }
+    if SYNC_STREAMING:
+        # Só o modo streaming grava página a página, então só ele pode retomar de um checkpoint
+        consultas = {nome: retomar_consulta(nome, consulta) for nome, consulta in consultas.items()}
+    if SYNC_ESCOLA_TECNICA:
+        consultas["escola_tecnica"] = consulta_escola_tecnica_jira()
+    paginacoes = buscar_consultas(consultas)
+    if SYNC_CACHE_FILE:
+        paginacoes = {
+            nome: guardar_paginas(SYNC_CACHE_FILE, nome, paginacao) for nome, paginacao in paginacoes.items()
+        }
+
+    if SYNC_STREAMING:
+        sincronizar_dados_jira(consultas["dados"], paginacoes["dados"])
     else:
-        print("Nenhum dado a ser salvo.")
+        dados_jira = obter_dados_jira(paginacoes["dados"])
+
+        if dados_jira:
+            salvar_dados_mysql(dados_jira)
+        else:
+            print("Nenhum dado a ser salvo.")
+
+    atualizar_resumo_producao()
 
+    # Uma consulta retomada deixa a marca d'água na data da execução interrompida
     with open("last_updated.txt", "w") as f:
-            f.write(update_time)
+            f.write(datas_retomadas.pop("dados", update_time))
 
-    dados_disciplinas = obter_disciplinas_jira()
-    if dados_disciplinas:
-        salvar_disciplinas_mysql(dados_disciplinas)
+    if SYNC_STREAMING:
+        sincronizar_disciplinas_jira(consultas["disciplinas"], paginacoes["disciplinas"])
     else:
-        print("Nenhum dado de disciplina a ser salvo.")
+        dados_disciplinas = obter_disciplinas_jira(paginacoes["disciplinas"])
+        if dados_disciplinas:
+            salvar_disciplinas_mysql(dados_disciplinas)
+        else:
+            print("Nenhum dado de disciplina a ser salvo.")
 
-    popular_atualizar_cursos_coordenadores()        
     with open("last_updated_disciplinas.txt", "w") as f:
-        f.write(update_time_disciplinas)
+        f.write(datas_retomadas.pop("disciplinas", update_time_disciplinas))
+
+    if SYNC_ESCOLA_TECNICA:
+        exportar_escola_tecnica(paginacoes["escola_tecnica"])
 
-    #dados_escola_tecnica = obter_escola_tecnica_jira()
-    #if dados_escola_tecnica:
-    #    salvar_escola_tecnica(dados_escola_tecnica)
-    #else:
-    #    print("Nenhum dado de escola técnica a ser salvo.")
+    atualizar_snapshot_analitico()
     
 
+# Função para rodar a sincronização (main ou backfill) com exportação de métricas e, se pedido, perfilamento
+def executar(pasta_perfil=SYNC_PROFILE_DIR, funcao=main):
+    if pasta_perfil:
+        metricas.perfilador = Perfilador()
+    sucesso = False
+    try:
+        funcao()
+        sucesso = True
+    finally:
+        metricas.finalizar(sucesso)
+        metricas.exportar()
+        if metricas.perfilador is not None:
+            metricas.perfilador.gravar(pasta_perfil)
+        sql_client.close()
+
 if __name__ == "__main__":
-    main()
-    sql_client.close()
\ No newline at end of file
+    executar()
\ No newline at end of file